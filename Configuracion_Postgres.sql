@@ -26,7 +26,8 @@ CREATE TABLE IF NOT EXISTS accidente (
     Latitud VARCHAR(20),
     Longitud VARCHAR(20),
     Civ INT,
-    Pk_calzada INT
+    Pk_calzada INT,
+    hash_contenido CHAR(32)
 );
 
 -- Crear tabla de actores viales
@@ -44,7 +45,8 @@ CREATE TABLE IF NOT EXISTS vm_acc_actor_vial (
     Genero VARCHAR(50),
     Fecha_nacimiento DATE,
     Edad VARCHAR(5),
-    Codigo VARCHAR(100)
+    Codigo VARCHAR(100),
+    hash_contenido CHAR(32)
 );
 
 -- Crear tabla de causas
@@ -59,7 +61,8 @@ CREATE TABLE IF NOT EXISTS vm_acc_causa (
     Tipo VARCHAR(5),
     Descripcion2 TEXT,
     Tipo_causa VARCHAR(20),
-    Codigo VARCHAR(50)
+    Codigo VARCHAR(50),
+    hash_contenido CHAR(32)
 );
 
 -- Crear tabla de vehículos
@@ -72,7 +75,8 @@ CREATE TABLE IF NOT EXISTS vm_acc_vehiculo (
     Servicio VARCHAR(50),
     Modalidad VARCHAR(50),
     Enfuga CHAR(5),
-    Codigo VARCHAR(20)
+    Codigo VARCHAR(20),
+    hash_contenido CHAR(32)
 );
 
 -- Crear tabla de vías
@@ -95,7 +99,8 @@ CREATE TABLE IF NOT EXISTS vm_acc_vial (
     Agente_transito VARCHAR(10),
     Semaforo VARCHAR(20),
     Visual VARCHAR(50),
-    Codigo VARCHAR(20)
+    Codigo VARCHAR(20),
+    hash_contenido CHAR(32)
 );
 
 -- ============================================================================
@@ -149,8 +154,12 @@ BEGIN
 END
 $$;
 
--- Asignar permisos básicos (consultar e insertar datos)
+-- Nota: la carga inicial masiva (tabla vacía) usa una tabla de staging y la intercambia
+-- por la original; requiere que el usuario sea dueño de las tablas y tenga CREATE en el
+-- esquema. Sin esos permisos la aplicación usa la carga normal.
+
+-- Asignar permisos básicos (consultar, insertar y, para la reconciliación, actualizar y eliminar datos)
 GRANT CONNECT ON DATABASE "Por definir" TO "Por definir";
 GRANT USAGE ON SCHEMA public TO "Por definir";
-GRANT SELECT, INSERT ON ALL TABLES IN SCHEMA public TO "Por definir";
+GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO "Por definir";
 GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO "Por definir";
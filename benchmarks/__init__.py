@@ -0,0 +1,3 @@
+"""
+Herramientas para medir el rendimiento con datos sintéticos
+"""
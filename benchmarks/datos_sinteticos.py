@@ -0,0 +1,561 @@
+"""Generador de datos sintéticos de siniestros para las cinco tablas.
+
+Uso:
+    python -m benchmarks.datos_sinteticos --filas 1000000 --destino postgres [--truncar]
+    python -m benchmarks.datos_sinteticos --filas 1000000 --destino json --directorio datos_json
+
+Los registros conservan los campos de CONFIG_TABLAS con la forma en que los
+entrega la API de ArcGIS (nombres en mayúsculas, fechas en milisegundos), una
+cantidad realista de vehículos, actores, causas y vías por formulario y
+distribuciones sesgadas en las columnas categóricas.
+
+Los datos se generan por bloques de accidentes con una semilla propia por
+bloque, así que cualquier registro se puede reconstruir sin generar los
+anteriores (el servidor simulado de ArcGIS sirve las páginas de esta forma).
+Con la misma semilla, un generador con más accidentes repite los registros de
+uno con menos y agrega los siguientes OBJECTID: sirve para simular una carga
+incremental.
+"""
+
+import argparse
+import bisect
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+
+# Agrega la carpeta raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import CONFIG_TABLAS, COLUMNAS_FECHA
+
+# Tablas hijas en el orden en que se generan dentro de cada accidente
+TABLAS_HIJAS = ['AccidenteVehiculo', 'ActorVial', 'Causa', 'Accidente_via']
+TABLAS = ['Accidente'] + TABLAS_HIJAS
+
+# Registros por formulario en cada tabla hija: {cantidad: peso}
+ABANICO = {
+    'AccidenteVehiculo': {1: 35, 2: 55, 3: 8, 4: 2},
+    'ActorVial': {1: 25, 2: 45, 3: 18, 4: 8, 5: 4},
+    'Causa': {1: 75, 2: 22, 3: 3},
+    'Accidente_via': {1: 95, 2: 5}
+}
+
+DIAS_SEMANA = ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES', 'SABADO', 'DOMINGO']
+MESES = ['ENERO', 'FEBRERO', 'MARZO', 'ABRIL', 'MAYO', 'JUNIO', 'JULIO',
+         'AGOSTO', 'SEPTIEMBRE', 'OCTUBRE', 'NOVIEMBRE', 'DICIEMBRE']
+_EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Categoria:
+    """Valores con pesos relativos; elige con una búsqueda binaria sobre los pesos acumulados."""
+
+    def __init__(self, pesos):
+        self.pesos = dict(pesos)
+        self.valores = list(pesos)
+        self.acumulados = list(itertools.accumulate(pesos.values()))
+        self.total = self.acumulados[-1]
+
+    def elegir(self, rng):
+        return self.valores[bisect.bisect_right(self.acumulados, rng.random() * self.total)]
+
+    def media(self):
+        """Valor esperado (solo para categorías numéricas)"""
+        return sum(valor * peso for valor, peso in self.pesos.items()) / self.total
+
+
+def _zipf(valores, exponente=1.1):
+    """Pesos de Zipf: el primer valor es el más frecuente"""
+    return Categoria({valor: 1 / (posicion + 1) ** exponente for posicion, valor in enumerate(valores)})
+
+
+LOCALIDADES = _zipf([
+    'KENNEDY', 'ENGATIVA', 'SUBA', 'FONTIBON', 'PUENTE ARANDA', 'BOSA', 'CIUDAD BOLIVAR',
+    'USAQUEN', 'CHAPINERO', 'TEUSAQUILLO', 'BARRIOS UNIDOS', 'LOS MARTIRES', 'SAN CRISTOBAL',
+    'RAFAEL URIBE URIBE', 'TUNJUELITO', 'ANTONIO NARIÑO', 'SANTA FE', 'USME', 'LA CANDELARIA', 'SUMAPAZ'
+], 0.8)
+GRAVEDAD = Categoria({'SOLO DANOS': 70, 'CON HERIDOS': 28, 'CON MUERTOS': 2})
+CLASE_ACC = Categoria({'CHOQUE': 76, 'ATROPELLO': 11, 'VOLCAMIENTO': 4, 'CAIDA DE OCUPANTE': 5,
+                       'AUTOLESION': 2, 'INCENDIO': 0.2, 'OTRO': 1.8})
+TIPO_VIA = Categoria({'KR': 35, 'CL': 35, 'AK': 12, 'AC': 10, 'DG': 4, 'TV': 4})
+HORAS = Categoria({hora: peso for hora, peso in enumerate(
+    [2, 1.5, 1.2, 1, 1, 2, 5, 7, 6, 5, 5, 5.5, 6, 6, 5.5, 5.5, 6, 7, 7.5, 6, 4.5, 3.5, 3, 2.5])})
+DIAS_PESO = Categoria({0: 13, 1: 13.5, 2: 14, 3: 14.5, 4: 16, 5: 16, 6: 13})
+
+CLASE_VEHICULO = _zipf(['AUTOMOVIL', 'MOTOCICLETA', 'CAMPERO', 'CAMIONETA', 'BUS', 'BICICLETA',
+                        'CAMION, FURGON', 'MICROBUS', 'BUSETA', 'TRACTOCAMION', 'VOLQUETA', 'M. INDUSTRIAL'])
+SERVICIO = Categoria({'PARTICULAR': 72, 'PUBLICO': 24, 'OFICIAL': 3, 'DIPLOMATICO': 0.3, 'SIN INFORMACION': 0.7})
+MODALIDAD = Categoria({'': 70, 'PASAJEROS': 15, 'CARGA': 8, 'MIXTO': 2, 'SIN INFORMACION': 5})
+ENFUGA = Categoria({'N': 93, 'S': 7})
+
+CONDICION_ACTOR = Categoria({'CONDUCTOR': 58, 'PASAJERO': 18, 'MOTOCICLISTA': 12, 'PEATON': 8, 'CICLISTA': 4})
+GENERO = Categoria({'MASCULINO': 68, 'FEMENINO': 29, 'SIN INFORMACION': 3})
+# Estado de cada actor según la gravedad del accidente
+ESTADO_POR_GRAVEDAD = {
+    'SOLO DANOS': Categoria({'ILESO': 100}),
+    'CON HERIDOS': Categoria({'ILESO': 45, 'HERIDO': 55}),
+    'CON MUERTOS': Categoria({'ILESO': 30, 'HERIDO': 40, 'MUERTO': 30})
+}
+
+CAUSAS = _zipf([
+    ('157', 'OTRA', 'CONDUCTOR'), ('121', 'NO MANTENER DISTANCIA DE SEGURIDAD', 'CONDUCTOR'),
+    ('112', 'DESOBEDECER SEÑALES O NORMAS DE TRANSITO', 'CONDUCTOR'), ('139', 'IMPERICIA EN EL MANEJO', 'CONDUCTOR'),
+    ('104', 'ADELANTAR INVADIENDO CARRIL DE SENTIDO CONTRARIO', 'CONDUCTOR'), ('132', 'EXCESO DE VELOCIDAD', 'CONDUCTOR'),
+    ('409', 'CRUZAR SIN OBSERVAR', 'PEATON'), ('116', 'EMBRIAGUEZ APARENTE', 'CONDUCTOR'),
+    ('306', 'HUECOS', 'VIA'), ('201', 'FALLAS EN LOS FRENOS', 'VEHICULO'),
+    ('502', 'VIAJAR COLGADO', 'PASAJERO'), ('311', 'SEÑALES BORRADAS', 'VIA')
+], 1.3)
+
+VIA = {
+    'GEOMETRICA_A': Categoria({'RECTA': 88, 'CURVA': 12}),
+    'GEOMETRICA_B': Categoria({'PLANO': 90, 'PENDIENTE': 10}),
+    'GEOMETRICA_C': Categoria({'CON ANDENES': 80, 'SIN ANDENES': 12, 'CON BERMAS': 8}),
+    'UTILIZACION': Categoria({'DOBLE SENTIDO': 55, 'UN SENTIDO': 43, 'CONTRAFLUJO': 2}),
+    'CALZADAS': Categoria({'UNA': 45, 'DOS': 48, 'TRES O MAS': 7}),
+    'CARRILES': Categoria({'DOS': 45, 'UNO': 20, 'TRES': 25, 'CUATRO': 10}),
+    'MATERIAL': Categoria({'ASFALTO': 88, 'CONCRETO': 6, 'ADOQUIN': 3, 'AFIRMADO': 2, 'TIERRA': 1}),
+    'ESTADO': Categoria({'BUENO': 82, 'CON HUECOS': 10, 'EN REPARACION': 3, 'DERRUMBES': 0.5, 'HUNDIMIENTOS': 4.5}),
+    'CONDICIONES': Categoria({'SECA': 82, 'HUMEDA': 16, 'ACEITE': 1, 'OTRA': 1}),
+    'ILUMINACION_A': Categoria({'CON': 88, 'SIN': 12}),
+    'ILUMINACION_B': Categoria({'BUENA': 80, 'MALA': 20}),
+    'AGENTE_TRANSITO': Categoria({'NO': 90, 'SI': 10}),
+    'SEMAFORO': Categoria({'NO HAY': 70, 'OPERANDO': 27, 'INTERMITENTE': 2, 'CON DEFECTOS': 1}),
+    'VISUAL': Categoria({'SIN OBSTRUCCION': 88, 'VEHICULO ESTACIONADO': 5, 'ARBOLES': 3, 'CONSTRUCCION': 2, 'OTRA': 2})
+}
+
+_ABANICO = {tabla: Categoria(pesos) for tabla, pesos in ABANICO.items()}
+
+
+def _milisegundos(momento):
+    return int((momento.replace(tzinfo=timezone.utc) - _EPOCA).total_seconds() * 1000)
+
+
+def registros_por_accidente():
+    """Cantidad media de registros en las cinco tablas por cada accidente"""
+    return 1 + sum(categoria.media() for categoria in _ABANICO.values())
+
+
+class GeneradorSiniestros:
+    """Genera los registros de las cinco tablas por bloques deterministas de accidentes."""
+
+    def __init__(self, accidentes, semilla=42, fecha_inicio=date(2015, 1, 1), fecha_fin=date(2024, 12, 31),
+                 tamano_bloque=1000, bloques_en_cache=8):
+        self.accidentes = accidentes
+        self.semilla = semilla
+        self.fecha_inicio = fecha_inicio
+        self.fecha_fin = fecha_fin
+        self.dias = (fecha_fin - fecha_inicio).days + 1
+        self.tamano_bloque = tamano_bloque
+        self.num_bloques = (accidentes + tamano_bloque - 1) // tamano_bloque
+        self._bases = None  # {tabla: [posición del primer registro de cada bloque]}
+        self._cache = OrderedDict()
+        self._bloques_en_cache = bloques_en_cache
+        self._lock = threading.Lock()
+
+    def _accidentes_bloque(self, indice):
+        inicio = indice * self.tamano_bloque
+        return range(inicio, min(inicio + self.tamano_bloque, self.accidentes))
+
+    def conteos_bloque(self, indice):
+        """Registros de cada tabla hija por accidente del bloque: [{tabla: cantidad}]"""
+        rng = random.Random(f"{self.semilla}-{indice}-conteos")
+        return [{tabla: _ABANICO[tabla].elegir(rng) for tabla in TABLAS_HIJAS}
+                for _ in self._accidentes_bloque(indice)]
+
+    def _calcular_bases(self):
+        bases = {tabla: [0] for tabla in TABLAS}
+        for indice in range(self.num_bloques):
+            conteos = self.conteos_bloque(indice)
+            bases['Accidente'].append(bases['Accidente'][-1] + len(conteos))
+            for tabla in TABLAS_HIJAS:
+                bases[tabla].append(bases[tabla][-1] + sum(conteo[tabla] for conteo in conteos))
+        return bases
+
+    @property
+    def bases(self):
+        with self._lock:
+            if self._bases is None:
+                self._bases = self._calcular_bases()
+            return self._bases
+
+    def total(self, tabla):
+        return self.bases[tabla][-1]
+
+    def bloque(self, indice):
+        """Registros de las cinco tablas del bloque: {tabla: [registro]}"""
+        with self._lock:
+            if indice in self._cache:
+                self._cache.move_to_end(indice)
+                return self._cache[indice]
+        registros = self._generar_bloque(indice)
+        with self._lock:
+            self._cache[indice] = registros
+            while len(self._cache) > self._bloques_en_cache:
+                self._cache.popitem(last=False)
+        return registros
+
+    def registros(self, tabla, inicio=0, cantidad=None):
+        """Itera los registros de la tabla desde la posición inicio (OBJECTID = posición + 1)"""
+        bases = self.bases[tabla]
+        fin = bases[-1] if cantidad is None else min(bases[-1], inicio + cantidad)
+        posicion = inicio
+        while posicion < fin:
+            indice = bisect.bisect_right(bases, posicion) - 1
+            registros = self.bloque(indice)[tabla]
+            desde = posicion - bases[indice]
+            hasta = min(len(registros), desde + (fin - posicion))
+            yield from registros[desde:hasta]
+            posicion += hasta - desde
+
+    def iterar_bloques(self):
+        """Genera todos los bloques en orden sin guardarlos en caché"""
+        for indice in range(self.num_bloques):
+            yield self._generar_bloque(indice)
+
+    def _generar_bloque(self, indice):
+        rng = random.Random(f"{self.semilla}-{indice}")
+        bases = self.bases
+        siguientes = {tabla: bases[tabla][indice] + 1 for tabla in TABLAS}
+        registros = {tabla: [] for tabla in TABLAS}
+
+        for numero, conteo in zip(self._accidentes_bloque(indice), self.conteos_bloque(indice)):
+            accidente = self._accidente(rng, numero, siguientes['Accidente'])
+            siguientes['Accidente'] += 1
+            registros['Accidente'].append(accidente)
+            formulario = accidente['FORMULARIO']
+            codigo_accidente = accidente['CODIGO_ACCIDENTE']
+
+            vehiculos = []
+            for orden in range(conteo['AccidenteVehiculo']):
+                vehiculo = self._vehiculo(rng, formulario, codigo_accidente, orden, siguientes['AccidenteVehiculo'])
+                siguientes['AccidenteVehiculo'] += 1
+                vehiculos.append(vehiculo['CODIGO_VEHICULO'])
+                registros['AccidenteVehiculo'].append(vehiculo)
+
+            estados = ESTADO_POR_GRAVEDAD[accidente['GRAVEDAD']]
+            for orden in range(conteo['ActorVial']):
+                registros['ActorVial'].append(self._actor(
+                    rng, formulario, codigo_accidente, orden, vehiculos, estados,
+                    accidente['FECHA_OCURRENCIA_ACC'], siguientes['ActorVial']))
+                siguientes['ActorVial'] += 1
+
+            for orden in range(conteo['Causa']):
+                registros['Causa'].append(self._causa(rng, formulario, codigo_accidente, orden, vehiculos, siguientes['Causa']))
+                siguientes['Causa'] += 1
+
+            for orden in range(conteo['Accidente_via']):
+                registros['Accidente_via'].append(self._via(rng, formulario, codigo_accidente, orden, siguientes['Accidente_via']))
+                siguientes['Accidente_via'] += 1
+        return registros
+
+    def _accidente(self, rng, numero, objectid):
+        dia = self.fecha_inicio + timedelta(days=rng.randrange(self.dias))
+        # Los fines de semana concentran más accidentes: se corre el día hacia el día de la semana elegido
+        dia += timedelta(days=(DIAS_PESO.elegir(rng) - dia.weekday()) % 7)
+        if dia > self.fecha_fin:
+            dia -= timedelta(days=7)
+        momento = datetime(dia.year, dia.month, dia.day, HORAS.elegir(rng), rng.randrange(60))
+        return {
+            'OBJECTID': objectid,
+            'FORMULARIO': f"A{numero + 1:09d}",
+            'CODIGO_ACCIDENTE': str(4000000 + numero),
+            'FECHA_OCURRENCIA_ACC': _milisegundos(datetime(dia.year, dia.month, dia.day)),
+            'HORA_OCURRENCIA_ACC': momento.strftime('%H:%M:%S'),
+            'ANO_OCURRENCIA_ACC': dia.year,
+            'MES_OCURRENCIA_ACC': MESES[dia.month - 1],
+            'DIA_OCURRENCIA_ACC': DIAS_SEMANA[dia.weekday()],
+            'DIRECCION': f"{TIPO_VIA.elegir(rng)} {rng.randint(1, 200)} - {rng.randint(1, 99)}",
+            'GRAVEDAD': GRAVEDAD.elegir(rng),
+            'CLASE_ACC': CLASE_ACC.elegir(rng),
+            'LOCALIDAD': LOCALIDADES.elegir(rng),
+            'MUNICIPIO': 'BOGOTA',
+            'FECHA_HORA_ACC': _milisegundos(momento),
+            'LATITUD': f"{rng.uniform(4.47, 4.83):.7f}",
+            'LONGITUD': f"{rng.uniform(-74.22, -74.01):.7f}",
+            'CIV': rng.randint(1000000, 19999999),
+            'PK_CALZADA': rng.randint(1, 500000)
+        }
+
+    def _vehiculo(self, rng, formulario, codigo_accidente, orden, objectid):
+        clase = CLASE_VEHICULO.elegir(rng)
+        letras = ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(3))
+        placa = f"{letras}{rng.randint(10, 99)}{rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}" if clase == 'MOTOCICLETA' \
+            else f"{letras}{rng.randint(100, 999)}"
+        codigo = f"{codigo_accidente}{orden + 1:02d}"
+        return {
+            'OBJECTID': objectid,
+            'FORMULARIO': formulario,
+            'PLACA': None if clase == 'BICICLETA' else placa,
+            'CODIGO_VEHICULO': codigo,
+            'CLASE': clase,
+            'SERVICIO': SERVICIO.elegir(rng),
+            'MODALIDAD': MODALIDAD.elegir(rng) or None,
+            'ENFUGA': ENFUGA.elegir(rng),
+            'CODIGO': codigo
+        }
+
+    def _actor(self, rng, formulario, codigo_accidente, orden, vehiculos, estados, fecha_accidente, objectid):
+        condicion = CONDICION_ACTOR.elegir(rng)
+        estado = estados.elegir(rng)
+        edad = max(1, min(95, int(rng.gauss(36, 14))))
+        nacimiento = datetime(1970, 1, 1) + timedelta(milliseconds=fecha_accidente) - timedelta(days=edad * 365 + rng.randrange(365))
+        muerte_posterior = estado == 'HERIDO' and rng.random() < 0.01
+        codigo = f"{codigo_accidente}{orden + 1:02d}"
+        return {
+            'CONDICION_A': condicion,
+            'OBJECTID': objectid,
+            'FORMULARIO': formulario,
+            'CODIGO_ACCIDENTADO': codigo,
+            'CODIGO_VICTIMA': codigo,
+            'CODIGO_VEHICULO': None if condicion == 'PEATON' or not vehiculos else rng.choice(vehiculos),
+            'CONDICION': condicion,
+            'ESTADO': 'MUERTO' if muerte_posterior else estado,
+            'MUERTE_POSTERIOR': 'S' if muerte_posterior else 'N',
+            'FECHA_POSTERIOR_MUERTE': fecha_accidente + rng.randint(1, 30) * 86400000 if muerte_posterior else None,
+            'GENERO': GENERO.elegir(rng),
+            'FECHA_NACIMIENTO': _milisegundos(nacimiento) if rng.random() < 0.9 else None,
+            'EDAD': str(edad),
+            'CODIGO': codigo
+        }
+
+    def _causa(self, rng, formulario, codigo_accidente, orden, vehiculos, objectid):
+        codigo_causa, nombre, tipo_causa = CAUSAS.elegir(rng)
+        codigo_vehiculo = rng.choice(vehiculos) if vehiculos and tipo_causa in ('CONDUCTOR', 'VEHICULO') else None
+        return {
+            'CODIGO_AC_VH': f"{codigo_accidente}{orden + 1:02d}",
+            'OBJECTID': objectid,
+            'FORMULARIO': formulario,
+            'CODIGO_ACCIDENTE': codigo_accidente,
+            'CODIGO_VEHICULO': codigo_vehiculo,
+            'CODIGO_CAUSA': codigo_causa,
+            'NOMBRE': nombre,
+            'TIPO': codigo_causa[0],
+            'DESCRIPCION2': nombre.capitalize(),
+            'TIPO_CAUSA': tipo_causa,
+            'CODIGO': f"{codigo_accidente}{orden + 1:02d}"
+        }
+
+    def _via(self, rng, formulario, codigo_accidente, orden, objectid):
+        via = {
+            'OBJECTID': objectid,
+            'FORMULARIO': formulario,
+            'CODIGO_ACCIDENTE': codigo_accidente,
+            'CODIGO_VIA': f"{codigo_accidente}{orden + 1:02d}"
+        }
+        via.update((campo, categoria.elegir(rng)) for campo, categoria in VIA.items())
+        via['CODIGO'] = via['CODIGO_VIA']
+        return via
+
+
+def campos_api(tabla):
+    """Campos de la tabla con el nombre que usa la API"""
+    return [columna.upper() for columna in CONFIG_TABLAS[tabla]['columnas']]
+
+
+def fila_base_datos(tabla, registro):
+    """Convierte un registro con la forma de la API en los valores de las columnas de CONFIG_TABLAS"""
+    fila = []
+    for campo in campos_api(tabla):
+        valor = registro.get(campo)
+        if valor is not None and campo in COLUMNAS_FECHA:
+            momento = _EPOCA + timedelta(milliseconds=valor)
+            valor = momento.strftime('%Y-%m-%d %H:%M:%S' if campo == 'FECHA_HORA_ACC' else '%Y-%m-%d')
+        elif campo == 'DIA_OCURRENCIA_ACC':
+            valor = DIAS_SEMANA.index(valor) + 1
+        fila.append(valor)
+    return fila
+
+
+def _unir(valores):
+    """Equivalente a STRING_AGG(DISTINCT valor, ', ')"""
+    distintos = sorted({str(valor) for valor in valores if valor is not None})
+    return ', '.join(distintos) if distintos else None
+
+
+def filas_consulta(generador, cantidad):
+    """Primeras filas con la forma que retorna GestorBaseDatos.obtener_siniestros_por_fecha"""
+    filas = []
+    for bloque in generador.iterar_bloques():
+        hijos = {tabla: {} for tabla in TABLAS_HIJAS}
+        for tabla in TABLAS_HIJAS:
+            for registro in bloque[tabla]:
+                hijos[tabla].setdefault(registro['FORMULARIO'], []).append(registro)
+        for accidente in bloque['Accidente']:
+            formulario = accidente['FORMULARIO']
+            vehiculos = hijos['AccidenteVehiculo'].get(formulario, [])
+            actores = hijos['ActorVial'].get(formulario, [])
+            causas = hijos['Causa'].get(formulario, [])
+            vias = hijos['Accidente_via'].get(formulario, [])
+            estados = [actor['ESTADO'] for actor in actores]
+            filas.append((
+                accidente['OBJECTID'], formulario,
+                (_EPOCA + timedelta(milliseconds=accidente['FECHA_OCURRENCIA_ACC'])).date(),
+                time.fromisoformat(accidente['HORA_OCURRENCIA_ACC']),
+                accidente['LOCALIDAD'],
+                _unir(v['CLASE'] for v in vehiculos), _unir(v['PLACA'] for v in vehiculos),
+                _unir(a['CONDICION_A'] for a in actores),
+                estados.count('MUERTO'), estados.count('HERIDO'), estados.count('ILESO'),
+                _unir(estados), _unir(a['GENERO'] for a in actores), _unir(a['EDAD'] for a in actores),
+                _unir(c['TIPO_CAUSA'] for c in causas), _unir(c['NOMBRE'] for c in causas),
+                _unir(v['MATERIAL'] for v in vias), _unir(v['ESTADO'] for v in vias)
+            ))
+            if len(filas) >= cantidad:
+                return filas
+    return filas
+
+
+def _texto_copy(valor):
+    if valor is None:
+        return '\\N'
+    return str(valor).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copiar_a_postgres(generador, config_bd, tablas=None, truncar=False, filas_por_copia=50000, callback=None):
+    """Carga los registros generados con COPY; retorna {tabla: registros copiados}.
+    La columna hash_contenido queda vacía (la reconciliación la recalcula al comparar).
+    Con el modo normalizado (normalizar_categorias.sql) las columnas categóricas se copian como códigos.
+    """
+    import psycopg2
+    from src.models.categorias import columnas_normalizadas
+
+    tablas = tablas or TABLAS
+    copiados = {tabla: 0 for tabla in tablas}
+    buffers = {tabla: io.StringIO() for tabla in tablas}
+    pendientes = {tabla: 0 for tabla in tablas}
+
+    conexion = psycopg2.connect(**config_bd)
+    try:
+        cursor = conexion.cursor()
+        categorias = {
+            tabla: [(CONFIG_TABLAS[tabla]['columnas'].index(columna), diccionario)
+                    for columna, diccionario in columnas.items()]
+            for tabla, columnas in columnas_normalizadas(cursor, tablas).items() if columnas
+        }
+        if truncar:
+            nombres = ', '.join(CONFIG_TABLAS[tabla]['nombre_tabla'] for tabla in tablas)
+            cursor.execute(f"TRUNCATE {nombres}")
+
+        def vaciar(tabla):
+            config = CONFIG_TABLAS[tabla]
+            buffers[tabla].seek(0)
+            cursor.copy_expert(
+                f"COPY {config['nombre_tabla']} ({', '.join(config['columnas'])}) FROM STDIN WITH (FORMAT text)",
+                buffers[tabla])
+            conexion.commit()
+            copiados[tabla] += pendientes[tabla]
+            buffers[tabla] = io.StringIO()
+            pendientes[tabla] = 0
+            if callback:
+                callback(tabla, copiados[tabla], generador.total(tabla))
+
+        for bloque in generador.iterar_bloques():
+            for tabla in tablas:
+                escribir = buffers[tabla].write
+                filas = [fila_base_datos(tabla, registro) for registro in bloque[tabla]]
+                for indice, diccionario in categorias.get(tabla, []):
+                    codigos = diccionario.codificar(cursor, {fila[indice] for fila in filas if fila[indice] is not None})
+                    for fila in filas:
+                        if fila[indice] is not None:
+                            fila[indice] = codigos[fila[indice]]
+                for fila in filas:
+                    escribir('\t'.join(_texto_copy(valor) for valor in fila) + '\n')
+                pendientes[tabla] += len(bloque[tabla])
+                if pendientes[tabla] >= filas_por_copia:
+                    vaciar(tabla)
+        for tabla in tablas:
+            if pendientes[tabla]:
+                vaciar(tabla)
+        cursor.execute(f"ANALYZE {', '.join(CONFIG_TABLAS[tabla]['nombre_tabla'] for tabla in tablas)}")
+        conexion.commit()
+    finally:
+        conexion.close()
+    return copiados
+
+
+def pagina_arcgis(tabla, registros, excede_limite):
+    """Respuesta de una consulta de ArcGIS (f=json) con los registros dados"""
+    return {
+        'objectIdFieldName': 'OBJECTID',
+        'fields': [{'name': campo, 'alias': campo} for campo in campos_api(tabla)],
+        'features': [{'attributes': registro} for registro in registros],
+        'exceededTransferLimit': excede_limite
+    }
+
+
+def escribir_paginas_json(generador, directorio, tamano_pagina=2000, tablas=None, callback=None):
+    """Escribe <directorio>/<tabla>/pagina_NNNNNN.json; retorna {tabla: páginas escritas}"""
+    paginas = {}
+    for tabla in tablas or TABLAS:
+        carpeta = os.path.join(directorio, tabla)
+        os.makedirs(carpeta, exist_ok=True)
+        total = generador.total(tabla)
+        numero = 0
+        for inicio in range(0, total, tamano_pagina):
+            registros = list(generador.registros(tabla, inicio, tamano_pagina))
+            numero += 1
+            with open(os.path.join(carpeta, f"pagina_{numero:06d}.json"), 'w', encoding='utf-8') as f:
+                json.dump(pagina_arcgis(tabla, registros, inicio + tamano_pagina < total), f, ensure_ascii=False)
+            if callback:
+                callback(tabla, min(inicio + tamano_pagina, total), total)
+        paginas[tabla] = numero
+    return paginas
+
+
+def agregar_argumentos_datos(parser):
+    """Opciones comunes para construir el generador (también las usa el servidor simulado)"""
+    escala = parser.add_mutually_exclusive_group(required=True)
+    escala.add_argument('--filas', type=int, help='Registros aproximados sumando las cinco tablas (p. ej. 1000000 a 50000000)')
+    escala.add_argument('--accidentes', type=int, help='Cantidad exacta de accidentes (formularios)')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--desde', type=date.fromisoformat, default=date(2015, 1, 1), help='Primera fecha de ocurrencia (AAAA-MM-DD)')
+    parser.add_argument('--hasta', type=date.fromisoformat, default=date(2024, 12, 31), help='Última fecha de ocurrencia (AAAA-MM-DD)')
+
+
+def crear_generador(args):
+    accidentes = args.accidentes or max(1, round(args.filas / registros_por_accidente()))
+    return GeneradorSiniestros(accidentes, args.semilla, args.desde, args.hasta)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.datos_sinteticos',
+        description='Genera datos sintéticos de siniestros para las cinco tablas.'
+    )
+    agregar_argumentos_datos(parser)
+    parser.add_argument('--destino', choices=['postgres', 'json'], required=True)
+    parser.add_argument('--tablas', nargs='+', choices=TABLAS, metavar='TABLA', help=f"Tablas a generar (por defecto todas): {', '.join(TABLAS)}")
+    parser.add_argument('--truncar', action='store_true', help='Vaciar las tablas antes de copiar (destino postgres)')
+    parser.add_argument('--directorio', default='datos_sinteticos', help='Carpeta de las páginas JSON (destino json)')
+    parser.add_argument('--tamano-pagina', type=int, default=2000, help='Registros por página JSON')
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    generador = crear_generador(args)
+    tablas = args.tablas or TABLAS
+    print(f"Accidentes: {generador.accidentes:,} - registros: " +
+          ', '.join(f"{tabla} {generador.total(tabla):,}" for tabla in tablas), file=sys.stderr)
+
+    def avance(tabla, hechos, total):
+        print(f"{tabla}: {hechos:,}/{total:,}", file=sys.stderr)
+
+    if args.destino == 'postgres':
+        from src.config.settings import get_database_params
+        config = get_database_params()
+        if config is None:
+            print("No hay configuración de base de datos. Configúrela desde la aplicación o en el archivo .env", file=sys.stderr)
+            return 2
+        copiar_a_postgres(generador, config, tablas, args.truncar, callback=avance)
+    else:
+        escribir_paginas_json(generador, args.directorio, args.tamano_pagina, tablas, callback=avance)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
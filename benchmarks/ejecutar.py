@@ -0,0 +1,386 @@
+"""Benchmarks repetibles de carga, consulta, filtrado, ordenamiento y exportación.
+
+Uso:
+    python -m benchmarks.ejecutar --accidentes 100000 [--grupos carga consultas memoria exportacion]
+        [--truncar] [--linea-base benchmarks/linea_base.json] [--guardar-linea-base] [--tolerancia 0.15]
+
+Grupos:
+    carga        carga completa y luego incremental de las cinco tablas con ModeloActualizacion
+                 contra el servidor ArcGIS simulado. VACÍA las tablas de la base configurada,
+                 por lo que solo se ejecuta con --truncar. Antes verifica el conteo de un lote
+                 real y, después de cada tabla, que la base tenga los registros esperados.
+    consultas    obtener_siniestros_por_fecha para 1 día, 1 mes, 1 año y 5 años (hasta --hasta)
+                 sobre los datos cargados
+    memoria      filtros y ordenamientos de la vista de consulta sobre 100k y 500k filas
+    exportacion  exportación a Excel (como la vista de consulta) y a CSV
+    arranque     importaciones de la ventana principal en un proceso nuevo (sin abrir ventanas)
+
+Cada ejecución se guarda en benchmarks/resultados/<fecha>.json. Si hay línea base, cada
+escenario se compara por su mediana: los que tarden más de (1 + tolerancia) veces lo
+registrado se reportan como regresión y el proceso termina con código 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Agrega la carpeta raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import API_URLS, CAPAS_API, CONFIG_TABLAS, get_database_params
+from benchmarks.datos_sinteticos import GeneradorSiniestros, TABLAS, agregar_argumentos_datos, crear_generador, filas_consulta
+from benchmarks.servidor_arcgis import ServidorArcGIS
+
+GRUPOS = ['carga', 'consultas', 'memoria', 'exportacion', 'arranque']
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+CARPETA_RESULTADOS = os.path.join(CARPETA, 'resultados')
+LINEA_BASE = os.path.join(CARPETA, 'linea_base.json')
+
+RANGOS_CONSULTA = {'1_dia': 1, '1_mes': 30, '1_anio': 365, '5_anios': 5 * 365}
+FILTROS_MEMORIA = {
+    'localidad': {'localidad': 'KENNEDY'},
+    'vehiculo': {'vehiculo': 'MOTOCICLETA'},
+    'hora': {'hora_inicio': '06:00', 'hora_fin': '09:00'},
+    'combinado': {'localidad': 'SUBA', 'estado': 'HERIDO', 'hora_inicio': '06:00', 'hora_fin': '20:00'}
+}
+ORDENES_MEMORIA = ['ID', 'Fecha', 'Localidad', 'Fallecidos']
+# Lo que importa src/main.py antes de mostrar la ventana principal
+MODULOS_ARRANQUE = ['src.controllers.main_controller', 'src.models.arranque', 'src.views.main_view', 'src.views.splash_view']
+
+
+def medir(funcion, repeticiones):
+    """Ejecuta la función varias veces; retorna el resultado del escenario con la mediana de los tiempos.
+    La función retorna los registros procesados (y opcionalmente un dict de detalle).
+    """
+    tiempos = []
+    registros, detalle = 0, None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+        registros, detalle = resultado if isinstance(resultado, tuple) else (resultado, None)
+    mediana = statistics.median(tiempos)
+    escenario = {
+        'segundos': round(mediana, 4),
+        'min': round(min(tiempos), 4),
+        'max': round(max(tiempos), 4),
+        'repeticiones': repeticiones,
+        'registros': registros,
+        'registros_por_segundo': round(registros / mediana, 1) if mediana > 0 else None
+    }
+    if detalle:
+        escenario['detalle'] = detalle
+    return escenario
+
+
+def _vaciar_tablas(config_bd):
+    import psycopg2
+
+    conexion = psycopg2.connect(**config_bd)
+    try:
+        with conexion.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(CONFIG_TABLAS[tabla]['nombre_tabla'] for tabla in TABLAS)}")
+        conexion.commit()
+    finally:
+        conexion.close()
+
+
+def verificar_insercion_lote(generador, config_bd, cantidad=50):
+    """Inserta un lote real con ModeloActualizacion._insertar_lote en una copia de accidente
+    (dentro de una transacción que se revierte) y exige que el conteo retornado sea exacto.
+    """
+    import pandas as pd
+    import psycopg2
+    from src.models.plan_carga import PlanCarga
+    from src.models.update_model import ModeloActualizacion
+
+    tabla = 'qtrazer_verificacion_lote'
+    conexion = psycopg2.connect(**config_bd)
+    try:
+        cursor = conexion.cursor()
+        cursor.execute(f"CREATE TABLE {tabla} (LIKE {CONFIG_TABLAS['Accidente']['nombre_tabla']} INCLUDING ALL)")
+        plan = PlanCarga.compilar(cursor, 'Accidente', tabla)
+        filas, _ = plan.preparar(pd.DataFrame(list(generador.registros('Accidente', 0, cantidad))))
+        modelo = ModeloActualizacion()
+        insertados, rechazos = modelo._insertar_lote(cursor, plan.consulta, filas)
+        cursor.execute(f"SELECT count(*) FROM {tabla}")
+        en_tabla = cursor.fetchone()[0]
+        if insertados != len(filas) or en_tabla != len(filas) or rechazos:
+            raise Exception(f"_insertar_lote retornó {insertados} insertados de {len(filas)} "
+                            f"({en_tabla} en la tabla, {len(rechazos)} rechazados)")
+        # Repetido, ON CONFLICT DO NOTHING no inserta nada
+        repetidos, _ = modelo._insertar_lote(cursor, plan.consulta, filas)
+        if repetidos != 0:
+            raise Exception(f"_insertar_lote retornó {repetidos} insertados al repetir el lote")
+    finally:
+        conexion.rollback()
+        conexion.close()
+
+
+def _contar_registros(config_bd, tabla):
+    import psycopg2
+
+    conexion = psycopg2.connect(**config_bd)
+    try:
+        with conexion.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {CONFIG_TABLAS[tabla]['nombre_tabla']}")
+            return cursor.fetchone()[0]
+    finally:
+        conexion.close()
+
+
+def _actualizar_contra(generador, fallas):
+    """Actualiza las cinco tablas desde un servidor simulado con el generador; retorna (insertados, detalle)"""
+    from src.models.update_model import ModeloActualizacion
+
+    servidor = ServidorArcGIS(generador, puerto=0, fallas=fallas)
+    servidor.iniciar_en_hilo()
+    API_URLS.update({tabla: f"{servidor.url_base}/{capa}/query" for tabla, capa in CAPAS_API.items()})
+    try:
+        config = get_database_params()
+        modelo = ModeloActualizacion()
+        insertados = 0
+        por_tabla = {}
+        for tabla in TABLAS:
+            antes = _contar_registros(config, tabla)
+            inicio = time.perf_counter()
+            if not modelo.actualizar_datos(tabla, forzar=True):
+                raise Exception(f"La actualización de {tabla} falló")
+            segundos = time.perf_counter() - inicio
+            # Lo que llegó a la base de datos, no lo que reporta el modelo
+            en_tabla = _contar_registros(config, tabla)
+            if en_tabla != generador.total(tabla):
+                raise Exception(f"{tabla} quedó con {en_tabla} registros; se esperaban {generador.total(tabla)}")
+            resumen = modelo.ultimo_resumen or {}
+            insertados += en_tabla - antes
+            por_tabla[tabla] = {'segundos': round(segundos, 4), 'insertados': en_tabla - antes,
+                                'reportados': resumen.get('insertados', 0), 'paginas': resumen.get('paginas', 0)}
+        return insertados, {'tablas': por_tabla, 'solicitudes': servidor.solicitudes,
+                            'fallas_inyectadas': dict(servidor.fallas_inyectadas)}
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def escenarios_carga(args, generador):
+    """Carga completa sobre tablas vacías y luego incremental con args.incremento más accidentes"""
+    config = get_database_params()
+    fallas = {'latencia': args.latencia, 'errores': args.errores, 'limite_tasa': args.limite_tasa}
+    verificar_insercion_lote(generador, config)
+    _vaciar_tablas(config)
+    resultados = {'carga_completa': medir(lambda: _actualizar_contra(generador, fallas), 1)}
+
+    # Con la misma semilla el generador mayor repite los registros anteriores y agrega los nuevos
+    ampliado = GeneradorSiniestros(int(generador.accidentes * (1 + args.incremento)) + 1, generador.semilla,
+                                   generador.fecha_inicio, generador.fecha_fin)
+    resultados['carga_incremental'] = medir(lambda: _actualizar_contra(ampliado, fallas), 1)
+    return resultados
+
+
+def escenarios_consultas(args, generador):
+    from src.models.database import GestorBaseDatos
+
+    resultados = {}
+    for nombre, dias in RANGOS_CONSULTA.items():
+        fecha_inicio = generador.fecha_fin - timedelta(days=dias - 1)
+        consulta = lambda: len(GestorBaseDatos().obtener_siniestros_por_fecha(fecha_inicio, generador.fecha_fin))
+        resultados[f"consulta_{nombre}"] = medir(consulta, args.repeticiones)
+    return resultados
+
+
+def _filas_memoria(generador, cantidad, base=100000):
+    """Filas de resultados en el orden de la consulta (por fecha). Las primeras `base` se generan;
+    el resto las repite con OBJECTID y formulario nuevos para no generar millones de registros.
+    """
+    filas = filas_consulta(generador, min(cantidad, base))
+    originales = len(filas)
+    copia = 1
+    while len(filas) < cantidad:
+        desplazamiento = copia * originales
+        filas.extend((fila[0] + desplazamiento, f"{fila[1]}-{copia}") + fila[2:]
+                     for fila in filas[:min(originales, cantidad - len(filas))])
+        copia += 1
+    filas.sort(key=lambda fila: fila[2])
+    return filas
+
+
+def escenarios_memoria(args, generador):
+    from src.models.resultados_consulta import filtrar_siniestros, ordenar_siniestros
+
+    resultados = {}
+    for cantidad in args.filas_memoria:
+        filas = _filas_memoria(generador, cantidad)
+        sufijo = f"{cantidad // 1000}k"
+        for nombre, filtros in FILTROS_MEMORIA.items():
+            filtrar = lambda: (len(filas), {'resultado': len(filtrar_siniestros(filas, filtros))})
+            resultados[f"filtro_{nombre}_{sufijo}"] = medir(filtrar, args.repeticiones)
+        for columna in ORDENES_MEMORIA:
+            resultados[f"orden_{columna.lower()}_{sufijo}"] = medir(lambda: len(ordenar_siniestros(filas, columna, True)), args.repeticiones)
+    return resultados
+
+
+def escenarios_exportacion(args, generador):
+    import pandas as pd
+    from src.models.resultados_consulta import COLUMNAS_VISTA, escribir_excel
+
+    df = pd.DataFrame(_filas_memoria(generador, args.filas_exportacion), columns=COLUMNAS_VISTA)
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix='qtrazer_benchmark_') as carpeta:
+        def excel():
+            destino = escribir_excel(df, os.path.join(carpeta, 'siniestros.xlsx'))
+            return len(df), {'bytes': os.path.getsize(destino)}
+
+        def csv():
+            destino = os.path.join(carpeta, 'siniestros.csv')
+            df.to_csv(destino, index=False, encoding='utf-8-sig')
+            return len(df), {'bytes': os.path.getsize(destino)}
+
+        resultados['exportacion_excel'] = medir(excel, args.repeticiones_exportacion)
+        resultados['exportacion_csv'] = medir(csv, args.repeticiones_exportacion)
+    return resultados
+
+
+def escenarios_arranque(args, generador):
+    raiz = os.path.dirname(CARPETA)
+    codigo = f"import {', '.join(MODULOS_ARRANQUE)}"
+
+    def importar():
+        proceso = subprocess.run([sys.executable, '-c', codigo], cwd=raiz, capture_output=True, text=True)
+        if proceso.returncode != 0:
+            raise Exception(proceso.stderr.strip().splitlines()[-1])
+        return 0
+
+    return {'arranque_importaciones': medir(importar, args.repeticiones)}
+
+
+def comparar(actual, linea_base, tolerancia, diferencia_minima=0.005):
+    """Compara las medianas con la línea base; retorna [{escenario, base, actual, cambio, regresion}].
+    Las diferencias menores a diferencia_minima segundos no cuentan como regresión (ruido de medición).
+    """
+    comparacion = []
+    for nombre, escenario in actual['escenarios'].items():
+        base = linea_base['escenarios'].get(nombre)
+        if not base or not base.get('segundos') or 'segundos' not in escenario:
+            continue
+        cambio = escenario['segundos'] / base['segundos'] - 1
+        comparacion.append({
+            'escenario': nombre,
+            'base': base['segundos'],
+            'actual': escenario['segundos'],
+            'cambio': round(cambio, 4),
+            'regresion': cambio > tolerancia and escenario['segundos'] - base['segundos'] > diferencia_minima
+        })
+    return comparacion
+
+
+def imprimir_resultados(resultados, comparacion):
+    cambios = {fila['escenario']: fila for fila in comparacion}
+    print(f"\n{'Escenario':<32}{'Mediana (s)':>12}{'Registros/s':>14}{'Línea base':>12}{'Cambio':>9}")
+    for nombre, escenario in resultados['escenarios'].items():
+        if 'error' in escenario:
+            print(f"{nombre:<32}  ERROR: {escenario['error']}")
+            continue
+        fila = cambios.get(nombre)
+        base = f"{fila['base']:.4f}" if fila else '-'
+        cambio = f"{fila['cambio']:+.0%}" if fila else '-'
+        marca = '  REGRESIÓN' if fila and fila['regresion'] else ''
+        por_segundo = escenario['registros_por_segundo']
+        print(f"{nombre:<32}{escenario['segundos']:>12.4f}{por_segundo if por_segundo is not None else '-':>14}"
+              f"{base:>12}{cambio:>9}{marca}")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.ejecutar',
+        description='Ejecuta los benchmarks de Qtrazer y los compara con una línea base.'
+    )
+    agregar_argumentos_datos(parser)
+    parser.add_argument('--grupos', nargs='+', choices=GRUPOS, default=GRUPOS)
+    parser.add_argument('--truncar', action='store_true', help='Permite vaciar las tablas para el grupo carga')
+    parser.add_argument('--incremento', type=float, default=0.05, help='Fracción de accidentes nuevos en la carga incremental')
+    parser.add_argument('--latencia', type=float, default=0.0, help='Latencia del servidor simulado (segundos)')
+    parser.add_argument('--errores', type=float, default=0.0, help='Fracción de respuestas 503 del servidor simulado')
+    parser.add_argument('--limite-tasa', type=float, help='Solicitudes por segundo del servidor simulado')
+    parser.add_argument('--filas-memoria', type=int, nargs='+', default=[100000, 500000])
+    parser.add_argument('--filas-exportacion', type=int, default=100000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--repeticiones-exportacion', type=int, default=1)
+    parser.add_argument('--linea-base', default=LINEA_BASE)
+    parser.add_argument('--guardar-linea-base', action='store_true', help='Guardar esta ejecución como línea base')
+    parser.add_argument('--tolerancia', type=float, default=0.15, help='Aumento relativo de la mediana aceptado (0.15 = 15%%)')
+    parser.add_argument('--diferencia-minima', type=float, default=0.005, help='Segundos de aumento por debajo de los cuales no hay regresión')
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    generador = crear_generador(args)
+
+    grupos = list(args.grupos)
+    if 'carga' in grupos and not args.truncar:
+        print("El grupo carga vacía las tablas de la base configurada; se omite (use --truncar)", file=sys.stderr)
+        grupos.remove('carga')
+    if ({'carga', 'consultas'} & set(grupos)) and get_database_params() is None:
+        print("No hay configuración de base de datos; se omiten carga y consultas", file=sys.stderr)
+        grupos = [grupo for grupo in grupos if grupo not in ('carga', 'consultas')]
+
+    resultados = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'entorno': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'procesadores': os.cpu_count()
+        },
+        'parametros': {
+            'accidentes': generador.accidentes,
+            'semilla': generador.semilla,
+            'grupos': grupos,
+            'repeticiones': args.repeticiones
+        },
+        'escenarios': {}
+    }
+    funciones = {'carga': escenarios_carga, 'consultas': escenarios_consultas,
+                 'memoria': escenarios_memoria, 'exportacion': escenarios_exportacion,
+                 'arranque': escenarios_arranque}
+    for grupo in grupos:
+        print(f"Ejecutando {grupo}...", file=sys.stderr)
+        try:
+            resultados['escenarios'].update(funciones[grupo](args, generador))
+        except Exception as e:
+            resultados['escenarios'][grupo] = {'error': str(e)}
+
+    os.makedirs(CARPETA_RESULTADOS, exist_ok=True)
+    ruta = os.path.join(CARPETA_RESULTADOS, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    comparacion = []
+    if os.path.exists(args.linea_base) and not args.guardar_linea_base:
+        with open(args.linea_base, 'r', encoding='utf-8') as f:
+            comparacion = comparar(resultados, json.load(f), args.tolerancia, args.diferencia_minima)
+        resultados['comparacion'] = {'linea_base': args.linea_base, 'tolerancia': args.tolerancia, 'escenarios': comparacion}
+
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    if args.guardar_linea_base:
+        with open(args.linea_base, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    imprimir_resultados(resultados, comparacion)
+    print(f"\nResultados guardados en {ruta}")
+    regresiones = [fila['escenario'] for fila in comparacion if fila['regresion']]
+    if regresiones:
+        print(f"Regresiones frente a la línea base: {', '.join(regresiones)}")
+        return 1
+    if any('error' in escenario for escenario in resultados['escenarios'].values()):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""Servidor local que simula las capas del FeatureServer de ArcGIS con datos sintéticos.
+
+Uso:
+    python -m benchmarks.servidor_arcgis --filas 1000000 [--puerto 8766] [--latencia 0.2 --errores 0.02 --limite-tasa 5]
+
+Para que la aplicación (o la actualización sin interfaz) lo use:
+    QTRAZER_API_URL=http://127.0.0.1:8766/FeatureServer
+
+Rutas:
+    GET /FeatureServer/<capa>?f=json          metadatos de la capa (campos, maxRecordCount, editingInfo)
+    GET /FeatureServer/<capa>/query?...       where, outFields, orderByFields, resultOffset,
+                                              resultRecordCount, returnCountOnly, returnIdsOnly, outStatistics
+
+El where solo admite condiciones sobre OBJECTID unidas con AND (1=1, >, >=, <, <=, =),
+que son las que usan la actualización, la reconciliación y el detector de cambios.
+
+Fallas inyectables (con semilla propia para que sean reproducibles):
+    latencia / variación   espera antes de responder cada solicitud
+    errores                fracción de respuestas HTTP 503
+    errores_json           fracción de respuestas HTTP 200 con {'error': {'code': 500}} (como ArcGIS)
+    cortes                 fracción de conexiones cerradas sin responder
+    limite_tasa            solicitudes por segundo; las excedentes reciben HTTP 429 con Retry-After
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Agrega la carpeta raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import CAPAS_API, COLUMNAS_FECHA
+from benchmarks.datos_sinteticos import agregar_argumentos_datos, campos_api, crear_generador
+
+logger = logging.getLogger(__name__)
+
+FALLAS = {
+    'latencia': 0.0,  # segundos
+    'variacion_latencia': 0.0,  # segundos adicionales al azar entre 0 y este valor
+    'errores': 0.0,
+    'errores_json': 0.0,
+    'cortes': 0.0,
+    'limite_tasa': None,  # solicitudes por segundo; None sin límite
+    'semilla': 0
+}
+
+_CONDICION = re.compile(r"^\s*OBJECTID\s*(>=|<=|>|<|=)\s*(\d+)\s*$", re.IGNORECASE)
+
+
+class ErrorConsulta(Exception):
+    """Parámetro no soportado o inválido; se responde como error 400 de ArcGIS."""
+
+
+def rango_where(where, total):
+    """Convierte el where en el rango de posiciones [inicio, fin) de los registros (OBJECTID = posición + 1)"""
+    inicio, fin = 0, total
+    for condicion in re.split(r"\s+AND\s+", (where or '1=1').strip(), flags=re.IGNORECASE):
+        if condicion.replace(' ', '') == '1=1':
+            continue
+        coincidencia = _CONDICION.match(condicion)
+        if not coincidencia:
+            raise ErrorConsulta(f"Condición no soportada: {condicion}")
+        operador, valor = coincidencia.group(1), int(coincidencia.group(2))
+        if operador == '>':
+            inicio = max(inicio, valor)
+        elif operador == '>=':
+            inicio = max(inicio, valor - 1)
+        elif operador == '<':
+            fin = min(fin, valor - 1)
+        elif operador == '<=':
+            fin = min(fin, valor)
+        else:
+            inicio, fin = max(inicio, valor - 1), min(fin, valor)
+    return inicio, max(inicio, fin)
+
+
+def tipo_campo(campo, muestra):
+    if campo == 'OBJECTID':
+        return 'esriFieldTypeOID'
+    if campo in COLUMNAS_FECHA:
+        return 'esriFieldTypeDate'
+    if isinstance(muestra.get(campo), int):
+        return 'esriFieldTypeInteger'
+    return 'esriFieldTypeString'
+
+
+def calcular_estadisticas(registros, estadisticas):
+    """Aplica count, sum, min y max de outStatistics sobre los registros"""
+    acumulados = [None] * len(estadisticas)
+    conteos = [0] * len(estadisticas)
+    campos = [estadistica['onStatisticField'].upper() for estadistica in estadisticas]
+    tipos = [estadistica['statisticType'].lower() for estadistica in estadisticas]
+    for registro in registros:
+        for indice, campo in enumerate(campos):
+            valor = registro.get(campo)
+            if valor is None:
+                continue
+            conteos[indice] += 1
+            actual = acumulados[indice]
+            tipo = tipos[indice]
+            if tipo == 'sum':
+                acumulados[indice] = (actual or 0) + valor
+            elif tipo == 'min':
+                acumulados[indice] = valor if actual is None or valor < actual else actual
+            elif tipo == 'max':
+                acumulados[indice] = valor if actual is None or valor > actual else actual
+    atributos = {}
+    for indice, estadistica in enumerate(estadisticas):
+        if tipos[indice] not in ('count', 'sum', 'min', 'max'):
+            raise ErrorConsulta(f"Estadística no soportada: {estadistica['statisticType']}")
+        nombre = estadistica.get('outStatisticFieldName') or f"{tipos[indice]}_{campos[indice]}"
+        atributos[nombre] = conteos[indice] if tipos[indice] == 'count' else acumulados[indice]
+    return atributos
+
+
+class ManejadorArcGIS(BaseHTTPRequestHandler):
+    """Atiende los metadatos y las consultas de las capas simuladas."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'QtrazerArcGISSimulado/1.0'
+
+    def log_message(self, formato, *args):
+        logger.debug("[arcgis simulado] %s " + formato, self.address_string(), *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parametros = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+        partes = [parte for parte in url.path.split('/') if parte]
+        consulta = bool(partes) and partes[-1] == 'query'
+        if consulta:
+            partes.pop()
+        tabla = self.server.tablas_por_capa.get(partes[-1]) if partes else None
+        if tabla is None:
+            self._responder_json(404, {'error': {'code': 404, 'message': f"Capa no encontrada: {url.path}"}})
+            return
+
+        try:
+            falla = self.server.aplicar_fallas()
+            if falla == 'corte':
+                self.close_connection = True  # el servidor cierra el socket sin escribir la respuesta
+                return
+            if falla == 'limite':
+                self._responder_json(429, {'error': {'code': 429, 'message': 'Too many requests'}},
+                                     {'Retry-After': str(self.server.espera_limite())})
+            elif falla == 'error':
+                self._responder_json(503, {'error': {'code': 503, 'message': 'Service unavailable'}})
+            elif falla == 'error_json':
+                self._responder_json(200, {'error': {'code': 500, 'message': 'Unable to complete operation.'}})
+            elif consulta:
+                self._responder_json(200, self.server.consultar(tabla, parametros))
+            else:
+                self._responder_json(200, self.server.metadatos(tabla))
+        except ErrorConsulta as e:
+            self._responder_json(200, {'error': {'code': 400, 'message': str(e)}})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # el cliente cerró la conexión
+
+    def _responder_json(self, estado, datos, encabezados=None):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        for nombre, valor in (encabezados or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+
+class ServidorArcGIS(ThreadingHTTPServer):
+    """Sirve las cinco capas de un GeneradorSiniestros con fallas configurables."""
+
+    daemon_threads = True
+
+    def __init__(self, generador, host='127.0.0.1', puerto=8766, fallas=None, max_record_count=2000,
+                 ultima_edicion=None):
+        self.generador = generador
+        self.fallas = dict(FALLAS, **(fallas or {}))
+        self.max_record_count = max_record_count
+        self.ultima_edicion = ultima_edicion or int(time.time() * 1000)
+        self.tablas_por_capa = {str(capa): tabla for tabla, capa in CAPAS_API.items()}
+        self.solicitudes = 0
+        self.fallas_inyectadas = {'corte': 0, 'limite': 0, 'error': 0, 'error_json': 0}
+        self._rng = random.Random(self.fallas['semilla'])
+        self._lock = threading.Lock()
+        self._ventana = []  # instantes de las solicitudes del último segundo para el límite de tasa
+        super().__init__((host, puerto), ManejadorArcGIS)
+
+    @property
+    def url_base(self):
+        host, puerto = self.server_address[:2]
+        return f"http://{host}:{puerto}/FeatureServer"
+
+    def aplicar_fallas(self):
+        """Espera la latencia configurada y decide si la solicitud falla; retorna el tipo de falla o None"""
+        with self._lock:
+            self.solicitudes += 1
+            espera = self.fallas['latencia'] + self._rng.random() * self.fallas['variacion_latencia']
+            sorteo = self._rng.random()
+            falla = None
+            if self.fallas['limite_tasa']:
+                ahora = time.monotonic()
+                self._ventana = [instante for instante in self._ventana if ahora - instante < 1.0]
+                if len(self._ventana) >= self.fallas['limite_tasa']:
+                    falla = 'limite'
+                else:
+                    self._ventana.append(ahora)
+            if falla is None:
+                for tipo, clave in (('corte', 'cortes'), ('error', 'errores'), ('error_json', 'errores_json')):
+                    if sorteo < self.fallas[clave]:
+                        falla = tipo
+                        break
+                    sorteo -= self.fallas[clave]
+            if falla:
+                self.fallas_inyectadas[falla] += 1
+        if espera and falla != 'limite':
+            time.sleep(espera)
+        return falla
+
+    def espera_limite(self):
+        return max(1, round(1 / self.fallas['limite_tasa']))
+
+    def metadatos(self, tabla):
+        muestra = next(self.generador.registros(tabla, 0, 1), {})
+        return {
+            'id': CAPAS_API[tabla],
+            'name': tabla,
+            'type': 'Feature Layer',
+            'objectIdField': 'OBJECTID',
+            'maxRecordCount': self.max_record_count,
+            'editingInfo': {'lastEditDate': self.ultima_edicion, 'dataLastEditDate': self.ultima_edicion},
+            'fields': [{'name': campo, 'type': tipo_campo(campo, muestra), 'alias': campo}
+                       for campo in campos_api(tabla)]
+        }
+
+    def consultar(self, tabla, parametros):
+        inicio, fin = rango_where(parametros.get('where'), self.generador.total(tabla))
+
+        if parametros.get('returnCountOnly', '').lower() == 'true':
+            return {'count': fin - inicio}
+        if parametros.get('returnIdsOnly', '').lower() == 'true':
+            return {'objectIdFieldName': 'OBJECTID', 'objectIds': list(range(inicio + 1, fin + 1))}
+        if parametros.get('outStatistics'):
+            try:
+                estadisticas = json.loads(parametros['outStatistics'])
+            except ValueError:
+                raise ErrorConsulta("outStatistics no es un JSON válido")
+            registros = self.generador.registros(tabla, inicio, fin - inicio)
+            return {'features': [{'attributes': calcular_estadisticas(registros, estadisticas)}]}
+
+        orden = parametros.get('orderByFields', 'OBJECTID').split()
+        if not orden or orden[0].upper() != 'OBJECTID':
+            raise ErrorConsulta(f"Solo se admite ordenar por OBJECTID: {parametros['orderByFields']}")
+        descendente = len(orden) > 1 and orden[1].upper() == 'DESC'
+
+        try:
+            desplazamiento = int(parametros.get('resultOffset', 0))
+            cantidad = int(parametros.get('resultRecordCount', self.max_record_count))
+        except ValueError:
+            raise ErrorConsulta("resultOffset y resultRecordCount deben ser enteros")
+        cantidad = max(0, min(cantidad, self.max_record_count))
+        disponibles = max(0, fin - inicio - desplazamiento)
+        if descendente:
+            hasta = max(inicio, fin - desplazamiento)
+            desde = max(inicio, hasta - cantidad)
+            registros = list(self.generador.registros(tabla, desde, hasta - desde))[::-1]
+        else:
+            registros = list(self.generador.registros(tabla, inicio + desplazamiento, min(cantidad, disponibles)))
+
+        campos = parametros.get('outFields', '*')
+        if campos.strip() != '*':
+            seleccion = [campo.strip().upper() for campo in campos.split(',') if campo.strip()]
+            registros = [{campo: registro.get(campo) for campo in seleccion} for registro in registros]
+
+        return {
+            'objectIdFieldName': 'OBJECTID',
+            'features': [{'attributes': registro} for registro in registros],
+            'exceededTransferLimit': disponibles > cantidad
+        }
+
+    def iniciar_en_hilo(self):
+        """Atiende en un hilo de fondo (para los benchmarks); detenerlo con shutdown() y server_close()"""
+        hilo = threading.Thread(target=self.serve_forever, daemon=True, name='servidor-arcgis')
+        hilo.start()
+        return hilo
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.servidor_arcgis',
+        description='Simula el FeatureServer de siniestros con datos sintéticos y fallas configurables.'
+    )
+    agregar_argumentos_datos(parser)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8766)
+    parser.add_argument('--max-record-count', type=int, default=2000, help='Registros máximos por página (maxRecordCount)')
+    parser.add_argument('--latencia', type=float, default=0.0, help='Segundos de espera por solicitud')
+    parser.add_argument('--variacion-latencia', type=float, default=0.0, help='Segundos adicionales al azar por solicitud')
+    parser.add_argument('--errores', type=float, default=0.0, help='Fracción de respuestas HTTP 503')
+    parser.add_argument('--errores-json', type=float, default=0.0, help='Fracción de respuestas 200 con objeto error')
+    parser.add_argument('--cortes', type=float, default=0.0, help='Fracción de conexiones cerradas sin respuesta')
+    parser.add_argument('--limite-tasa', type=float, help='Solicitudes por segundo antes de responder 429')
+    parser.add_argument('--semilla-fallas', type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    fallas = {
+        'latencia': args.latencia,
+        'variacion_latencia': args.variacion_latencia,
+        'errores': args.errores,
+        'errores_json': args.errores_json,
+        'cortes': args.cortes,
+        'limite_tasa': args.limite_tasa,
+        'semilla': args.semilla_fallas
+    }
+    servidor = ServidorArcGIS(crear_generador(args), args.host, args.puerto, fallas, args.max_record_count)
+    print(f"FeatureServer simulado en {servidor.url_base} ({servidor.generador.accidentes:,} accidentes)")
+    print(f"Use QTRAZER_API_URL={servidor.url_base}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
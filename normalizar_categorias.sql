@@ -0,0 +1,86 @@
+-- Script opcional para guardar las columnas categóricas como códigos (modo normalizado)
+-- Cada texto repetido (localidad, clase de vehículo, estado...) pasa a una tabla diccionario
+-- y la columna guarda su código SMALLINT. Qtrazer detecta el modo por el tipo de la columna:
+-- la carga registra los valores nuevos en los diccionarios y las consultas traducen los códigos.
+-- Ejecutar con la aplicación cerrada y con una copia de seguridad; puede repetirse sin efecto
+-- sobre las columnas ya convertidas.
+
+BEGIN;
+
+-- ============================================================================
+-- CONVERSIÓN DE UNA COLUMNA (DICCIONARIO + CÓDIGO)
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION pg_temp.normalizar_columna(tabla TEXT, columna TEXT, diccionario TEXT)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %I (codigo SMALLSERIAL PRIMARY KEY, valor TEXT NOT NULL UNIQUE)', diccionario);
+
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = tabla AND column_name = columna)
+        IN ('smallint', 'integer', 'bigint') THEN
+        RETURN;  -- ya normalizada
+    END IF;
+
+    EXECUTE format('INSERT INTO %I (valor) SELECT DISTINCT %I::text FROM %I WHERE %I IS NOT NULL ORDER BY 1 ON CONFLICT (valor) DO NOTHING',
+                   diccionario, columna, tabla, columna);
+    EXECUTE format('ALTER TABLE %I ADD COLUMN %I SMALLINT', tabla, columna || '_codigo');
+    EXECUTE format('UPDATE %I t SET %I = d.codigo FROM %I d WHERE d.valor = t.%I::text',
+                   tabla, columna || '_codigo', diccionario, columna);
+    -- Eliminar la columna de texto elimina también sus índices; se recrean al final
+    EXECUTE format('ALTER TABLE %I DROP COLUMN %I', tabla, columna);
+    EXECUTE format('ALTER TABLE %I RENAME COLUMN %I TO %I', tabla, columna || '_codigo', columna);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Mismos diccionarios que CONFIG_CATEGORIAS en src/config/settings.py
+SELECT pg_temp.normalizar_columna('accidente', 'localidad', 'dic_localidad');
+SELECT pg_temp.normalizar_columna('accidente', 'gravedad', 'dic_gravedad');
+SELECT pg_temp.normalizar_columna('accidente', 'clase_acc', 'dic_clase_acc');
+SELECT pg_temp.normalizar_columna('vm_acc_actor_vial', 'condicion_a', 'dic_condicion_actor');
+SELECT pg_temp.normalizar_columna('vm_acc_actor_vial', 'estado', 'dic_estado_actor');
+SELECT pg_temp.normalizar_columna('vm_acc_actor_vial', 'genero', 'dic_genero');
+SELECT pg_temp.normalizar_columna('vm_acc_causa', 'tipo_causa', 'dic_tipo_causa');
+SELECT pg_temp.normalizar_columna('vm_acc_causa', 'nombre', 'dic_nombre_causa');
+SELECT pg_temp.normalizar_columna('vm_acc_vehiculo', 'clase', 'dic_clase_vehiculo');
+SELECT pg_temp.normalizar_columna('vm_acc_vehiculo', 'servicio', 'dic_servicio_vehiculo');
+SELECT pg_temp.normalizar_columna('vm_acc_vial', 'material', 'dic_material_via');
+SELECT pg_temp.normalizar_columna('vm_acc_vial', 'estado', 'dic_estado_via');
+
+-- ============================================================================
+-- ÍNDICES SOBRE LAS COLUMNAS CONVERTIDAS (Configuracion_Postgres.sql)
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_accidente_localidad ON accidente(localidad);
+CREATE INDEX IF NOT EXISTS idx_actor_vial_estado ON vm_acc_actor_vial(estado);
+CREATE INDEX IF NOT EXISTS idx_actor_vial_condicion ON vm_acc_actor_vial(condicion_a);
+CREATE INDEX IF NOT EXISTS idx_vehiculo_clase ON vm_acc_vehiculo(clase);
+CREATE INDEX IF NOT EXISTS idx_causa_tipo ON vm_acc_causa(tipo_causa);
+CREATE INDEX IF NOT EXISTS idx_vial_material ON vm_acc_vial(material);
+CREATE INDEX IF NOT EXISTS idx_vial_estado ON vm_acc_vial(estado);
+
+-- ============================================================================
+-- PERMISOS PARA REGISTRAR VALORES NUEVOS DURANTE LA CARGA
+-- ============================================================================
+
+GRANT SELECT, INSERT ON ALL TABLES IN SCHEMA public TO "Por definir";
+GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO "Por definir";
+
+COMMIT;
+
+-- El UPDATE reescribe las tablas; VACUUM FULL (fuera de la transacción) recupera el espacio
+-- VACUUM FULL accidente, vm_acc_actor_vial, vm_acc_causa, vm_acc_vehiculo, vm_acc_vial;
+
+-- ============================================================================
+-- VERIFICACIÓN DE CAMBIOS
+-- ============================================================================
+
+SELECT
+    table_name,
+    column_name,
+    data_type
+FROM information_schema.columns
+WHERE table_name IN ('accidente', 'vm_acc_actor_vial', 'vm_acc_causa', 'vm_acc_vehiculo', 'vm_acc_vial')
+    AND column_name IN ('localidad', 'gravedad', 'clase_acc', 'condicion_a', 'estado', 'genero',
+                        'tipo_causa', 'nombre', 'clase', 'servicio', 'material')
+ORDER BY table_name, column_name;
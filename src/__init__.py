@@ -2,9 +2,24 @@
 Paquete principal de la aplicación
 """
 
-from .models.api_client import ClienteAPI
-from .models.database import GestorBaseDatos
-from .views.main_view import VistaPrincipal
-from .controllers.main_controller import ControladorPrincipal
+import importlib
+
+# Las clases se importan al primer uso para que los módulos sin interfaz
+# (por ejemplo src.cli) no carguen tkinter
+_EXPORTACIONES = {
+    'ClienteAPI': '.models.api_client',
+    'GestorBaseDatos': '.models.database',
+    'VistaPrincipal': '.views.main_view',
+    'ControladorPrincipal': '.controllers.main_controller'
+}
 
 __all__ = ['ClienteAPI', 'GestorBaseDatos', 'VistaPrincipal', 'ControladorPrincipal']
+
+
+def __getattr__(nombre):
+    if nombre in _EXPORTACIONES:
+        modulo = importlib.import_module(_EXPORTACIONES[nombre], __name__)
+        valor = getattr(modulo, nombre)
+        globals()[nombre] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
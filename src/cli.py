@@ -0,0 +1,209 @@
+"""Actualización de tablas desde la línea de comandos, sin interfaz gráfica.
+
+Uso:
+    python -m src.cli [--tablas Accidente ActorVial] [--forzar] [--reconciliar] [--log archivo.jsonl]
+    python -m src.cli --servicio [--tablas ...] [--log archivo.jsonl] [--log-nivel DEBUG]
+
+Con --servicio el proceso queda en ejecución y sincroniza cada capa en el
+intervalo de CONFIG_SINCRONIZACION hasta recibir Ctrl+C / SIGTERM. Donde
+existe SIGUSR1 (Linux/macOS), la señal alterna el nivel de log entre DEBUG e INFO.
+
+El progreso se emite como un objeto JSON por línea en la salida estándar (o en
+el archivo de --log); los mensajes de log se envían a la salida de errores.
+
+Códigos de salida:
+    0  todas las tablas se actualizaron
+    1  alguna tabla falló
+    2  error de configuración (sin configuración de base de datos, sin conexión o tabla desconocida)
+    3  actualización cancelada (Ctrl+C / SIGTERM)
+    4  hay otra sincronización en curso
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import time
+from datetime import datetime
+
+# Agrega la carpeta raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.log import NIVELES, cambiar_nivel, nivel_actual
+from src.models.eventos_progreso import texto_progreso
+
+SALIDA_OK = 0
+SALIDA_FALLO_TABLA = 1
+SALIDA_CONFIGURACION = 2
+SALIDA_CANCELADA = 3
+SALIDA_BLOQUEADA = 4
+
+_PATRON_ETIQUETA = re.compile(r'^\[([^\]]+)\]\s*(.*)$', re.DOTALL)
+
+
+class EmisorProgreso:
+    """Escribe los mensajes de progreso como JSON por línea."""
+
+    def __init__(self, salida, controlador=None):
+        self.salida = salida
+        self.controlador = controlador
+
+    def emitir(self, tipo, mensaje, porcentaje=None, **datos):
+        evento = {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'tipo': tipo,
+            'tabla': self.controlador.tabla_actual if self.controlador else None,
+            'mensaje': mensaje
+        }
+        if porcentaje is not None:
+            evento['porcentaje'] = round(porcentaje, 1)
+        evento.update(datos)
+        self.salida.write(json.dumps(evento, ensure_ascii=False) + '\n')
+        self.salida.flush()
+
+    def __call__(self, mensaje, porcentaje):
+        """Callback de progreso compatible con ModeloActualizacion."""
+        coincidencia = _PATRON_ETIQUETA.match(mensaje)
+        if coincidencia:
+            tipo, texto = coincidencia.group(1), coincidencia.group(2)
+        else:
+            tipo, texto = ('ERROR' if 'Error' in mensaje else 'INFO'), mensaje
+        self.emitir(tipo, texto, porcentaje)
+
+    def progreso(self, evento):
+        """Recibe los avances como eventos tipados (ver eventos_progreso)."""
+        datos = {clave: valor for clave, valor in evento.items() if clave not in ('tipo', 'tabla', 'porcentaje')}
+        if datos.get('tasa') is not None:
+            datos['tasa'] = round(datos['tasa'], 1)
+            datos['eta'] = round(datos['eta'])
+        self.emitir('PROGRESO', texto_progreso(evento), evento['porcentaje'], **datos)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m src.cli',
+        description='Actualiza las tablas de siniestros viales desde las APIs de ArcGIS sin interfaz gráfica.'
+    )
+    parser.add_argument('--tablas', nargs='+', metavar='TABLA',
+                        help='Tablas a actualizar (por defecto todas): Accidente, Accidente_via, Causa, AccidenteVehiculo, ActorVial')
+    parser.add_argument('--forzar', action='store_true',
+                        help='Consultar la API aunque los metadatos de la capa no indiquen cambios')
+    parser.add_argument('--reconciliar', action='store_true',
+                        help='Sincronizar también registros editados y eliminados en la API')
+    parser.add_argument('--servicio', action='store_true',
+                        help='Sincronizar de forma continua, cada capa en su propio intervalo')
+    parser.add_argument('--log', metavar='ARCHIVO',
+                        help='Agregar el progreso a este archivo en lugar de la salida estándar')
+    parser.add_argument('--log-nivel', choices=NIVELES, type=str.upper,
+                        help='Nivel de los mensajes de log en la salida de errores (por defecto QTRAZER_LOG_NIVEL o INFO)')
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    stdout_original = sys.stdout
+    salida = open(args.log, 'a', encoding='utf-8') if args.log else stdout_original
+    # Cualquier print de las dependencias no debe mezclarse con el JSON de progreso
+    sys.stdout = sys.stderr
+    emisor = EmisorProgreso(salida)
+
+    try:
+        from src.config.settings import get_database_params
+        from src.controllers.update_controller import TABLAS_ACTUALIZACION
+        import psycopg2
+
+        if args.log_nivel:
+            cambiar_nivel(args.log_nivel)
+
+        claves = [clave for clave, _ in TABLAS_ACTUALIZACION]
+        desconocidas = [tabla for tabla in (args.tablas or []) if tabla not in claves]
+        if desconocidas:
+            emisor.emitir('ERROR', f"Tablas desconocidas: {', '.join(desconocidas)}. Tablas válidas: {', '.join(claves)}")
+            return SALIDA_CONFIGURACION
+
+        config = get_database_params()
+        if config is None:
+            emisor.emitir('ERROR', "No hay configuración de base de datos. Configúrela desde la aplicación o en el archivo .env")
+            return SALIDA_CONFIGURACION
+        try:
+            psycopg2.connect(**config).close()
+        except psycopg2.Error as e:
+            emisor.emitir('ERROR', f"No fue posible establecer conexión con la base de datos: {str(e).strip()}")
+            return SALIDA_CONFIGURACION
+
+        # El bloqueo de sincronización lo toma ModeloActualizacion en la base de datos
+        if args.servicio:
+            return ejecutar_servicio(args, emisor)
+        return ejecutar_actualizacion(args, emisor, claves)
+    finally:
+        sys.stdout = stdout_original
+        if args.log:
+            salida.close()
+
+
+def ejecutar_servicio(args, emisor):
+    """Ejecuta el servicio de sincronización incremental hasta recibir una señal de detención"""
+    from src.models.servicio_sincronizacion import ServicioSincronizacion
+    from src.models.update_model import ModeloActualizacion
+
+    servicio = ServicioSincronizacion(ModeloActualizacion(), args.tablas, emisor)
+    emisor.controlador = servicio
+
+    def detener(signum, frame):
+        servicio.detener()
+
+    def alternar_nivel_log(signum, frame):
+        cambiar_nivel('INFO' if nivel_actual() == 'DEBUG' else 'DEBUG')
+
+    signal.signal(signal.SIGINT, detener)
+    signal.signal(signal.SIGTERM, detener)
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, alternar_nivel_log)
+
+    emisor.emitir('INICIO', "Servicio de sincronización iniciado", None,
+                  intervalos=servicio.intervalos, estado=servicio.ruta_estado)
+    servicio.ejecutar()
+    emisor.emitir('FIN', "Servicio de sincronización detenido", None, codigo_salida=SALIDA_OK)
+    return SALIDA_OK
+
+
+def ejecutar_actualizacion(args, emisor, claves):
+    """Ejecuta una sola actualización de las tablas seleccionadas"""
+    from src.controllers.update_controller import ControladorActualizacion
+
+    controlador = ControladorActualizacion()
+    emisor.controlador = controlador
+    cancelado = []
+
+    def cancelar(signum, frame):
+        cancelado.append(signum)
+        controlador.cancelar_actualizacion()
+
+    signal.signal(signal.SIGINT, cancelar)
+    signal.signal(signal.SIGTERM, cancelar)
+
+    tablas = args.tablas or claves
+    emisor.emitir('INICIO', f"Actualización sin interfaz de {len(tablas)} tablas", 0,
+                  tablas=tablas, forzar=args.forzar, reconciliar=args.reconciliar)
+    inicio = time.time()
+    resultados = controlador.actualizar_tablas(args.tablas, emisor, args.reconciliar, args.forzar)
+
+    if resultados is None:
+        codigo = SALIDA_BLOQUEADA
+        resultados = {}
+    elif cancelado:
+        codigo = SALIDA_CANCELADA
+    elif len(resultados) == len(tablas) and all(resultados.values()):
+        codigo = SALIDA_OK
+    else:
+        codigo = SALIDA_FALLO_TABLA
+    emisor.emitir('FIN', "Actualización finalizada", None, codigo_salida=codigo,
+                  resultados=resultados, duracion_segundos=round(time.time() - inicio, 1))
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
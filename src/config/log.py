@@ -0,0 +1,68 @@
+"""Configuración de los niveles de log de la aplicación.
+
+Cada módulo usa logging.getLogger(__name__), así que los niveles se pueden
+ajustar por módulo ('src.models.update_model') o por paquete ('src.models').
+Los mensajes usan formato diferido (logger.debug("... %s", valor)) para que
+los valores solo se formateen cuando el nivel está habilitado.
+"""
+
+import logging
+import sys
+
+RAIZ = 'src'  # logger padre de todos los módulos de la aplicación
+NIVELES = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
+
+_logger_raiz = logging.getLogger(RAIZ)
+
+
+class _ManejadorSalidaActual(logging.StreamHandler):
+    """Escribe en el sys.stderr vigente en cada mensaje (la CLI lo redirige)."""
+
+    def __init__(self):
+        super().__init__()
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, valor):
+        pass
+
+
+def leer_niveles_modulo(texto):
+    """Convierte 'src.models.update_model=DEBUG,src.views=WARNING' en un diccionario"""
+    niveles = {}
+    for parte in (texto or '').split(','):
+        if '=' in parte:
+            modulo, nivel = parte.split('=', 1)
+            niveles[modulo.strip()] = nivel.strip().upper()
+    return niveles
+
+
+def configurar_logging(nivel='INFO', niveles_modulo=None):
+    """Instala el manejador de la aplicación (una sola vez) y aplica los niveles"""
+    if not _logger_raiz.handlers:
+        manejador = _ManejadorSalidaActual()
+        manejador.setFormatter(logging.Formatter('%(levelname)s: [%(name)s] %(message)s'))
+        _logger_raiz.addHandler(manejador)
+        _logger_raiz.propagate = False
+    niveles = [(None, nivel)] + list((niveles_modulo or {}).items())
+    for modulo, nivel_modulo in niveles:
+        try:
+            cambiar_nivel(nivel_modulo, modulo)
+        except ValueError as e:
+            _logger_raiz.warning("%s; se conserva el nivel anterior", e)
+
+
+def cambiar_nivel(nivel, modulo=None):
+    """Cambia en caliente el nivel de la aplicación o de un módulo/paquete"""
+    nivel = nivel.upper() if isinstance(nivel, str) else logging.getLevelName(nivel)
+    if nivel not in NIVELES:
+        raise ValueError(f"Nivel de log inválido: {nivel}. Niveles válidos: {', '.join(NIVELES)}")
+    logging.getLogger(modulo or RAIZ).setLevel(nivel)
+
+
+def nivel_actual(modulo=None):
+    """Nombre del nivel efectivo de la aplicación o de un módulo"""
+    return logging.getLevelName(logging.getLogger(modulo or RAIZ).getEffectiveLevel())
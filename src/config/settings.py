@@ -1,35 +1,48 @@
 """Configuración de la aplicación."""
+import logging
 import os
 import sys
 from dotenv import load_dotenv
 
+from src.config.log import configurar_logging, leer_niveles_modulo
+
+# Niveles de log: QTRAZER_LOG_NIVEL para toda la aplicación y
+# QTRAZER_LOG_MODULOS="src.models.update_model=DEBUG,src.views=WARNING" por módulo
+CONFIG_LOG = {
+    'nivel': os.getenv('QTRAZER_LOG_NIVEL', 'INFO').upper(),
+    'niveles_modulo': leer_niveles_modulo(os.getenv('QTRAZER_LOG_MODULOS', ''))
+}
+configurar_logging(CONFIG_LOG['nivel'], CONFIG_LOG['niveles_modulo'])
+
+logger = logging.getLogger(__name__)
+
 def get_database_config():
     """Configuración inteligente basada en el entorno de ejecución"""
     
     if getattr(sys, 'frozen', False):
         # EJECUTABLE (.exe) - desde cualquier ubicación
-        print("Ejecutando desde ejecutable (.exe)")
+        logger.info("Ejecutando desde ejecutable (.exe)")
         
         # Intentar cargar configuración guardada previamente
         saved_config = load_saved_config_from_file()
         if saved_config:
-            print("Configuración guardada encontrada y cargada automáticamente")
+            logger.info("Configuración guardada encontrada y cargada automáticamente")
             return saved_config
         else:
-            print("No hay configuración previa, se mostrará interfaz de configuración")
+            logger.info("No hay configuración previa, se mostrará interfaz de configuración")
             return None
     else:
         # CÓDIGO FUENTE (VS Code, terminal)
-        print("Ejecutando desde código fuente (desarrollo)")
+        logger.info("Ejecutando desde código fuente (desarrollo)")
         
         # Intentar cargar configuración guardada previamente
         saved_config = load_saved_config_from_file()
         if saved_config:
-            print("Configuración guardada encontrada y cargada automáticamente")
+            logger.info("Configuración guardada encontrada y cargada automáticamente")
             return saved_config
         
         if os.path.exists('.env'):
-            print("Archivo .env encontrado, cargando...")
+            logger.info("Archivo .env encontrado, cargando...")
             load_dotenv()
             return {
                 'dbname': os.getenv('DB_NAME', 'Siniestros'),
@@ -39,7 +52,7 @@ def get_database_config():
                 'port': os.getenv('DB_PORT', '5432')
             }
         else:
-            print("Archivo .env no encontrado, usando valores por defecto")
+            logger.info("Archivo .env no encontrado, usando valores por defecto")
             return {
                 'dbname': 'Siniestros',
                 'user': 'Analyst',
@@ -48,34 +61,34 @@ def get_database_config():
                 'port': '5432'
             }
 
+def obtener_directorio_config():
+    """Retorna el directorio de qtrazer_config.json y de los archivos de estado de la aplicación"""
+    if getattr(sys, 'frozen', False):
+        # Si es ejecutable (.exe), usar el directorio del usuario
+        return os.path.expanduser("~\\AppData\\Local\\Qtrazer")
+    # Si es desarrollo, usar el directorio del proyecto
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 def load_saved_config_from_file():
     """Carga la configuración guardada desde el archivo JSON"""
     try:
         import json
         import os
         
-        # Determinar la ruta del archivo de configuración
-        if getattr(sys, 'frozen', False):
-            # Si es ejecutable (.exe), buscar en el directorio del usuario
-            config_dir = os.path.expanduser("~\\AppData\\Local\\Qtrazer")
-        else:
-            # Si es desarrollo, buscar en el directorio del proyecto
-            config_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        
-        config_file = os.path.join(config_dir, 'qtrazer_config.json')
+        config_file = os.path.join(obtener_directorio_config(), 'qtrazer_config.json')
         
         # Verificar si existe el archivo de configuración
         if os.path.exists(config_file):
             with open(config_file, 'r', encoding='utf-8') as f:
                 config = json.load(f)
-            print(f"Configuración cargada desde: {config_file}")
+            logger.info("Configuración cargada desde: %s", config_file)
             return config
         else:
-            print(f"Archivo de configuración no encontrado: {config_file}")
+            logger.info("Archivo de configuración no encontrado: %s", config_file)
             return None
             
     except Exception as e:
-        print(f"Error al cargar archivo de configuración: {str(e)}")
+        logger.error("Error al cargar archivo de configuración: %s", e)
         return None
 
 # Cargar configuración inicial
@@ -85,7 +98,7 @@ def update_database_config(new_config):
     """Actualiza la configuración de la base de datos dinámicamente"""
     global PARAMETROS_BD
     PARAMETROS_BD = new_config
-    print("Configuración de base de datos actualizada dinámicamente")
+    logger.info("Configuración de base de datos actualizada dinámicamente")
 
 def get_current_database_config():
     """Retorna la configuración actual de la base de datos"""
@@ -157,13 +170,147 @@ CONFIG_TABLAS = {
     }
 }
 
-# URLs de las APIs
-API_URLS = {
-    'Accidente': "https://sig.simur.gov.co/arcgis/rest/services/Accidentalidad/AccidentalidadAnalisis/FeatureServer/2/query",
-    'Accidente_via': "https://sig.simur.gov.co/arcgis/rest/services/Accidentalidad/AccidentalidadAnalisis/FeatureServer/6/query",
-    'Causa': "https://sig.simur.gov.co/arcgis/rest/services/Accidentalidad/AccidentalidadAnalisis/FeatureServer/4/query",
-    'AccidenteVehiculo': "https://sig.simur.gov.co/arcgis/rest/services/Accidentalidad/AccidentalidadAnalisis/FeatureServer/5/query",
-    'ActorVial': "https://sig.simur.gov.co/arcgis/rest/services/Accidentalidad/AccidentalidadAnalisis/FeatureServer/3/query"
+# Columnas categóricas que el modo normalizado (normalizar_categorias.sql) guarda como códigos
+# SMALLINT; cada una tiene su tabla diccionario (codigo, valor). Sin el script se guardan como texto.
+CONFIG_CATEGORIAS = {
+    'Accidente': {'localidad': 'dic_localidad', 'gravedad': 'dic_gravedad', 'clase_acc': 'dic_clase_acc'},
+    'ActorVial': {'condicion_a': 'dic_condicion_actor', 'estado': 'dic_estado_actor', 'genero': 'dic_genero'},
+    'Causa': {'tipo_causa': 'dic_tipo_causa', 'nombre': 'dic_nombre_causa'},
+    'AccidenteVehiculo': {'clase': 'dic_clase_vehiculo', 'servicio': 'dic_servicio_vehiculo'},
+    'Accidente_via': {'material': 'dic_material_via', 'estado': 'dic_estado_via'}
+}
+
+# URLs de las APIs; QTRAZER_API_URL reemplaza el FeatureServer (p. ej. por el servidor simulado de benchmarks)
+API_URL_BASE = os.getenv(
+    'QTRAZER_API_URL',
+    "https://sig.simur.gov.co/arcgis/rest/services/Accidentalidad/AccidentalidadAnalisis/FeatureServer"
+).rstrip('/')
+CAPAS_API = {
+    'Accidente': 2,
+    'Accidente_via': 6,
+    'Causa': 4,
+    'AccidenteVehiculo': 5,
+    'ActorVial': 3
+}
+API_URLS = {tabla: f"{API_URL_BASE}/{capa}/query" for tabla, capa in CAPAS_API.items()}
+
+# Control adaptativo de las solicitudes a la API (AIMD con backoff exponencial)
+CONFIG_ACTUALIZACION = {
+    'tasa_inicial': 2.0,  # solicitudes por segundo (equivale a la pausa fija anterior de 0.5 s)
+    'tasa_min': 0.05,
+    'tasa_max': 20.0,
+    'incremento_tasa': 0.5,  # aumento aditivo tras cada respuesta sana
+    'factor_reduccion': 0.5,  # reducción multiplicativa ante 429/5xx/timeouts
+    'latencia_objetivo': 5.0,  # segundos por página antes de considerar al servidor saturado
+    'tamano_pagina_inicial': 1000,
+    'tamano_pagina_min': 100,
+    'tamano_pagina_max': 2000,
+    'concurrencia_inicial': 1,
+    'concurrencia_max': 4,
+    'exitos_para_crecer': 5,  # respuestas sanas consecutivas antes de ampliar página/concurrencia
+    'reintento_base': 1.0,  # segundos
+    'reintento_max': 60.0,
+    'max_reintentos': 5,
+    'memoria_max_mb': 256,  # techo para las páginas en memoria de una ronda (todas las solicitudes concurrentes)
+    'bytes_por_registro_inicial': 2048,  # estimación hasta medir la primera página
+    'factor_memoria_json': 4  # memoria de los objetos Python por cada byte de JSON recibido
+}
+
+# Cliente HTTP compartido (sesiones keep-alive por host)
+CONFIG_HTTP = {
+    'timeout_conexion': 10,  # segundos
+    'timeout_lectura': 60,  # segundos
+    'reintentos_conexion': 3,
+    'reintentos_lectura': 0,  # los reintentos por lentitud o saturación los gestiona el control de tasa
+    'factor_backoff': 0.5,
+    'conexiones_por_host': 8  # debe cubrir la concurrencia máxima de CONFIG_ACTUALIZACION
+}
+
+# Reconciliación de registros editados y eliminados
+CONFIG_RECONCILIACION = {
+    'tamano_rango': 10000,  # OBJECTID por rango con huella de contenido propia
+    'lote_eliminacion': 5000,
+    # Capas sin campo de fecha de edición: rangos que se descargan de nuevo en cada ejecución, por turnos,
+    # porque la huella (count/min/max) no detecta la edición de un texto dentro del rango
+    'rangos_revision_por_ejecucion': 20
+}
+
+# Carga inicial masiva (tabla vacía) sobre una tabla UNLOGGED sin índices
+CONFIG_CARGA_INICIAL = {
+    'habilitada': True,
+    'sufijo_staging': '_qtrazer_carga'
+}
+
+# Servicio de sincronización incremental (python -m src.cli --servicio)
+CONFIG_SINCRONIZACION = {
+    'intervalos': {  # segundos entre consultas de cada capa
+        'Accidente': 900,
+        'Accidente_via': 1800,
+        'Causa': 1800,
+        'AccidenteVehiculo': 1800,
+        'ActorVial': 900
+    },
+    'reintento_fallo': 300,  # segundos antes de reintentar una capa que falló
+    'archivo_estado': 'qtrazer_servicio_estado.json',
+    # Clave del bloqueo consultivo (pg_try_advisory_lock) que comparten todos los procesos de sincronización
+    'clave_bloqueo': 517268001
+}
+
+# Log de la ventana de actualización: completo en disco, acotado en pantalla
+CONFIG_REGISTRO = {
+    'archivo': 'qtrazer_actualizacion.log',
+    'tamano_max_mb': 5,  # tamaño de cada archivo antes de rotar
+    'archivos_respaldo': 3,
+    'lineas_visibles': 1000,  # líneas recientes que conserva la ventana de actualización
+    'lineas_por_pagina': 500,  # líneas que carga el visor del log completo en cada página
+    'paginas_visibles': 4  # páginas que conserva el visor; al cargar una se descarta la del extremo opuesto
+}
+
+# Servicio local de consultas (python -m src.servidor_consultas)
+CONFIG_SERVICIO_CONSULTAS = {
+    # URL del servicio que usa la aplicación en lugar de la base de datos; vacío consulta PostgreSQL directamente
+    'url': os.getenv('QTRAZER_SERVICIO_CONSULTAS', ''),
+    'host': '127.0.0.1',
+    'puerto': 8765,
+    'conexiones_min': 1,
+    'conexiones_max': 8,  # consultas simultáneas contra PostgreSQL
+    'cache_ttl': 300,  # segundos que un resultado se reutiliza antes de consultarlo de nuevo
+    'cache_max_entradas': 32,
+    'cache_max_registros': 2000000,  # tope de filas en caché sumando todas las entradas
+    'tamano_pagina': 5000,
+    'tamano_pagina_max': 50000,
+    'registros_por_bloque': 1000  # filas serializadas por cada fragmento de la respuesta
+}
+
+# Tiempos por etapa de las actualizaciones y consultas
+CONFIG_METRICAS = {
+    'habilitadas': os.getenv('QTRAZER_METRICAS', '1') != '0',
+    'archivo': 'qtrazer_metricas.jsonl',  # un resumen JSON por ejecución
+    # Directorio del textfile collector de node_exporter; vacío no escribe el formato de Prometheus
+    'directorio_prometheus': os.getenv('QTRAZER_METRICAS_PROMETHEUS', '')
+}
+
+# Perfilado con cProfile y tracemalloc de las operaciones de los controladores (ver src/models/perfilado.py)
+CONFIG_PERFILADO = {
+    'habilitado': os.getenv('QTRAZER_PERFILADO', '0') == '1',
+    'carpeta': 'perfilado',  # dentro del directorio de qtrazer_config.json
+    'marcos_memoria': 10,  # marcos de pila guardados por cada asignación rastreada
+    'top_asignaciones': 25
+}
+
+# Arranque de la interfaz: precarga en segundo plano de los módulos de las ventanas de consulta y actualización
+CONFIG_ARRANQUE = {
+    'precarga_habilitada': os.getenv('QTRAZER_PRECARGA', '1') != '0',
+    'retraso_precarga_ms': 300,  # espera tras mostrar la ventana principal para no competir con su primer dibujo
+    'modulos_precarga': [
+        'pandas', 'numpy', 'openpyxl', 'tkcalendar',
+        'src.views.query_view', 'src.views.update_view'
+    ],
+    # Pool de conexiones, verificación del esquema y valores de los filtros al arrancar
+    'precalentamiento_habilitado': os.getenv('QTRAZER_PRECALENTAMIENTO', '1') != '0',
+    'verificar_esquema': True,
+    'conexiones_min': 2,  # conexiones que el pool abre de inmediato
+    'conexiones_max': 4  # con el pool agotado las operaciones abren una conexión propia
 }
 
 # Lista de campos a obtener de la API
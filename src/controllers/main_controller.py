@@ -2,10 +2,14 @@
 
 from src.models.database import GestorBaseDatos
 from src.models.api_client import ClienteAPI
-from src.config.settings import CONFIG_TABLAS
+from src.config.settings import CONFIG_TABLAS, CONFIG_SERVICIO_CONSULTAS
+from src.models.perfilado import perfilar
+import logging
 import threading
 import queue
 
+logger = logging.getLogger(__name__)
+
 class ControladorPrincipal:
     def __init__(self):
         self.gestor_bd = GestorBaseDatos()
@@ -13,6 +17,12 @@ class ControladorPrincipal:
         self.cola_resultados = queue.Queue()
         self.consulta_en_progreso = False
         self._conexion_pool = None  # Para reutilizar conexiones
+        # Las consultas van al servicio local de consultas si está configurado
+        if CONFIG_SERVICIO_CONSULTAS['url']:
+            from src.models.cliente_consultas import ClienteConsultas
+            self.fuente_consultas = ClienteConsultas()
+        else:
+            self.fuente_consultas = self.gestor_bd
 
     def actualizar_datos(self, nombre_tabla, callback_progreso=None):
         """Actualiza los datos de una tabla específica."""
@@ -38,7 +48,7 @@ class ControladorPrincipal:
             if "connection" in str(e).lower() or "timeout" in str(e).lower() or "failed" in str(e).lower():
                 raise Exception("No fue posible establecer conexión con la base de datos")
             else:
-                print(f"Error en actualización de datos: {str(e)}")
+                logger.error("Error en actualización de datos: %s", e)
                 return None
 
     def consultar_siniestros(self, fecha_inicio, fecha_fin, callback_progreso=None):
@@ -49,6 +59,7 @@ class ControladorPrincipal:
         self.consulta_en_progreso = True
         self.cola_resultados = queue.Queue()
 
+        @perfilar('consulta')
         def ejecutar_consulta():
             try:
                 # Calcular diferencia de días para informar al usuario
@@ -71,7 +82,7 @@ class ControladorPrincipal:
                 
                 # Usar método optimizado SIN límite automático
                 # Esto permitirá obtener todos los registros del rango seleccionado
-                resultados = self.gestor_bd.obtener_siniestros_por_fecha(fecha_inicio, fecha_fin)
+                resultados = self.fuente_consultas.obtener_siniestros_por_fecha(fecha_inicio, fecha_fin)
                 
                 if resultados is None:
                     # Si no hay resultados, verificar si fue por error de conexión
@@ -0,0 +1,142 @@
+"""Ejecución de la actualización en un proceso hijo, con el progreso enviado por una cola."""
+
+import multiprocessing
+import queue
+import threading
+
+from src.models.eventos_progreso import evento_fin, evento_mensaje
+
+# spawn en todas las plataformas: el hijo no hereda el estado de Tk del proceso de la interfaz
+_contexto = multiprocessing.get_context('spawn')
+
+
+def _ejecutar_actualizacion(cola, evento_cancelar, cola_control, tablas, reconciliar, forzar, config_bd, nivel_log):
+    """Punto de entrada del proceso hijo: actualiza las tablas y reporta por la cola."""
+    from src.config.log import cambiar_nivel
+    from src.config.settings import update_database_config
+    from src.controllers.update_controller import ControladorActualizacion
+
+    # El hijo arranca con el nivel de log que tenga la interfaz y sigue sus cambios
+    cambiar_nivel(nivel_log)
+
+    def atender_control():
+        while True:
+            cambiar_nivel(cola_control.get())
+
+    threading.Thread(target=atender_control, daemon=True).start()
+
+    # Usar la misma configuración de base de datos que la interfaz (puede haberse cambiado en caliente)
+    if config_bd:
+        update_database_config(config_bd)
+
+    controlador = ControladorActualizacion()
+
+    def vigilar_cancelacion():
+        evento_cancelar.wait()
+        controlador.cancelar_actualizacion()
+
+    threading.Thread(target=vigilar_cancelacion, daemon=True).start()
+
+    resultados = {}
+    try:
+        resultados = controlador.actualizar_tablas(tablas, _CallbackCola(cola), reconciliar, forzar) or {}
+    except Exception as e:
+        cola.put(evento_mensaje(f"Error inesperado: {str(e)}"))
+    finally:
+        cola.put(evento_fin(resultados, evento_cancelar.is_set()))
+
+
+class _CallbackCola:
+    """Callback de progreso del proceso hijo: envía mensajes y avances como eventos."""
+
+    def __init__(self, cola):
+        self.cola = cola
+
+    def __call__(self, mensaje, porcentaje):
+        self.cola.put(evento_mensaje(mensaje, porcentaje))
+
+    def progreso(self, evento):
+        self.cola.put(evento)
+
+
+class ProcesoActualizacion:
+    """Lanza la actualización en un proceso hijo para que el trabajo de pandas,
+    las inserciones y el log no compitan por el GIL con la interfaz.
+
+    La interfaz consulta los eventos (ver eventos_progreso) con leer_eventos()
+    desde root.after().
+    """
+
+    def __init__(self):
+        self.proceso = None
+        self.cola = None
+        self.evento_cancelar = None
+        self.cola_control = None  # niveles de log enviados al hijo
+        self.finalizado = True
+
+    def iniciar(self, tablas=None, reconciliar=False, forzar=False):
+        """Inicia la actualización. Retorna False si ya hay una en curso."""
+        if self.esta_actualizando():
+            return False
+        from src.config.log import nivel_actual
+        from src.config.settings import get_database_params
+
+        self.cola = _contexto.Queue()
+        self.evento_cancelar = _contexto.Event()
+        self.cola_control = _contexto.Queue()
+        self.finalizado = False
+        self.proceso = _contexto.Process(
+            target=_ejecutar_actualizacion,
+            args=(self.cola, self.evento_cancelar, self.cola_control, tablas, reconciliar, forzar,
+                  get_database_params(), nivel_actual()),
+            daemon=True  # no sobrevive al cierre de la aplicación
+        )
+        self.proceso.start()
+        return True
+
+    def esta_actualizando(self):
+        return self.proceso is not None and self.proceso.is_alive()
+
+    def cancelar(self):
+        """Solicita la cancelación; el hijo se detiene en el siguiente punto de control."""
+        if self.esta_actualizando():
+            self.evento_cancelar.set()
+            return True
+        return False
+
+    def cambiar_nivel_log(self, nivel):
+        """Aplica un nivel de log en el proceso hijo en curso"""
+        if self.esta_actualizando():
+            self.cola_control.put(nivel)
+
+    def leer_eventos(self, max_eventos=500):
+        """Retorna los eventos pendientes sin bloquear.
+        Si el hijo terminó sin enviar 'fin' (p. ej. se cerró de forma abrupta) se agrega uno.
+        """
+        if self.cola is None:
+            return []
+        eventos = []
+        try:
+            while len(eventos) < max_eventos:
+                eventos.append(self.cola.get_nowait())
+        except queue.Empty:
+            if not self.finalizado and not self.esta_actualizando():
+                # La cola puede recibir los últimos eventos justo después de terminar el proceso
+                try:
+                    while True:
+                        eventos.append(self.cola.get(timeout=0.1))
+                except queue.Empty:
+                    pass
+                if not any(evento['tipo'] == 'fin' for evento in eventos):
+                    codigo = self.proceso.exitcode
+                    eventos.append(evento_mensaje(f"Error: el proceso de actualización terminó de forma inesperada (código {codigo})"))
+                    eventos.append(evento_fin({}))
+        if any(evento['tipo'] == 'fin' for evento in eventos):
+            self.finalizado = True
+        return eventos
+
+    def terminar(self):
+        """Detiene el proceso hijo de inmediato (cierre de la ventana)."""
+        if self.esta_actualizando():
+            self.proceso.terminate()
+            self.proceso.join(timeout=5)
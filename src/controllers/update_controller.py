@@ -1,8 +1,21 @@
 """Controlador para la actualización de datos de siniestros viales."""
 
+import logging
 import threading
+from src.models.perfilado import perfilar
 from src.models.update_model import ModeloActualizacion
 
+logger = logging.getLogger(__name__)
+
+# Tablas a procesar en orden: (clave en CONFIG_TABLAS, nombre para mostrar)
+TABLAS_ACTUALIZACION = [
+    ('Accidente', 'Accidente'),
+    ('Accidente_via', 'Accidente Via'),
+    ('Causa', 'Accidente Causa'),
+    ('AccidenteVehiculo', 'Accidente Vehiculo'),
+    ('ActorVial', 'Actor Vial')
+]
+
 class ControladorActualizacion:
     def __init__(self):
         self.modelo = ModeloActualizacion()
@@ -10,63 +23,92 @@ class ControladorActualizacion:
         self.thread_actualizacion = None
         self.tabla_actual = None
 
-    def iniciar_actualizacion(self, callback_progreso=None):
-        """Inicia el proceso de actualización en un hilo separado."""
+    def iniciar_actualizacion(self, callback_progreso=None, reconciliar=False):
+        """Inicia el proceso de actualización en un hilo separado.
+        Con reconciliar=True también se sincronizan registros editados y eliminados.
+        """
         if self.actualizacion_en_progreso:
             return False
 
         self.actualizacion_en_progreso = True
         self.tabla_actual = 'Accidente'
 
-        def ejecutar_actualizacion():
-            try:
-                # Lista de tablas a procesar en orden
-                tablas = [
-                    ('Accidente', 'Accidente'),
-                    ('Accidente_via', 'Accidente Via'),
-                    ('Causa', 'Accidente Causa'),
-                    ('AccidenteVehiculo', 'Accidente Vehiculo'),
-                    ('ActorVial', 'Actor Vial')
-                ]
+        self.thread_actualizacion = threading.Thread(
+            target=self._procesar_tablas,
+            args=(TABLAS_ACTUALIZACION, callback_progreso, reconciliar, False)
+        )
+        self.thread_actualizacion.start()
+        return True
+
+    def actualizar_tablas(self, tablas=None, callback_progreso=None, reconciliar=False, forzar=False):
+        """Actualiza las tablas en el hilo actual (sin interfaz).
+        tablas es una lista de claves de TABLAS_ACTUALIZACION; por defecto todas.
+        Retorna {clave: resultado} de las tablas procesadas, o None si ya hay una actualización en curso
+        (en este proceso o, por el bloqueo de la base de datos, en cualquier otro).
+        """
+        if self.actualizacion_en_progreso:
+            return None
+
+        # Mantener el bloqueo del modelo durante todas las tablas de la ejecución
+        if not self.modelo.bloqueo.adquirir():
+            if callback_progreso:
+                callback_progreso("[ERROR] Hay otra sincronización en curso sobre esta base de datos", 0)
+            return None
+        try:
+            seleccion = [(clave, nombre) for clave, nombre in TABLAS_ACTUALIZACION if tablas is None or clave in tablas]
+            self.actualizacion_en_progreso = True
+            resultados = {}
+            self._procesar_tablas(seleccion, callback_progreso, reconciliar, forzar, resultados)
+            return resultados
+        finally:
+            self.modelo.bloqueo.liberar()
+
+    @perfilar('actualizacion')
+    def _procesar_tablas(self, tablas, callback_progreso=None, reconciliar=False, forzar=False, resultados=None):
+        """Procesa las tablas en orden y se detiene en la primera que falle."""
+        if resultados is None:
+            resultados = {}
+        try:
+            for tabla_key, tabla_nombre in tablas:
+                # Verificar cancelación antes de procesar cada tabla
+                if not self.actualizacion_en_progreso:
+                    logger.debug("Actualización cancelada antes de procesar tabla %s", tabla_nombre)
+                    return False
+                self.tabla_actual = tabla_key
                 
-                for tabla_key, tabla_nombre in tablas:
-                    # Verificar cancelación antes de procesar cada tabla
-                    if not self.actualizacion_en_progreso:
-                        print(f"DEBUG: Actualización cancelada antes de procesar tabla {tabla_nombre}")
-                        return False
-                    
-                    # Mostrar mensaje de inicio para la tabla actual
+                # Mostrar mensaje de inicio para la tabla actual
+                if callback_progreso:
+                    proceso = "reconciliación" if reconciliar else "actualización"
+                    callback_progreso(f"[INICIO] Iniciando {proceso} de la tabla '{tabla_nombre}'...", 0)
+                
+                # Procesar la tabla actual
+                if reconciliar:
+                    resultado = self.modelo.reconciliar_datos(tabla_key, callback_progreso, self)
+                else:
+                    resultado = self.modelo.actualizar_datos(tabla_key, callback_progreso, self, forzar)
+                resultados[tabla_key] = bool(resultado)
+                
+                if not resultado:
                     if callback_progreso:
-                        callback_progreso(f"[INICIO] Iniciando actualización de la tabla '{tabla_nombre}'...", 0)
-                    
-                    # Procesar la tabla actual
-                    resultado = self.modelo.actualizar_datos(tabla_key, callback_progreso, self)
-                    
-                    if not resultado:
-                        if callback_progreso:
-                            callback_progreso(f"[ERROR] Error al actualizar la tabla '{tabla_nombre}'", 0)
-                        return False
-                    
-                    # Verificar cancelación después de procesar cada tabla
-                    if not self.actualizacion_en_progreso:
-                        print(f"DEBUG: Actualización cancelada después de tabla {tabla_nombre}")
-                        return False
+                        callback_progreso(f"[ERROR] Error al actualizar la tabla '{tabla_nombre}'", 0)
+                    return False
                 
-                # Si llegamos aquí, todas las tablas se procesaron exitosamente
-                if callback_progreso:
-                    callback_progreso("[ÉXITO] Actualización completada", 100)
-                return True
-            except Exception as e:
-                if callback_progreso:
-                    callback_progreso(f"Error inesperado: {str(e)}", 0)
-                return False
-            finally:
-                self.actualizacion_en_progreso = False
-                self.tabla_actual = None
-
-        self.thread_actualizacion = threading.Thread(target=ejecutar_actualizacion)
-        self.thread_actualizacion.start()
-        return True
+                # Verificar cancelación después de procesar cada tabla
+                if not self.actualizacion_en_progreso:
+                    logger.debug("Actualización cancelada después de tabla %s", tabla_nombre)
+                    return False
+            
+            # Si llegamos aquí, todas las tablas se procesaron exitosamente
+            if callback_progreso:
+                callback_progreso("[ÉXITO] Actualización completada", 100)
+            return True
+        except Exception as e:
+            if callback_progreso:
+                callback_progreso(f"Error inesperado: {str(e)}", 0)
+            return False
+        finally:
+            self.actualizacion_en_progreso = False
+            self.tabla_actual = None
 
     def esta_actualizando(self):
         """Verifica si hay una actualización en progreso."""
@@ -75,14 +117,14 @@ class ControladorActualizacion:
     def cancelar_actualizacion(self):
         """Cancela la actualización en curso."""
         if self.actualizacion_en_progreso:
-            print("DEBUG: Cancelando actualización...")
+            logger.debug("Cancelando actualización...")
             self.actualizacion_en_progreso = False
             self.tabla_actual = None
             
             # No hacer join() aquí porque puede bloquear la interfaz
             # El hilo se detendrá naturalmente cuando vea que actualizacion_en_progreso es False
             if self.thread_actualizacion and self.thread_actualizacion.is_alive():
-                print("DEBUG: Hilo de actualización marcado para cancelación")
+                logger.debug("Hilo de actualización marcado para cancelación")
             
             return True
         return False
@@ -95,6 +137,7 @@ class ControladorActualizacion:
         self.actualizacion_en_progreso = True
         self.tabla_actual = tabla
 
+        @perfilar('actualizacion')
         def ejecutar_actualizacion_individual():
             try:
                 # Actualizar solo la tabla seleccionada
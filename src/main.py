@@ -4,10 +4,14 @@
 
 # src/main.py
 
+import logging
+import multiprocessing
 import os
 import sys
 import tkinter as tk
 
+logger = logging.getLogger('src.main')  # __name__ es '__main__' al ejecutarse como script
+
 def resource_path(relative_path):
     """Obtiene la ruta absoluta del recurso, funciona tanto para desarrollo como para el ejecutable"""
     try:
@@ -21,41 +25,56 @@ def resource_path(relative_path):
 ruta_raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ruta_raiz)
 
-from src.controllers.main_controller import ControladorPrincipal
-from src.views.main_view import VistaPrincipal
-from src.views.splash_view import SplashView
-
 def main():
     """Función principal que inicia la aplicación."""
-    print("DEBUG: Iniciando aplicación...")
+    from src.models.metricas import Medicion
+
+    medicion = Medicion('arranque')
+    # Importados aquí: el proceso hijo de la actualización (spawn) vuelve a importar
+    # este módulo y no necesita las vistas
+    with medicion.etapa('importaciones'):
+        from src.controllers.main_controller import ControladorPrincipal
+        from src.models.arranque import iniciar_precalentamiento, iniciar_precarga
+        from src.views.main_view import VistaPrincipal
+        from src.views.splash_view import SplashView
+
+    logger.debug("Iniciando aplicación...")
     
     # Crear ventana principal
     ventana_principal = tk.Tk()
-    ventana_principal.withdraw()  # Ocultar la ventana principal temporalmente
-    
-    # Crear ventana de splash
-    splash_root = tk.Toplevel()
+    ventana_principal.withdraw()  # Ocultar la ventana principal mientras se construye
     
-    # Ruta al archivo PNG usando resource_path
-    splash_path = resource_path(os.path.join("assets", "splash.png"))
+    # Mostrar splash screen hasta que la ventana principal esté lista
+    with medicion.etapa('splash'):
+        splash_root = tk.Toplevel()
+        splash = SplashView(splash_root, resource_path(os.path.join("assets", "splash.png")))
+        splash_root.update()
     
-    # Mostrar splash screen
-    splash = SplashView(splash_root, splash_path, duration=4000)
+    # Crear controlador
+    with medicion.etapa('controlador'):
+        controlador = ControladorPrincipal()
     
-    # Esperar a que el splash se cierre
-    splash_root.wait_window()
+    # Crear vista principal
+    with medicion.etapa('vista_principal'):
+        vista = VistaPrincipal(ventana_principal, controlador)
+        ventana_principal.update_idletasks()
     
-    # Mostrar la ventana principal
+    # Cerrar el splash y mostrar la ventana principal
+    splash.close()
     ventana_principal.deiconify()
+    medicion.finalizar()
+    logger.info("Ventana principal lista en %.2f s", medicion.duracion)
     
-    # Crear controlador
-    controlador = ControladorPrincipal()
+    # Importar en segundo plano los módulos de las demás ventanas
+    iniciar_precarga(ventana_principal)
     
-    # Crear vista principal
-    vista = VistaPrincipal(ventana_principal, controlador)
+    # Abrir conexiones, verificar el esquema y cargar los valores de los filtros en segundo plano
+    iniciar_precalentamiento(ventana_principal, vista.advertir_esquema)
     
     # Iniciar bucle principal
     ventana_principal.mainloop()
 
 if __name__ == "__main__":
+    # Necesario para el proceso de actualización en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -1,12 +1,16 @@
 """Modelo para operaciones con la API."""
 
-import requests
+import logging
 from src.config.settings import CONFIG_TABLAS
+from src.models.cliente_http import obtener_cliente_http
+
+logger = logging.getLogger(__name__)
 
 class ClienteAPI:
     def __init__(self):
         self.url_base = "https://datosabiertos.bogota.gov.co/api/3/action/datastore_search"
         self.recurso_id = "b64ba3c4-9e41-41b8-b3fd-2da21d627558"
+        self.http = obtener_cliente_http()
 
     def obtener_registros(self, nombre_tabla, callback_progreso=None):
         """Obtiene registros de la API para una tabla específica."""
@@ -19,7 +23,7 @@ class ClienteAPI:
                 'resource_id': self.recurso_id,
                 'limit': 1
             }
-            respuesta = requests.get(self.url_base, params=params)
+            respuesta = self.http.get(self.url_base, params=params)
             total_registros = respuesta.json()['result']['total']
 
             # Obtener todos los registros
@@ -33,7 +37,7 @@ class ClienteAPI:
                     'limit': limite,
                     'offset': offset
                 }
-                respuesta = requests.get(self.url_base, params=params)
+                respuesta = self.http.get(self.url_base, params=params)
                 datos = respuesta.json()['result']['records']
                 registros.extend(datos)
 
@@ -45,5 +49,5 @@ class ClienteAPI:
             return registros
 
         except Exception as e:
-            print(f"Error al obtener registros de la API: {str(e)}")
+            logger.error("Error al obtener registros de la API: %s", e)
             return None 
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""Tareas de arranque en segundo plano.
+
+Después de mostrar la ventana principal se importan en un hilo los módulos
+pesados que solo usan las ventanas de consulta y actualización (pandas,
+numpy, openpyxl, tkcalendar...), para que abrirlas no espere esas
+importaciones. El tiempo de cada módulo queda en la medición 'precarga'.
+
+En otro hilo se abre el pool de conexiones de la aplicación, se verifica
+que el esquema tenga las tablas, columnas e índices que usa Qtrazer y se
+guardan los valores de los filtros de la vista de consulta (medición
+'precalentamiento').
+"""
+
+import importlib
+import logging
+import queue
+import threading
+
+from src.config.settings import CONFIG_ARRANQUE, CONFIG_CATEGORIAS, CONFIG_TABLAS, get_database_params
+from src.models.categorias import TIPOS_CODIGO, columnas_normalizadas
+from src.models.metricas import Medicion
+
+logger = logging.getLogger(__name__)
+
+# Columnas de códigos alfanuméricos que update_field_types.sql convierte a VARCHAR
+COLUMNAS_TEXTO = {
+    'accidente': ['codigo_accidente'],
+    'vm_acc_actor_vial': ['codigo_accidentado', 'codigo_victima', 'codigo_vehiculo'],
+    'vm_acc_causa': ['codigo_accidente', 'codigo_vehiculo'],
+    'vm_acc_vehiculo': ['codigo_vehiculo'],
+    'vm_acc_vial': ['codigo_accidente', 'codigo_via'],
+}
+TIPOS_TEXTO = ('character varying', 'text', 'character')
+
+# Índices de Configuracion_Postgres.sql que usan las consultas por fecha y sus agregaciones
+INDICES_REQUERIDOS = {
+    'accidente': ['idx_accidente_formulario', 'idx_accidente_fecha', 'idx_accidente_fecha_formulario'],
+    'vm_acc_actor_vial': ['idx_actor_vial_formulario'],
+    'vm_acc_causa': ['idx_causa_formulario'],
+    'vm_acc_vehiculo': ['idx_vehiculo_formulario'],
+    'vm_acc_vial': ['idx_vial_formulario'],
+}
+
+# Valores de los filtros de la vista de consulta: nombre -> (tabla de CONFIG_TABLAS, columna)
+VOCABULARIOS = {
+    'localidades': ('Accidente', 'localidad'),
+    'vehiculos': ('AccidenteVehiculo', 'clase'),
+    'estados': ('ActorVial', 'estado'),
+}
+
+_vocabularios = {}
+_lock_vocabularios = threading.Lock()
+
+
+def precargar_modulos(modulos=None):
+    """Importa los módulos indicados; los que fallen se registran y se omiten"""
+    with Medicion('precarga') as medicion:
+        for modulo in modulos or CONFIG_ARRANQUE['modulos_precarga']:
+            try:
+                with medicion.etapa(modulo):
+                    importlib.import_module(modulo)
+            except Exception as e:
+                logger.warning("No fue posible precargar %s: %s", modulo, e)
+    logger.debug("Precarga completada en %.2f s", medicion.duracion)
+
+
+def iniciar_precarga(root):
+    """Programa la precarga para cuando la ventana principal ya se dibujó"""
+    if not CONFIG_ARRANQUE['precarga_habilitada']:
+        return
+
+    def iniciar():
+        threading.Thread(target=precargar_modulos, daemon=True, name='precarga').start()
+
+    root.after(CONFIG_ARRANQUE['retraso_precarga_ms'], iniciar)
+
+
+def verificar_esquema(cursor):
+    """Lista de problemas del esquema (tablas, columnas o índices faltantes); vacía si está al día"""
+    tablas = [config['nombre_tabla'] for config in CONFIG_TABLAS.values()]
+    tablas += [diccionario for categorias in CONFIG_CATEGORIAS.values() for diccionario in categorias.values()]
+    cursor.execute("""
+        SELECT table_name, column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = ANY(%s)
+    """, (tablas,))
+    columnas = {}
+    for tabla, columna, tipo in cursor.fetchall():
+        columnas.setdefault(tabla, {})[columna] = tipo
+    cursor.execute("""
+        SELECT tablename, indexname FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = ANY(%s)
+    """, (tablas,))
+    indices = {}
+    for tabla, indice in cursor.fetchall():
+        indices.setdefault(tabla, set()).add(indice)
+
+    problemas = []
+    for clave, config in CONFIG_TABLAS.items():
+        tabla = config['nombre_tabla']
+        if tabla not in columnas:
+            problemas.append(f"Falta la tabla {tabla} (Configuracion_Postgres.sql)")
+            continue
+        faltantes = [c for c in config['columnas'] if c not in columnas[tabla]]
+        if faltantes:
+            problemas.append(f"Faltan columnas en {tabla}: {', '.join(faltantes)} (Configuracion_Postgres.sql)")
+        if 'hash_contenido' not in columnas[tabla]:
+            problemas.append(f"Falta la columna {tabla}.hash_contenido (update_hash_contenido.sql)")
+        numericas = [c for c in COLUMNAS_TEXTO.get(tabla, [])
+                     if c in columnas[tabla] and columnas[tabla][c] not in TIPOS_TEXTO]
+        if numericas:
+            problemas.append(f"Columnas de código no alfanuméricas en {tabla}: {', '.join(numericas)} (update_field_types.sql)")
+        sin_diccionario = [diccionario for columna, diccionario in CONFIG_CATEGORIAS.get(clave, {}).items()
+                           if columnas[tabla].get(columna) in TIPOS_CODIGO and diccionario not in columnas]
+        if sin_diccionario:
+            problemas.append(f"Faltan diccionarios de {tabla}: {', '.join(sin_diccionario)} (normalizar_categorias.sql)")
+        sin_indice = [i for i in INDICES_REQUERIDOS.get(tabla, []) if i not in indices.get(tabla, set())]
+        if sin_indice:
+            problemas.append(f"Faltan índices en {tabla}: {', '.join(sin_indice)} (Configuracion_Postgres.sql)")
+    return problemas
+
+
+def cargar_vocabularios(cursor):
+    """Consulta los valores distintos de cada filtro y los deja en la caché; retorna cuántos valores cargó"""
+    total = 0
+    normalizadas = columnas_normalizadas(cursor, [tabla for tabla, _ in VOCABULARIOS.values()])
+    for nombre, (tabla, columna) in VOCABULARIOS.items():
+        origen = CONFIG_TABLAS[tabla]['nombre_tabla']
+        if columna in normalizadas.get(tabla, {}):
+            # Modo normalizado: los valores salen del diccionario sin recorrer la tabla
+            origen, columna = normalizadas[tabla][columna].tabla, 'valor'
+        cursor.execute(
+            f"SELECT DISTINCT TRIM({columna}) FROM {origen} "
+            f"WHERE {columna} IS NOT NULL AND TRIM({columna}) <> '' ORDER BY 1"
+        )
+        valores = [fila[0] for fila in cursor.fetchall()]
+        with _lock_vocabularios:
+            _vocabularios[nombre] = valores
+        total += len(valores)
+    return total
+
+
+def obtener_vocabulario(nombre):
+    """Valores cacheados del filtro; None si el precalentamiento aún no los cargó"""
+    with _lock_vocabularios:
+        valores = _vocabularios.get(nombre)
+    return list(valores) if valores is not None else None
+
+
+def precalentar_base_datos():
+    """Abre el pool de la aplicación, verifica el esquema y carga los vocabularios.
+    Retorna la lista de problemas del esquema encontrados.
+    """
+    from src.models.database import GestorBaseDatos, iniciar_pool_aplicacion
+
+    config = get_database_params()
+    if config is None:
+        return []
+    problemas = []
+    with Medicion('precalentamiento') as medicion:
+        with medicion.etapa('pool'):
+            iniciar_pool_aplicacion(config, CONFIG_ARRANQUE['conexiones_min'], CONFIG_ARRANQUE['conexiones_max'])
+        gestor = GestorBaseDatos()
+        gestor.conectar()
+        try:
+            if CONFIG_ARRANQUE['verificar_esquema']:
+                with medicion.etapa('esquema'):
+                    problemas = verificar_esquema(gestor.cursor)
+            with medicion.etapa('vocabularios') as etapa:
+                etapa['registros'] = cargar_vocabularios(gestor.cursor)
+        finally:
+            gestor.desconectar()
+    for problema in problemas:
+        logger.warning("Esquema desactualizado: %s", problema)
+    logger.debug("Precalentamiento de la base de datos completado en %.2f s", medicion.duracion)
+    return problemas
+
+
+def iniciar_precalentamiento(root, al_encontrar_problemas=None):
+    """Programa el precalentamiento de la base de datos tras mostrar la ventana principal.
+    al_encontrar_problemas(problemas) se llama en el hilo de la interfaz si el esquema no está al día.
+    """
+    if not CONFIG_ARRANQUE['precalentamiento_habilitado']:
+        return
+    cola = queue.Queue()
+
+    def precalentar():
+        try:
+            cola.put(precalentar_base_datos())
+        except Exception as e:
+            logger.warning("No fue posible precalentar la conexión a la base de datos: %s", e)
+            cola.put([])
+
+    def verificar_cola():
+        try:
+            problemas = cola.get_nowait()
+        except queue.Empty:
+            root.after(200, verificar_cola)
+            return
+        if problemas and al_encontrar_problemas:
+            al_encontrar_problemas(problemas)
+
+    def iniciar():
+        threading.Thread(target=precalentar, daemon=True, name='precalentamiento').start()
+        root.after(200, verificar_cola)
+
+    root.after(CONFIG_ARRANQUE['retraso_precarga_ms'], iniciar)
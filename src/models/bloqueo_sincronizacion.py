@@ -0,0 +1,81 @@
+"""Bloqueo en la base de datos para que no se ejecuten dos sincronizaciones a la vez."""
+
+import logging
+import threading
+
+import psycopg2
+
+from src.config.settings import CONFIG_SINCRONIZACION, get_database_params
+
+logger = logging.getLogger(__name__)
+
+
+class SincronizacionEnCurso(Exception):
+    """Otro proceso (en este u otro equipo) sincroniza la misma base de datos."""
+
+
+class BloqueoSincronizacion:
+    """Bloqueo consultivo de PostgreSQL (pg_try_advisory_lock) sobre una conexión propia.
+
+    Al vivir en la base de datos cubre la interfaz, la línea de comandos, el
+    servicio y otros equipos que escriban en la misma base. Es de sesión: si
+    el proceso termina de forma abrupta, PostgreSQL lo libera al cerrarse la
+    conexión. Dentro del proceso es reentrante, para que una ejecución de
+    varias tablas lo mantenga tomado entre una y otra.
+    """
+
+    def __init__(self, clave=None):
+        self.clave = clave if clave is not None else CONFIG_SINCRONIZACION['clave_bloqueo']
+        self.conexion = None
+        self._niveles = 0
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        """Toma el bloqueo. Retorna False si otra sesión de la base de datos lo tiene."""
+        with self._lock:
+            if self._niveles:
+                self._niveles += 1
+                return True
+            config = get_database_params()
+            if config is None:
+                raise Exception("No hay configuración de base de datos. Por favor, configure la base de datos primero.")
+            conexion = psycopg2.connect(**config)
+            conexion.autocommit = True
+            try:
+                with conexion.cursor() as cursor:
+                    cursor.execute("SELECT pg_try_advisory_lock(%s)", (self.clave,))
+                    tomado = cursor.fetchone()[0]
+            except Exception:
+                conexion.close()
+                raise
+            if not tomado:
+                conexion.close()
+                return False
+            self.conexion = conexion
+            self._niveles = 1
+            return True
+
+    def liberar(self):
+        """Libera un nivel del bloqueo; al liberar el último se cierra la conexión."""
+        with self._lock:
+            if not self._niveles:
+                return
+            self._niveles -= 1
+            if self._niveles:
+                return
+            conexion, self.conexion = self.conexion, None
+        try:
+            with conexion.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (self.clave,))
+        except psycopg2.Error as e:
+            logger.debug("No fue posible liberar el bloqueo de sincronización: %s", e)
+        finally:
+            conexion.close()
+
+    def __enter__(self):
+        if not self.adquirir():
+            raise SincronizacionEnCurso("Hay otra sincronización en curso sobre esta base de datos")
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.liberar()
@@ -0,0 +1,184 @@
+"""Carga inicial masiva sobre una tabla de staging sin índices."""
+
+import logging
+import re
+
+import psycopg2
+
+from src.config.settings import CONFIG_TABLAS, CONFIG_CARGA_INICIAL, get_database_params
+
+logger = logging.getLogger(__name__)
+
+
+class CargaInicialMasiva:
+    """Carga una tabla vacía en una tabla UNLOGGED sin índices y la intercambia al final.
+
+    Los índices y la llave primaria se construyen una sola vez sobre la tabla
+    cargada, que pasa a LOGGED antes del intercambio; el intercambio de nombres
+    ocurre en una única transacción, por lo que la tabla original nunca queda
+    a medio cargar.
+    """
+
+    def __init__(self):
+        self.sufijo = CONFIG_CARGA_INICIAL['sufijo_staging']
+
+    def _conectar(self):
+        config = get_database_params()
+        if config is None:
+            raise Exception("No hay configuración de base de datos. Por favor, configure la base de datos primero.")
+        return psycopg2.connect(**config)
+
+    def nombre_staging(self, tabla):
+        """Retorna el nombre de la tabla de staging de la tabla"""
+        return CONFIG_TABLAS[tabla]['nombre_tabla'] + self.sufijo
+
+    def preparar(self, tabla):
+        """Crea la tabla de staging vacía. Retorna su nombre, o None si el usuario
+        no tiene permisos para crear tablas o no es dueño de la tabla original.
+        """
+        if not CONFIG_CARGA_INICIAL['habilitada']:
+            return None
+
+        nombre_tabla = CONFIG_TABLAS[tabla]['nombre_tabla']
+        staging = self.nombre_staging(tabla)
+        conn = self._conectar()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT has_schema_privilege(n.nspname, 'CREATE') AND pg_has_role(c.relowner, 'USAGE')
+                FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.oid = to_regclass(%s)
+            """, (nombre_tabla,))
+            fila = cursor.fetchone()
+            if not fila or not fila[0]:
+                logger.debug("Sin permisos para la carga masiva de %s; se usa la carga normal", nombre_tabla)
+                return None
+
+            cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+            cursor.execute(f"CREATE UNLOGGED TABLE {staging} (LIKE {nombre_tabla} INCLUDING DEFAULTS)")
+            conn.commit()
+            return staging
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.debug("No fue posible crear la tabla de staging %s: %s", staging, e)
+            return None
+        finally:
+            conn.close()
+
+    def tiene_registros(self, tabla):
+        """Indica si la tabla de staging recibió registros"""
+        conn = self._conectar()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT EXISTS(SELECT 1 FROM {self.nombre_staging(tabla)})")
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def descartar(self, tabla):
+        """Elimina la tabla de staging sin tocar la tabla original"""
+        conn = self._conectar()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS {self.nombre_staging(tabla)}")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _indices_originales(self, cursor, nombre_tabla):
+        """Retorna [(nombre, definición)] de los índices de la tabla, sin la llave primaria"""
+        cursor.execute("""
+            SELECT i.indexname, i.indexdef
+            FROM pg_indexes i
+            WHERE i.tablename = %s AND i.schemaname = current_schema()
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint c
+                  WHERE c.conrelid = to_regclass(%s) AND c.contype = 'p' AND c.conname = i.indexname
+              )
+        """, (nombre_tabla, nombre_tabla))
+        return cursor.fetchall()
+
+    def _llave_primaria(self, cursor, nombre_tabla):
+        """Retorna el nombre de la restricción de llave primaria de la tabla"""
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            (nombre_tabla,)
+        )
+        fila = cursor.fetchone()
+        return fila[0] if fila else f"{nombre_tabla}_pkey"
+
+    def _permisos_originales(self, cursor, nombre_tabla):
+        """Retorna [(rol, privilegio)] concedidos sobre la tabla a otros roles"""
+        cursor.execute("""
+            SELECT grantee, privilege_type FROM information_schema.role_table_grants
+            WHERE table_name = %s AND table_schema = current_schema() AND grantee <> current_user
+        """, (nombre_tabla,))
+        return cursor.fetchall()
+
+    def finalizar(self, tabla, callback_progreso=None):
+        """Construye índices, analiza e intercambia la tabla de staging por la original.
+        Si la tabla original recibió registros durante la carga, o el intercambio
+        falla, los registros se copian con INSERT ... SELECT.
+        """
+        nombre_tabla = CONFIG_TABLAS[tabla]['nombre_tabla']
+        staging = self.nombre_staging(tabla)
+        anterior = nombre_tabla + '_qtrazer_anterior'
+        conn = self._conectar()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SET synchronous_commit TO OFF")
+
+            if callback_progreso:
+                callback_progreso("[INFO] Construyendo llave primaria e índices sobre la carga inicial...", 100)
+
+            # Una página repetida por desplazamiento del offset deja duplicados
+            cursor.execute(f"""
+                DELETE FROM {staging} a USING {staging} b
+                WHERE a.objectid = b.objectid AND a.ctid < b.ctid
+            """)
+            llave_primaria = self._llave_primaria(cursor, nombre_tabla)
+            cursor.execute(f"ALTER TABLE {staging} ADD CONSTRAINT {llave_primaria}{self.sufijo} PRIMARY KEY (objectid)")
+
+            indices = self._indices_originales(cursor, nombre_tabla)
+            for nombre_indice, definicion in indices:
+                definicion_staging = re.sub(
+                    r'INDEX \S+ ON (ONLY )?\S+',
+                    f'INDEX {nombre_indice}{self.sufijo} ON {staging}',
+                    definicion, count=1
+                )
+                cursor.execute(definicion_staging)
+
+            cursor.execute(f"ANALYZE {staging}")
+            # Registrar la tabla en el WAL antes de exponerla: a partir de aquí sobrevive a una caída
+            cursor.execute(f"ALTER TABLE {staging} SET LOGGED")
+            conn.commit()
+
+            permisos = self._permisos_originales(cursor, nombre_tabla)
+            try:
+                cursor.execute(f"LOCK TABLE {nombre_tabla} IN ACCESS EXCLUSIVE MODE")
+                cursor.execute(f"SELECT 1 FROM {nombre_tabla} LIMIT 1")
+                if cursor.fetchone():
+                    raise Exception(f"La tabla {nombre_tabla} recibió registros durante la carga inicial")
+
+                cursor.execute(f"ALTER TABLE {nombre_tabla} RENAME TO {anterior}")
+                cursor.execute(f"ALTER TABLE {staging} RENAME TO {nombre_tabla}")
+                cursor.execute(f"DROP TABLE {anterior}")
+                cursor.execute(f"ALTER TABLE {nombre_tabla} RENAME CONSTRAINT {llave_primaria}{self.sufijo} TO {llave_primaria}")
+                for nombre_indice, _ in indices:
+                    cursor.execute(f"ALTER INDEX {nombre_indice}{self.sufijo} RENAME TO {nombre_indice}")
+                for rol, privilegio in permisos:
+                    cursor.execute(f'GRANT {privilegio} ON {nombre_tabla} TO "{rol}"')
+                conn.commit()
+                return True
+            except Exception as e:
+                conn.rollback()
+                logger.debug("No fue posible intercambiar %s por %s: %s. Copiando registros...", staging, nombre_tabla, e)
+                cursor.execute(f"INSERT INTO {nombre_tabla} SELECT * FROM {staging} ON CONFLICT DO NOTHING")
+                cursor.execute(f"DROP TABLE {staging}")
+                conn.commit()
+                return True
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
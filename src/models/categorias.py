@@ -0,0 +1,119 @@
+"""Diccionarios de las columnas categóricas en el modo normalizado.
+
+Con normalizar_categorias.sql aplicado, las columnas de CONFIG_CATEGORIAS
+guardan un código SMALLINT y cada texto se guarda una sola vez en su tabla
+diccionario. La carga traduce los valores a códigos (registrando los nuevos)
+y las consultas agregan sobre los códigos y los traducen al armar el
+resultado. Los diccionarios se mantienen en memoria por base de datos.
+"""
+
+import logging
+import threading
+
+from src.config.settings import CONFIG_CATEGORIAS, CONFIG_TABLAS, get_database_params
+
+logger = logging.getLogger(__name__)
+
+TIPOS_CODIGO = {'smallint', 'integer', 'bigint'}
+
+
+class DiccionarioCategorias:
+    """Caché valor <-> código de una tabla diccionario."""
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.codigos = {}  # valor -> código
+        self.valores = {}  # código -> valor
+        self._lock = threading.Lock()
+
+    def _agregar(self, filas):
+        with self._lock:
+            for codigo, valor in filas:
+                self.codigos[valor] = codigo
+                self.valores[codigo] = valor
+
+    def cargar(self, cursor):
+        """Lee el diccionario completo de la base de datos"""
+        cursor.execute(f"SELECT codigo, valor FROM {self.tabla}")
+        self._agregar(cursor.fetchall())
+
+    def codificar(self, cursor, valores):
+        """Retorna {valor: código}, registrando en la tabla los valores que aún no tienen código.
+        Los valores nuevos se confirman de inmediato para que la caché no guarde códigos de
+        una transacción que luego se revierta.
+        """
+        valores = set(valores)
+        with self._lock:
+            faltantes = sorted(valor for valor in valores if valor not in self.codigos)
+        if faltantes:
+            # Otro proceso pudo registrarlos desde la última lectura
+            cursor.execute(f"SELECT codigo, valor FROM {self.tabla} WHERE valor = ANY(%s)", (faltantes,))
+            self._agregar(cursor.fetchall())
+            with self._lock:
+                nuevos = [valor for valor in faltantes if valor not in self.codigos]
+            if nuevos:
+                # En orden, para que dos cargas simultáneas no se bloqueen mutuamente
+                cursor.execute(
+                    f"INSERT INTO {self.tabla} (valor) SELECT v FROM UNNEST(%s::text[]) AS v ORDER BY v "
+                    f"ON CONFLICT (valor) DO NOTHING", (nuevos,))
+                cursor.connection.commit()
+                cursor.execute(f"SELECT codigo, valor FROM {self.tabla} WHERE valor = ANY(%s)", (nuevos,))
+                self._agregar(cursor.fetchall())
+                logger.debug("%s valores nuevos en %s", len(nuevos), self.tabla)
+        with self._lock:
+            return {valor: self.codigos[valor] for valor in valores}
+
+    def decodificar(self, cursor, codigo):
+        """Texto del código; recarga el diccionario si el código es posterior a la última lectura"""
+        if codigo is None:
+            return None
+        if codigo not in self.valores:
+            self.cargar(cursor)
+        return self.valores.get(codigo)
+
+    def unir(self, cursor, codigos):
+        """Equivalente a STRING_AGG(DISTINCT columna, ', ') a partir de los códigos agregados"""
+        valores = sorted(valor for valor in (self.decodificar(cursor, codigo) for codigo in codigos or []) if valor is not None)
+        return ', '.join(valores) if valores else None
+
+
+_diccionarios = {}
+_lock_diccionarios = threading.Lock()
+
+
+def _clave_bd():
+    config = get_database_params() or {}
+    return f"{config.get('host')}:{config.get('port')}/{config.get('dbname')}"
+
+
+def obtener_diccionario(tabla_diccionario):
+    """Diccionario compartido de la tabla en la base de datos actual"""
+    clave = (_clave_bd(), tabla_diccionario)
+    with _lock_diccionarios:
+        diccionario = _diccionarios.get(clave)
+        if diccionario is None:
+            diccionario = _diccionarios[clave] = DiccionarioCategorias(tabla_diccionario)
+        return diccionario
+
+
+def columnas_normalizadas(cursor, tablas=None):
+    """{tabla: {columna: DiccionarioCategorias}} de las columnas categóricas guardadas como código.
+    Las tablas son claves de CONFIG_TABLAS; sin normalizar_categorias.sql los diccionarios quedan vacíos.
+    """
+    tablas = [tabla for tabla in (tablas or CONFIG_CATEGORIAS) if tabla in CONFIG_CATEGORIAS]
+    if not tablas:
+        return {}
+    cursor.execute("""
+        SELECT table_name, column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = ANY(%s)
+    """, ([CONFIG_TABLAS[tabla]['nombre_tabla'] for tabla in tablas],))
+    tipos = {(nombre_tabla, columna): tipo for nombre_tabla, columna, tipo in cursor.fetchall()}
+    return {
+        tabla: {
+            columna: obtener_diccionario(diccionario)
+            for columna, diccionario in CONFIG_CATEGORIAS[tabla].items()
+            if tipos.get((CONFIG_TABLAS[tabla]['nombre_tabla'], columna)) in TIPOS_CODIGO
+        }
+        for tabla in tablas
+    }
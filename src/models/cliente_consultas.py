@@ -0,0 +1,67 @@
+"""Cliente del servicio local de consultas (mismo contrato que GestorBaseDatos)."""
+
+from datetime import date, time as hora
+
+import requests
+
+from src.config.settings import CONFIG_SERVICIO_CONSULTAS
+from src.models.cliente_http import obtener_cliente_http
+from src.models.metricas import Medicion
+
+
+class ClienteConsultas:
+    """Obtiene los siniestros del servicio HTTP página por página."""
+
+    def __init__(self, url=None, tamano_pagina=None):
+        self.url = (url or CONFIG_SERVICIO_CONSULTAS['url']).rstrip('/')
+        self.tamano_pagina = tamano_pagina or CONFIG_SERVICIO_CONSULTAS['tamano_pagina']
+        self.cliente_http = obtener_cliente_http()
+
+    def _solicitar_pagina(self, parametros, medicion):
+        try:
+            with medicion.etapa('servicio_solicitud') as etapa:
+                respuesta = self.cliente_http.get(f"{self.url}/siniestros", params=parametros)
+                etapa['bytes'] = len(respuesta.content)
+        except requests.exceptions.RequestException:
+            raise Exception("No fue posible establecer conexión con el servicio de consultas")
+        if respuesta.status_code != 200:
+            try:
+                detalle = respuesta.json().get('error', respuesta.text)
+            except ValueError:
+                detalle = respuesta.text
+            raise Exception(f"Error del servicio de consultas ({respuesta.status_code}): {detalle}")
+        with medicion.etapa('servicio_decodificacion'):
+            return respuesta.json()
+
+    def obtener_siniestros_por_fecha(self, fecha_inicio, fecha_fin, **filtros):
+        """Obtiene los siniestros del rango de fechas (opcionalmente filtrados en el servicio)."""
+        parametros = {
+            'fecha_inicio': str(fecha_inicio)[:10],
+            'fecha_fin': str(fecha_fin)[:10],
+            'tamano_pagina': self.tamano_pagina
+        }
+        parametros.update({clave: valor for clave, valor in filtros.items() if valor})
+
+        resultados = []
+        pagina = 0
+        with Medicion('consulta', fuente='servicio') as medicion:
+            while True:
+                parametros['pagina'] = pagina
+                datos = self._solicitar_pagina(parametros, medicion)
+                registros = datos['registros']
+                with medicion.etapa('conversion') as etapa:
+                    # Las fechas y horas viajan como texto ISO; se restauran para ordenar y exportar igual que desde la base de datos
+                    for indice in datos.get('columnas_fecha', []):
+                        for fila in registros:
+                            if fila[indice] is not None:
+                                fila[indice] = date.fromisoformat(fila[indice])
+                    for indice in datos.get('columnas_hora', []):
+                        for fila in registros:
+                            if fila[indice] is not None:
+                                fila[indice] = hora.fromisoformat(fila[indice])
+                    resultados.extend(tuple(fila) for fila in registros)
+                    etapa['registros'] = len(registros)
+
+                if not registros or len(resultados) >= datos['total']:
+                    return resultados
+                pagina += 1
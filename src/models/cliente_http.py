@@ -0,0 +1,182 @@
+"""Cliente HTTP compartido con sesiones persistentes por host."""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config.settings import CONFIG_HTTP
+
+
+class ClienteHTTP:
+    """Reutiliza conexiones keep-alive por host, negocia compresión gzip
+    y lleva contadores de latencia y bytes transferidos por solicitud.
+    """
+
+    def __init__(self, config=None):
+        self.config = dict(CONFIG_HTTP)
+        if config:
+            self.config.update(config)
+        self._sesiones = {}
+        self._estadisticas = {}
+        self._lock = threading.Lock()
+
+    def _crear_sesion(self):
+        """Crea una sesión con pool de conexiones y política de reintentos."""
+        reintentos = Retry(
+            total=None,
+            connect=self.config['reintentos_conexion'],
+            read=self.config['reintentos_lectura'],
+            # Sin reintentos por código de estado: los 429 y 5xx deben llegar al control de tasa
+            status=0,
+            backoff_factor=self.config['factor_backoff'],
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        adaptador = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.config['conexiones_por_host'],
+            max_retries=reintentos
+        )
+        sesion = requests.Session()
+        sesion.mount('https://', adaptador)
+        sesion.mount('http://', adaptador)
+        sesion.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'User-Agent': 'Qtrazer'
+        })
+        return sesion
+
+    def obtener_sesion(self, url):
+        """Retorna la sesión persistente asociada al host de la URL."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            sesion = self._sesiones.get(host)
+            if sesion is None:
+                sesion = self._crear_sesion()
+                self._sesiones[host] = sesion
+                self._estadisticas[host] = {
+                    'solicitudes': 0,
+                    'errores': 0,
+                    'bytes_recibidos': 0,
+                    'latencia_total': 0.0,
+                    'latencia_max': 0.0
+                }
+            return sesion
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        """Realiza un GET sobre la sesión del host.
+
+        `timeout` acepta una tupla (conexión, lectura) o solo el timeout de lectura.
+        La respuesta incluye `metricas` con la latencia y los bytes recibidos.
+        """
+        if timeout is None:
+            timeout = (self.config['timeout_conexion'], self.config['timeout_lectura'])
+        elif not isinstance(timeout, tuple):
+            timeout = (self.config['timeout_conexion'], timeout)
+
+        sesion = self.obtener_sesion(url)
+        host = urlsplit(url).netloc
+        inicio = time.perf_counter()
+        try:
+            respuesta = sesion.get(url, params=params, timeout=timeout, **kwargs)
+            if not kwargs.get('stream'):
+                # Forzar la lectura para medir la transferencia completa
+                contenido = respuesta.content
+        except Exception:
+            with self._lock:
+                self._estadisticas[host]['errores'] += 1
+            raise
+
+        latencia = time.perf_counter() - inicio
+        if kwargs.get('stream'):
+            # La transferencia se registra al terminar de leer el cuerpo (ver finalizar_lectura)
+            respuesta.metricas = {'latencia': latencia, 'bytes': 0}
+            respuesta.inicio_lectura = inicio
+            return respuesta
+
+        # tell() cuenta los bytes leídos del socket, antes de descomprimir
+        try:
+            bytes_recibidos = respuesta.raw.tell() or len(contenido)
+        except Exception:
+            bytes_recibidos = len(contenido)
+
+        respuesta.metricas = {'latencia': latencia, 'bytes': bytes_recibidos}
+        self.registrar_transferencia(host, latencia, bytes_recibidos)
+        return respuesta
+
+    def finalizar_lectura(self, respuesta):
+        """Registra la transferencia de una respuesta leída con stream=True y la cierra."""
+        if getattr(respuesta, 'inicio_lectura', None) is None:
+            return
+        latencia = time.perf_counter() - respuesta.inicio_lectura
+        respuesta.inicio_lectura = None
+        try:
+            bytes_recibidos = respuesta.raw.tell()
+        except Exception:
+            bytes_recibidos = 0
+        respuesta.close()
+        respuesta.metricas = {'latencia': latencia, 'bytes': bytes_recibidos}
+        self.registrar_transferencia(urlsplit(respuesta.url).netloc, latencia, bytes_recibidos)
+
+    def registrar_transferencia(self, host, latencia, bytes_recibidos):
+        """Acumula la latencia y los bytes de una solicitud en los contadores del host."""
+        with self._lock:
+            estadisticas = self._estadisticas.setdefault(host, {
+                'solicitudes': 0, 'errores': 0, 'bytes_recibidos': 0,
+                'latencia_total': 0.0, 'latencia_max': 0.0
+            })
+            estadisticas['solicitudes'] += 1
+            estadisticas['bytes_recibidos'] += bytes_recibidos
+            estadisticas['latencia_total'] += latencia
+            estadisticas['latencia_max'] = max(estadisticas['latencia_max'], latencia)
+
+    def estadisticas(self, host=None):
+        """Retorna una copia de los contadores, de un host o sumados para todos."""
+        with self._lock:
+            if host is not None:
+                return dict(self._estadisticas.get(host, {}))
+            total = {'solicitudes': 0, 'errores': 0, 'bytes_recibidos': 0, 'latencia_total': 0.0, 'latencia_max': 0.0}
+            for estadisticas in self._estadisticas.values():
+                for clave, valor in estadisticas.items():
+                    if clave == 'latencia_max':
+                        total[clave] = max(total[clave], valor)
+                    else:
+                        total[clave] += valor
+            return total
+
+    def describir(self, desde=None, host=None):
+        """Resume en una línea los contadores, opcionalmente desde una copia previa."""
+        actual = self.estadisticas(host)
+        if desde:
+            for clave in ('solicitudes', 'errores', 'bytes_recibidos', 'latencia_total'):
+                actual[clave] = actual.get(clave, 0) - desde.get(clave, 0)
+        solicitudes = actual.get('solicitudes', 0)
+        latencia_media = actual.get('latencia_total', 0.0) / solicitudes if solicitudes else 0.0
+        megabytes = actual.get('bytes_recibidos', 0) / (1024 * 1024)
+        return (f"[HTTP] solicitudes: {solicitudes} - errores: {actual.get('errores', 0)} - "
+                f"latencia media: {latencia_media:.2f} s - datos recibidos: {megabytes:.2f} MB")
+
+    def cerrar(self):
+        """Cierra todas las sesiones y sus conexiones."""
+        with self._lock:
+            for sesion in self._sesiones.values():
+                sesion.close()
+            self._sesiones.clear()
+
+
+_cliente_compartido = None
+_lock_cliente = threading.Lock()
+
+
+def obtener_cliente_http():
+    """Retorna el cliente HTTP compartido por toda la aplicación."""
+    global _cliente_compartido
+    with _lock_cliente:
+        if _cliente_compartido is None:
+            _cliente_compartido = ClienteHTTP()
+        return _cliente_compartido
@@ -0,0 +1,145 @@
+"""Control adaptativo de la tasa de solicitudes a las APIs de ArcGIS."""
+
+import random
+import threading
+import time
+
+from src.config.settings import CONFIG_ACTUALIZACION
+
+# Tipos de fallo que indican saturación del servidor
+FALLO_TIMEOUT = 'timeout'
+FALLO_LIMITE = 'limite'  # HTTP 429
+FALLO_SERVIDOR = 'servidor'  # HTTP 5xx
+FALLO_CONEXION = 'conexion'
+
+
+class ControladorTasa:
+    """Ajusta tasa, concurrencia y tamaño de página según la respuesta del servidor.
+
+    Aplica AIMD: cada respuesta sana aumenta la tasa de forma aditiva y cada
+    429, 5xx o timeout la reduce de forma multiplicativa. Los reintentos usan
+    backoff exponencial con jitter completo.
+    """
+
+    def __init__(self, config=None):
+        self.config = dict(CONFIG_ACTUALIZACION)
+        if config:
+            self.config.update(config)
+
+        self.tasa = self.config['tasa_inicial']
+        self.tamano_pagina = self.config['tamano_pagina_inicial']
+        self.tamano_pagina_max = self.config['tamano_pagina_max']
+        self.concurrencia = self.config['concurrencia_inicial']
+        self.exitos_consecutivos = 0
+        self.latencia_media = None
+        self.total_exitos = 0
+        self.total_fallos = 0
+        self.ultimo_fallo = None
+        self.memoria_max = self.config['memoria_max_mb'] * 1024 * 1024
+        self.bytes_por_registro = self.config['bytes_por_registro_inicial']
+
+        self._proximo_turno = 0.0
+        self._lock = threading.Lock()
+
+    def esperar_turno(self):
+        """Bloquea hasta que la tasa actual permita enviar otra solicitud."""
+        with self._lock:
+            ahora = time.monotonic()
+            inicio = max(ahora, self._proximo_turno)
+            self._proximo_turno = inicio + 1.0 / self.tasa
+        espera = inicio - ahora
+        if espera > 0:
+            time.sleep(espera)
+
+    def registrar_exito(self, latencia):
+        """Registra una respuesta correcta y su latencia en segundos."""
+        with self._lock:
+            self.total_exitos += 1
+            if self.latencia_media is None:
+                self.latencia_media = latencia
+            else:
+                self.latencia_media = 0.8 * self.latencia_media + 0.2 * latencia
+
+            if latencia > self.config['latencia_objetivo']:
+                # El servidor responde pero lento: reducir sin castigar como un fallo
+                self.exitos_consecutivos = 0
+                self.tasa = max(self.config['tasa_min'], self.tasa * 0.8)
+                if self.concurrencia > 1:
+                    self.concurrencia -= 1
+                return
+
+            self.tasa = min(self.config['tasa_max'], self.tasa + self.config['incremento_tasa'])
+            self.exitos_consecutivos += 1
+            if self.exitos_consecutivos >= self.config['exitos_para_crecer']:
+                self.exitos_consecutivos = 0
+                self.concurrencia = min(self.config['concurrencia_max'], self.concurrencia + 1)
+                self.tamano_pagina = min(self.tamano_pagina_max, int(self.tamano_pagina * 1.25))
+
+    def registrar_fallo(self, tipo):
+        """Registra un fallo (timeout, 429, 5xx o conexión) y reduce la carga."""
+        with self._lock:
+            self.total_fallos += 1
+            self.ultimo_fallo = tipo
+            self.exitos_consecutivos = 0
+            factor = self.config['factor_reduccion']
+            self.tasa = max(self.config['tasa_min'], self.tasa * factor)
+            self.concurrencia = max(1, int(self.concurrencia * factor))
+            if tipo == FALLO_TIMEOUT:
+                # Páginas grandes son la causa más probable de un timeout
+                self.tamano_pagina = max(self.config['tamano_pagina_min'], int(self.tamano_pagina * factor))
+
+    def limitar_tamano_pagina(self, maximo):
+        """Fija el tamaño máximo de página permitido por el servidor (maxRecordCount)."""
+        with self._lock:
+            self.tamano_pagina_max = max(self.config['tamano_pagina_min'], min(self.tamano_pagina_max, maximo))
+            self.tamano_pagina = min(self.tamano_pagina, self.tamano_pagina_max)
+
+    def registrar_tamano_registro(self, bytes_json, registros):
+        """Actualiza la estimación de memoria por registro a partir de una página recibida."""
+        if registros <= 0:
+            return
+        with self._lock:
+            medido = (bytes_json / registros) * self.config['factor_memoria_json']
+            # Crecer de inmediato y bajar de forma suavizada para no exceder el techo
+            self.bytes_por_registro = max(medido, 0.8 * self.bytes_por_registro + 0.2 * medido)
+
+    def planificar_ronda(self, registros_restantes):
+        """Retorna (tamano_pagina, paginas) de la próxima ronda respetando la concurrencia
+        actual y el techo de memoria de las páginas en vuelo.
+        """
+        with self._lock:
+            registros_max = max(1, int(self.memoria_max // self.bytes_por_registro))
+            tamano_pagina = max(1, min(self.tamano_pagina, registros_max))
+            paginas_restantes = max(1, -(-registros_restantes // tamano_pagina))
+            paginas = max(1, min(self.concurrencia, paginas_restantes, registros_max // tamano_pagina))
+            return tamano_pagina, paginas
+
+    def espera_reintento(self, intento, retry_after=None):
+        """Calcula la espera antes de un reintento con backoff exponencial y jitter completo."""
+        tope = min(self.config['reintento_max'], self.config['reintento_base'] * (2 ** intento))
+        espera = random.uniform(0, tope)
+        if retry_after:
+            espera = max(espera, retry_after)
+        return espera
+
+    def estado(self):
+        """Retorna una copia del estado actual del control."""
+        with self._lock:
+            return {
+                'tasa': self.tasa,
+                'tamano_pagina': self.tamano_pagina,
+                'concurrencia': self.concurrencia,
+                'latencia_media': self.latencia_media,
+                'total_exitos': self.total_exitos,
+                'total_fallos': self.total_fallos,
+                'ultimo_fallo': self.ultimo_fallo,
+                'bytes_por_registro': self.bytes_por_registro
+            }
+
+    def describir(self):
+        """Retorna el estado actual en una línea apta para el log de actualización."""
+        estado = self.estado()
+        latencia = f"{estado['latencia_media']:.2f} s" if estado['latencia_media'] is not None else "N/D"
+        return (f"[TASA] {estado['tasa']:.2f} sol/s - página: {estado['tamano_pagina']} - "
+                f"concurrencia: {estado['concurrencia']} - latencia media: {latencia} - "
+                f"fallos: {estado['total_fallos']}")
@@ -1,16 +1,109 @@
 """Modelo para operaciones con la base de datos."""
 
+import logging
+import threading
+import time
 import psycopg2
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 from src.config.settings import get_database_params, CONFIG_TABLAS
+from src.models.categorias import columnas_normalizadas
+from src.models.metricas import Medicion
+
+logger = logging.getLogger(__name__)
+
+CLAVES_CONEXION = ('dbname', 'user', 'password', 'host', 'port')
+
+# Pool de la aplicación de escritorio, abierto en segundo plano al arrancar (src.models.arranque)
+_pool_aplicacion = None
+_config_pool_aplicacion = None
+_lock_pool_aplicacion = threading.Lock()
+
+
+def _clave_config(config):
+    return tuple(str(config.get(clave)) for clave in CLAVES_CONEXION)
+
+
+def iniciar_pool_aplicacion(config, minimo, maximo):
+    """Abre el pool compartido de la aplicación; si ya existe para la misma configuración lo reutiliza"""
+    global _pool_aplicacion, _config_pool_aplicacion
+    with _lock_pool_aplicacion:
+        if _pool_aplicacion is not None and _config_pool_aplicacion == _clave_config(config):
+            return _pool_aplicacion
+        anterior = _pool_aplicacion
+        _pool_aplicacion = ThreadedConnectionPool(minimo, maximo, **{clave: config[clave] for clave in CLAVES_CONEXION})
+        _config_pool_aplicacion = _clave_config(config)
+    if anterior is not None:
+        anterior.closeall()
+    return _pool_aplicacion
+
+
+def obtener_pool_aplicacion():
+    """Pool compartido si fue abierto con la configuración de base de datos vigente; None en otro caso"""
+    with _lock_pool_aplicacion:
+        if _pool_aplicacion is None:
+            return None
+        config = get_database_params()
+        if config is None or _clave_config(config) != _config_pool_aplicacion:
+            return None
+        return _pool_aplicacion
+
+
+def _agregar_distintos(columna, normalizadas, conversion=''):
+    """STRING_AGG(DISTINCT ...) de la columna; si la columna guarda códigos se agregan los
+    códigos y el texto se arma al combinar el resultado
+    """
+    if columna in normalizadas:
+        return f"ARRAY_AGG(DISTINCT {columna}) FILTER (WHERE {columna} IS NOT NULL)"
+    return f"STRING_AGG(DISTINCT {columna}{conversion}, ', ')"
+
+
+def _literal_categoria(columna, valor, normalizadas):
+    """El valor a comparar con la columna: el texto o su código en el diccionario"""
+    if columna in normalizadas:
+        return f"(SELECT codigo FROM {normalizadas[columna].tabla} WHERE valor = '{valor}')"
+    return f"'{valor}'"
+
+
+def cerrar_pool_aplicacion():
+    """Cierra las conexiones del pool compartido"""
+    global _pool_aplicacion, _config_pool_aplicacion
+    with _lock_pool_aplicacion:
+        pool, _pool_aplicacion, _config_pool_aplicacion = _pool_aplicacion, None, None
+    if pool is not None:
+        pool.closeall()
+
 
 class GestorBaseDatos:
-    def __init__(self):
+    def __init__(self, pool=None):
         self.conexion = None
         self.cursor = None
+        self.pool = pool  # psycopg2.pool compartido (servicio de consultas); None usa el pool de la aplicación si existe
+        self._pool_conexion = None  # pool del que salió la conexión actual
+
+    def _tomar_del_pool(self, pool):
+        """Toma una conexión del pool descartando las que el servidor ya cerró"""
+        conexion = pool.getconn()
+        if conexion.closed:
+            pool.putconn(conexion, close=True)
+            conexion = pool.getconn()
+        self.conexion, self._pool_conexion = conexion, pool
+        self.cursor = self.conexion.cursor()
 
     def conectar(self):
         """Establece conexión con la base de datos."""
         try:
+            if self.pool is not None:
+                self._tomar_del_pool(self.pool)
+                return True
+
+            pool_aplicacion = obtener_pool_aplicacion()
+            if pool_aplicacion is not None:
+                try:
+                    self._tomar_del_pool(pool_aplicacion)
+                    return True
+                except PoolError:
+                    logger.debug("Pool de la aplicación agotado; se abre una conexión directa")
+
             # Obtener configuración actual en tiempo real
             config = get_database_params()
             
@@ -40,15 +133,44 @@ class GestorBaseDatos:
         """Cierra la conexión con la base de datos."""
         if self.cursor:
             self.cursor.close()
-        if self.conexion:
+            self.cursor = None
+        if self.conexion and self._pool_conexion is not None:
+            # La conexión vuelve al pool sin transacciones abiertas
+            if not self.conexion.closed:
+                self.conexion.rollback()
+            self._pool_conexion.putconn(self.conexion, close=bool(self.conexion.closed))
+        elif self.conexion:
             self.conexion.close()
+        self.conexion = None
+        self._pool_conexion = None
 
     def obtener_siniestros_por_fecha(self, fecha_inicio, fecha_fin):
         """Obtiene los siniestros en un rango de fechas con información detallada - OPTIMIZADO SIN LÍMITES."""
+        medicion = Medicion('consulta')
         try:
-            if not self.conectar():
+            with medicion.etapa('bd_conexion'):
+                conectado = self.conectar()
+            if not conectado:
                 raise Exception("Falló la conexión a la base de datos, valida con el administrador")
 
+            # Columnas categóricas guardadas como código (modo normalizado); se traducen al combinar
+            with medicion.etapa('bd_categorias'):
+                normalizadas = columnas_normalizadas(self.cursor)
+            vehiculo = normalizadas.get('AccidenteVehiculo', {})
+            actor = normalizadas.get('ActorVial', {})
+            causa = normalizadas.get('Causa', {})
+            via = normalizadas.get('Accidente_via', {})
+            # (posición en la fila del resultado, diccionario, es una lista agregada)
+            decodificar = [
+                (indice, diccionario, es_lista) for indice, diccionario, es_lista in [
+                    (4, normalizadas.get('Accidente', {}).get('localidad'), False),
+                    (5, vehiculo.get('clase'), True), (7, actor.get('condicion_a'), True),
+                    (11, actor.get('estado'), True), (12, actor.get('genero'), True),
+                    (14, causa.get('tipo_causa'), True), (15, causa.get('nombre'), True),
+                    (16, via.get('material'), True), (17, via.get('estado'), True)
+                ] if diccionario is not None
+            ]
+
             # Consulta optimizada: Primero obtener los accidentes básicos con índice
             consulta_principal = """
                 SELECT  
@@ -62,8 +184,10 @@ class GestorBaseDatos:
                 ORDER BY a.fecha_ocurrencia_acc
             """
 
-            self.cursor.execute(consulta_principal, (fecha_inicio, fecha_fin))
-            accidentes_basicos = self.cursor.fetchall()
+            with medicion.etapa('bd_consulta_principal') as etapa:
+                self.cursor.execute(consulta_principal, (fecha_inicio, fecha_fin))
+                accidentes_basicos = self.cursor.fetchall()
+                etapa['registros'] = len(accidentes_basicos)
             
             if not accidentes_basicos:
                 return []
@@ -84,34 +208,34 @@ class GestorBaseDatos:
                 # Consultas optimizadas para el lote actual
                 consultas_lote = {
                     'vehiculos': f"""
-                        SELECT formulario, STRING_AGG(DISTINCT clase, ', ') AS clases,
+                        SELECT formulario, {_agregar_distintos('clase', vehiculo)} AS clases,
                                STRING_AGG(DISTINCT placa, ', ') AS placas
                         FROM vm_acc_vehiculo
                         WHERE formulario IN ({placeholders})
                         GROUP BY formulario
                     """,
                     'actores': f"""
-                        SELECT formulario, STRING_AGG(DISTINCT condicion_a, ', ') AS condiciones_a,
-                               COUNT(DISTINCT CASE WHEN estado = 'MUERTO' THEN objectid END) AS fallecidos,
-                               COUNT(DISTINCT CASE WHEN estado = 'HERIDO' THEN objectid END) AS heridos,
-                               COUNT(DISTINCT CASE WHEN estado = 'ILESO' THEN objectid END) AS ilesos,
-                               STRING_AGG(DISTINCT estado, ', ') AS estados,
-                               STRING_AGG(DISTINCT genero, ', ') AS generos,
+                        SELECT formulario, {_agregar_distintos('condicion_a', actor)} AS condiciones_a,
+                               COUNT(DISTINCT CASE WHEN estado = {_literal_categoria('estado', 'MUERTO', actor)} THEN objectid END) AS fallecidos,
+                               COUNT(DISTINCT CASE WHEN estado = {_literal_categoria('estado', 'HERIDO', actor)} THEN objectid END) AS heridos,
+                               COUNT(DISTINCT CASE WHEN estado = {_literal_categoria('estado', 'ILESO', actor)} THEN objectid END) AS ilesos,
+                               {_agregar_distintos('estado', actor)} AS estados,
+                               {_agregar_distintos('genero', actor)} AS generos,
                                STRING_AGG(DISTINCT edad::text, ', ') AS edades
                         FROM vm_acc_actor_vial
                         WHERE formulario IN ({placeholders})
                         GROUP BY formulario
                     """,
                     'causas': f"""
-                        SELECT formulario, STRING_AGG(DISTINCT tipo_causa::text, ', ') AS Causante,
-                               STRING_AGG(DISTINCT nombre::text, ', ') AS Causa
+                        SELECT formulario, {_agregar_distintos('tipo_causa', causa, '::text')} AS Causante,
+                               {_agregar_distintos('nombre', causa, '::text')} AS Causa
                         FROM vm_acc_causa
                         WHERE formulario IN ({placeholders})
                         GROUP BY formulario
                     """,
                     'vias': f"""
-                        SELECT formulario, STRING_AGG(DISTINCT material::text, ', ') AS Terreno_via,
-                               STRING_AGG(DISTINCT estado::text, ', ') AS Estado_via
+                        SELECT formulario, {_agregar_distintos('material', via, '::text')} AS Terreno_via,
+                               {_agregar_distintos('estado', via, '::text')} AS Estado_via
                         FROM vm_acc_vial
                         WHERE formulario IN ({placeholders})
                         GROUP BY formulario
@@ -121,17 +245,20 @@ class GestorBaseDatos:
                 # Ejecutar consultas del lote
                 datos_lote = {}
                 for tipo, consulta in consultas_lote.items():
-                    self.cursor.execute(consulta, formularios_lote)
-                    if tipo == 'vehiculos':
-                        datos_lote[tipo] = {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
-                    elif tipo == 'actores':
-                        datos_lote[tipo] = {row[0]: (row[1], row[2], row[3], row[4], row[5], row[6], row[7]) for row in self.cursor.fetchall()}
-                    elif tipo == 'causas':
-                        datos_lote[tipo] = {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
-                    elif tipo == 'vias':
-                        datos_lote[tipo] = {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
+                    with medicion.etapa(f'bd_{tipo}') as etapa:
+                        self.cursor.execute(consulta, formularios_lote)
+                        if tipo == 'vehiculos':
+                            datos_lote[tipo] = {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
+                        elif tipo == 'actores':
+                            datos_lote[tipo] = {row[0]: (row[1], row[2], row[3], row[4], row[5], row[6], row[7]) for row in self.cursor.fetchall()}
+                        elif tipo == 'causas':
+                            datos_lote[tipo] = {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
+                        elif tipo == 'vias':
+                            datos_lote[tipo] = {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
+                        etapa['registros'] = len(datos_lote[tipo])
                 
                 # Combinar datos del lote
+                inicio_combinacion = time.perf_counter()
                 for acc in lote:
                     formulario = acc[1]
                     
@@ -147,8 +274,14 @@ class GestorBaseDatos:
                         causa_info[0], causa_info[1],
                         via_info[0], via_info[1]
                     ]
+                    for indice, diccionario, es_lista in decodificar:
+                        if es_lista:
+                            resultado[indice] = diccionario.unir(self.cursor, resultado[indice])
+                        else:
+                            resultado[indice] = diccionario.decodificar(self.cursor, resultado[indice])
                     
                     resultados.append(tuple(resultado))
+                medicion.registrar('combinacion', time.perf_counter() - inicio_combinacion, len(lote))
             
             return resultados
 
@@ -163,6 +296,7 @@ class GestorBaseDatos:
                 raise Exception(f"Error al obtener siniestros: {str(e)}")
         finally:
             self.desconectar()
+            medicion.finalizar()
 
     def obtener_siniestros_por_fecha_optimizado(self, fecha_inicio, fecha_fin, limite=None):
         """Versión optimizada con límite opcional para consultas grandes."""
@@ -334,7 +468,7 @@ class GestorBaseDatos:
             if "connection" in str(e).lower() or "timeout" in str(e).lower() or "failed" in str(e).lower():
                 raise Exception("No fue posible establecer conexión con la base de datos")
             else:
-                print(f"Error al procesar datos: {str(e)}")
+                logger.error("Error al procesar datos: %s", e)
                 if self.conexion:
                     self.conexion.rollback()
                 return None
@@ -0,0 +1,126 @@
+"""Decodificación incremental de las páginas de consulta de ArcGIS."""
+
+import codecs
+import json
+import re
+
+_ESPACIOS = re.compile(r'[ \t\n\r]*')
+
+
+class _FlujoJSON:
+    """Lee el cuerpo de una respuesta por bloques y decodifica valores JSON sueltos."""
+
+    def __init__(self, respuesta, tamano_bloque):
+        self._bloques = respuesta.iter_content(chunk_size=tamano_bloque)
+        self._texto = codecs.getincrementaldecoder(respuesta.encoding or 'utf-8')(errors='replace')
+        self._decodificador = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.fin = False
+        self.caracteres = 0
+
+    def _leer(self):
+        """Agrega el siguiente bloque al buffer; retorna False al terminar el cuerpo."""
+        if self.fin:
+            return False
+        bloque = next(self._bloques, None)
+        if bloque is None:
+            self.fin = True
+            texto = self._texto.decode(b'', final=True)
+        else:
+            texto = self._texto.decode(bloque)
+        # Solo se conserva lo pendiente de decodificar
+        self.buffer = self.buffer[self.pos:] + texto
+        self.pos = 0
+        self.caracteres += len(texto)
+        return bloque is not None
+
+    def caracter(self):
+        """Retorna el siguiente carácter significativo sin consumirlo."""
+        while True:
+            self.pos = _ESPACIOS.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._leer() and self.pos >= len(self.buffer):
+                raise ValueError("Respuesta JSON incompleta")
+
+    def consumir(self, esperado):
+        """Consume el carácter esperado o lanza ValueError."""
+        if self.caracter() != esperado:
+            raise ValueError(f"Respuesta JSON inválida: se esperaba '{esperado}' en la posición {self.caracteres - len(self.buffer) + self.pos}")
+        self.pos += 1
+
+    def valor(self):
+        """Decodifica el siguiente valor JSON completo."""
+        self.caracter()
+        while True:
+            try:
+                objeto, fin = self._decodificador.raw_decode(self.buffer, self.pos)
+                # Un número al final del buffer puede estar cortado: confirmar con el siguiente bloque
+                if fin < len(self.buffer) or self.fin:
+                    self.pos = fin
+                    return objeto
+            except json.JSONDecodeError:
+                if self.fin:
+                    raise
+            self._leer()
+
+
+def decodificar_pagina(respuesta, tamano_bloque=65536):
+    """Decodifica una página de consulta sin materializar la lista de features.
+
+    Los `attributes` de cada feature se vuelcan directamente en listas por
+    columna. Retorna el resto del objeto JSON con dos claves adicionales:
+    'columnas' ({campo: [valores]}) y 'num_registros'; además 'bytes_json'
+    con el tamaño del cuerpo decodificado.
+    """
+    flujo = _FlujoJSON(respuesta, tamano_bloque)
+    data = {}
+    columnas = {}
+    filas = 0
+
+    flujo.consumir('{')
+    if flujo.caracter() == '}':
+        flujo.pos += 1
+    else:
+        while True:
+            clave = flujo.valor()
+            flujo.consumir(':')
+            if clave == 'features' and flujo.caracter() == '[':
+                flujo.pos += 1
+                if flujo.caracter() == ']':
+                    flujo.pos += 1
+                else:
+                    while True:
+                        atributos = flujo.valor().get('attributes') or {}
+                        for campo, valor in atributos.items():
+                            columna = columnas.get(campo)
+                            if columna is None:
+                                # Campo nuevo: las filas anteriores no lo traían
+                                columna = columnas[campo] = [None] * filas
+                            columna.append(valor)
+                        filas += 1
+                        if len(atributos) != len(columnas):
+                            for columna in columnas.values():
+                                if len(columna) < filas:
+                                    columna.append(None)
+                        separador = flujo.caracter()
+                        flujo.pos += 1
+                        if separador == ']':
+                            break
+                        if separador != ',':
+                            raise ValueError("Respuesta JSON inválida en la lista de features")
+            else:
+                data[clave] = flujo.valor()
+
+            separador = flujo.caracter()
+            flujo.pos += 1
+            if separador == '}':
+                break
+            if separador != ',':
+                raise ValueError("Respuesta JSON inválida: se esperaba ',' o '}'")
+
+    data['columnas'] = columnas
+    data['num_registros'] = filas
+    data['bytes_json'] = flujo.caracteres
+    return data
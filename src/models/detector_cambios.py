@@ -0,0 +1,153 @@
+"""Detección de capas sin cambios a partir de los metadatos de ArcGIS."""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+from src.config.settings import API_URLS, get_database_params, obtener_directorio_config
+from src.models.cliente_http import obtener_cliente_http
+
+logger = logging.getLogger(__name__)
+
+
+class DetectorCambios:
+    """Compara los metadatos de cada capa del FeatureServer con el estado de la
+    última sincronización para omitir las tablas que no han cambiado.
+    """
+
+    ARCHIVO_ESTADO = 'qtrazer_sync_estado.json'
+
+    def __init__(self, ruta_estado=None):
+        self.http = obtener_cliente_http()
+        self.ruta_estado = ruta_estado or os.path.join(obtener_directorio_config(), self.ARCHIVO_ESTADO)
+        self._lock = threading.Lock()
+
+    def _url_capa(self, api_url):
+        """Obtiene la URL de la capa a partir de la URL de consulta"""
+        return api_url[:-len('/query')] if api_url.endswith('/query') else api_url
+
+    def _clave_bd(self):
+        """Identifica la base de datos actual para no mezclar estados entre servidores"""
+        config = get_database_params() or {}
+        return f"{config.get('host')}:{config.get('port')}/{config.get('dbname')}"
+
+    def obtener_metadatos(self, tabla):
+        """Obtiene la fecha de última edición, el máximo OBJECTID y el total de la capa.
+        Retorna None si el servicio no entrega los metadatos.
+        """
+        api_url = API_URLS[tabla]
+        try:
+            capa = self.http.get(self._url_capa(api_url), params={'f': 'json'}, timeout=30).json()
+            if 'error' in capa:
+                raise Exception(capa['error'])
+            edicion = capa.get('editingInfo') or {}
+
+            estadisticas = [
+                {'statisticType': 'max', 'onStatisticField': 'OBJECTID', 'outStatisticFieldName': 'max_objectid'},
+                {'statisticType': 'count', 'onStatisticField': 'OBJECTID', 'outStatisticFieldName': 'total'}
+            ]
+            params = {
+                'where': '1=1',
+                'outStatistics': json.dumps(estadisticas),
+                'returnGeometry': 'false',
+                'f': 'json'
+            }
+            datos = self.http.get(api_url, params=params, timeout=30).json()
+            if 'error' in datos:
+                raise Exception(datos['error'])
+            # Algunos servidores devuelven los alias de las estadísticas en mayúsculas
+            atributos = {k.lower(): v for k, v in datos['features'][0]['attributes'].items()}
+
+            return {
+                'ultima_edicion': edicion.get('lastEditDate') or edicion.get('dataLastEditDate'),
+                'max_objectid': atributos.get('max_objectid') or 0,
+                'total': atributos.get('total') or 0,
+                'max_record_count': capa.get('maxRecordCount')
+            }
+        except Exception as e:
+            logger.error("No fue posible obtener los metadatos de la capa %s: %s", tabla, e)
+            return None
+
+    def _cargar_estado(self):
+        """Carga el archivo de estado de sincronización"""
+        if not os.path.exists(self.ruta_estado):
+            return {}
+        try:
+            with open(self.ruta_estado, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error("Error al cargar el estado de sincronización: %s", e)
+            return {}
+
+    def obtener_estado(self, tabla):
+        """Retorna el estado guardado de la última sincronización de la tabla"""
+        with self._lock:
+            return self._cargar_estado().get(self._clave_bd(), {}).get(tabla)
+
+    def sin_cambios(self, tabla, metadatos, max_objectid_bd):
+        """Indica si la capa y la tabla siguen como en la última sincronización"""
+        estado = self.obtener_estado(tabla)
+        if not estado or not metadatos:
+            return False
+
+        # Si la tabla local perdió registros desde la última sincronización, no omitirla
+        if max_objectid_bd != estado.get('max_objectid'):
+            return False
+
+        if metadatos['max_objectid'] != estado.get('max_objectid') or metadatos['total'] != estado.get('total'):
+            return False
+
+        # La fecha de edición solo se compara si el servicio la publica
+        if metadatos['ultima_edicion'] is not None or estado.get('ultima_edicion') is not None:
+            return metadatos['ultima_edicion'] == estado.get('ultima_edicion')
+        return True
+
+    def _guardar_estado(self, estado):
+        """Escribe el archivo de estado de forma atómica"""
+        try:
+            os.makedirs(os.path.dirname(self.ruta_estado), exist_ok=True)
+            ruta_tmp = self.ruta_estado + '.tmp'
+            with open(ruta_tmp, 'w', encoding='utf-8') as f:
+                json.dump(estado, f, indent=4, ensure_ascii=False)
+            os.replace(ruta_tmp, self.ruta_estado)
+        except Exception as e:
+            logger.error("Error al guardar el estado de sincronización: %s", e)
+
+    def registrar_sincronizacion(self, tabla, metadatos):
+        """Guarda los metadatos de la capa como estado sincronizado de la tabla"""
+        with self._lock:
+            estado = self._cargar_estado()
+            estado_bd = estado.setdefault(self._clave_bd(), {})
+            anterior = estado_bd.get(tabla, {})
+            estado_bd[tabla] = {
+                'ultima_edicion': metadatos['ultima_edicion'],
+                'max_objectid': metadatos['max_objectid'],
+                'total': metadatos['total'],
+                'fecha_sincronizacion': datetime.now().isoformat(timespec='seconds'),
+                'huellas': anterior.get('huellas', {})
+            }
+            self._guardar_estado(estado)
+
+    def obtener_campos(self, tabla):
+        """Retorna ({NOMBRE: tipo esri}, campo de fecha de edición o None) de los campos publicados por la capa"""
+        capa = self.http.get(self._url_capa(API_URLS[tabla]), params={'f': 'json'}, timeout=30).json()
+        if 'error' in capa:
+            raise Exception(f"Error al obtener los campos de la capa {tabla}: {capa['error']}")
+        campos = {campo['name'].upper(): campo['type'] for campo in capa.get('fields', [])}
+        # Con el seguimiento de ediciones activo, ArcGIS actualiza este campo en cada edición
+        campo_edicion = (capa.get('editFieldsInfo') or {}).get('editDateField')
+        return campos, (campo_edicion if campo_edicion and campo_edicion.upper() in campos else None)
+
+    def obtener_huellas(self, tabla):
+        """Retorna las huellas por rango de OBJECTID registradas en la última reconciliación"""
+        estado = self.obtener_estado(tabla) or {}
+        return dict(estado.get('huellas', {}))
+
+    def guardar_huellas(self, tabla, huellas):
+        """Guarda las huellas por rango de OBJECTID de la tabla"""
+        with self._lock:
+            estado = self._cargar_estado()
+            estado.setdefault(self._clave_bd(), {}).setdefault(tabla, {})['huellas'] = huellas
+            self._guardar_estado(estado)
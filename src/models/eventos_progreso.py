@@ -0,0 +1,79 @@
+"""Eventos de progreso tipados de la actualización.
+
+Los eventos son diccionarios con la clave 'tipo':
+    'mensaje'  : {'texto', 'porcentaje'}  - línea del log
+    'progreso' : {'tabla', 'etapa', 'hechos', 'total', 'porcentaje', 'tasa', 'eta'} - avance de una etapa
+    'fin'      : {'resultados', 'cancelada'} - fin de la actualización
+
+Un callback de progreso es un callable (mensaje, porcentaje). Si además tiene un
+método progreso(evento), recibe los avances como eventos; si no, los recibe
+como el texto '[PROGRESO] ...' de siempre.
+"""
+
+import time
+
+# Etapas de la actualización y su nombre en los mensajes
+ETAPAS = {
+    'descarga': 'Registros descargados',
+    'reconciliacion': 'Rangos verificados'
+}
+
+
+def formatear_duracion(segundos):
+    """Formatea una duración en segundos como HH:MM:SS"""
+    if segundos is None:
+        return "Calculando..."
+    segundos = int(segundos)
+    return f"{segundos // 3600:02d}:{(segundos % 3600) // 60:02d}:{segundos % 60:02d}"
+
+
+def evento_mensaje(texto, porcentaje=0):
+    return {'tipo': 'mensaje', 'texto': texto, 'porcentaje': porcentaje}
+
+
+def evento_progreso(tabla, etapa, hechos, total, inicio=None, **datos):
+    """Crea un evento de avance; con inicio (time.time()) calcula la tasa y el tiempo restante."""
+    porcentaje = (hechos / total) * 100 if total else 100.0
+    tasa = eta = None
+    if inicio is not None and hechos > 0:
+        transcurrido = time.time() - inicio
+        if transcurrido > 0:
+            tasa = hechos / transcurrido
+            eta = max(0, total - hechos) / tasa
+    evento = {
+        'tipo': 'progreso',
+        'tabla': tabla,
+        'etapa': etapa,
+        'hechos': hechos,
+        'total': total,
+        'porcentaje': porcentaje,
+        'tasa': tasa,
+        'eta': eta
+    }
+    evento.update(datos)
+    return evento
+
+
+def evento_fin(resultados, cancelada=False):
+    return {'tipo': 'fin', 'resultados': resultados, 'cancelada': cancelada}
+
+
+def texto_progreso(evento):
+    """Texto de una línea que describe un evento de avance"""
+    texto = (f"[PROGRESO] {ETAPAS.get(evento['etapa'], evento['etapa'])}: "
+             f"{evento.get('insertados', evento['hechos'])}/{evento['total']} ({evento['porcentaje']:.1f}%)")
+    if 'rangos_actualizados' in evento:
+        texto += f" - rangos actualizados: {evento['rangos_actualizados']}"
+    if evento['tasa'] is not None:
+        texto += f" - {evento['tasa']:,.0f}/s - Tiempo estimado: {formatear_duracion(evento['eta'])}"
+    return texto
+
+
+def emitir_progreso(callback_progreso, evento):
+    """Entrega un evento de avance al callback, como evento o como texto según lo que admita."""
+    if callback_progreso is None:
+        return
+    if hasattr(callback_progreso, 'progreso'):
+        callback_progreso.progreso(evento)
+    else:
+        callback_progreso(texto_progreso(evento), evento['porcentaje'])
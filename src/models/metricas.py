@@ -0,0 +1,147 @@
+"""Tiempos, conteos y bytes por etapa de las actualizaciones y consultas.
+
+Una medición agrupa las etapas de una ejecución (la actualización de una tabla,
+una consulta, un filtro de la vista...). Al finalizarla su resumen se agrega
+como una línea JSON a CONFIG_METRICAS['archivo'] y, si hay un directorio
+configurado, se escribe en el formato textfile de Prometheus.
+
+Las etapas que corren en varios hilos a la vez (las páginas de la API)
+acumulan el tiempo de todos los hilos, por lo que pueden sumar más que la
+duración de la ejecución.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from src.config.settings import CONFIG_METRICAS, obtener_directorio_config
+
+logger = logging.getLogger(__name__)
+
+_lock_archivo = threading.Lock()
+
+
+class Medicion:
+    """Acumula las etapas de una ejecución; se usa con with o finalizándola explícitamente."""
+
+    def __init__(self, operacion, **etiquetas):
+        self.operacion = operacion
+        self.etiquetas = {clave: valor for clave, valor in etiquetas.items() if valor is not None}
+        self.fecha = datetime.now().isoformat(timespec='seconds')
+        self.inicio = time.perf_counter()
+        self.duracion = None
+        self.etapas = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Mide el bloque; los registros y bytes procesados se asignan en el diccionario entregado"""
+        medida = {'registros': 0, 'bytes': 0}
+        inicio = time.perf_counter()
+        try:
+            yield medida
+        finally:
+            self.registrar(nombre, time.perf_counter() - inicio, medida['registros'], medida['bytes'])
+
+    def registrar(self, nombre, segundos, registros=0, bytes_procesados=0):
+        with self._lock:
+            etapa = self.etapas.setdefault(nombre, {'segundos': 0.0, 'llamadas': 0, 'registros': 0, 'bytes': 0})
+            etapa['segundos'] += segundos
+            etapa['llamadas'] += 1
+            etapa['registros'] += registros or 0
+            etapa['bytes'] += bytes_procesados or 0
+
+    def resumen(self):
+        duracion = self.duracion if self.duracion is not None else time.perf_counter() - self.inicio
+        with self._lock:
+            etapas = {
+                nombre: dict(etapa, segundos=round(etapa['segundos'], 4))
+                for nombre, etapa in self.etapas.items()
+            }
+        return {
+            'fecha': self.fecha,
+            'operacion': self.operacion,
+            **self.etiquetas,
+            'duracion_segundos': round(duracion, 4),
+            'etapas': etapas
+        }
+
+    def finalizar(self):
+        """Cierra la medición y guarda su resumen (solo la primera vez). Retorna el resumen."""
+        if self.duracion is None:
+            self.duracion = time.perf_counter() - self.inicio
+            if CONFIG_METRICAS['habilitadas']:
+                guardar_resumen(self.resumen())
+        return self.resumen()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.finalizar()
+        return False
+
+
+def ruta_metricas():
+    return os.path.join(obtener_directorio_config(), CONFIG_METRICAS['archivo'])
+
+
+def guardar_resumen(resumen):
+    """Agrega el resumen al archivo de métricas y actualiza el textfile de Prometheus"""
+    try:
+        with _lock_archivo:
+            with open(ruta_metricas(), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(resumen, default=str, ensure_ascii=False) + '\n')
+        if CONFIG_METRICAS['directorio_prometheus']:
+            escribir_prometheus(resumen, CONFIG_METRICAS['directorio_prometheus'])
+    except Exception as e:
+        logger.error("Error al guardar las métricas de %s: %s", resumen['operacion'], e)
+
+
+def _texto_etiqueta(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def texto_prometheus(resumen):
+    """Formato de exposición de Prometheus de la última ejecución de una operación"""
+    etiquetas = {clave: valor for clave, valor in resumen.items()
+                 if clave not in ('fecha', 'duracion_segundos', 'etapas')}
+
+    def serie(nombre, valor, **extra):
+        todas = dict(etiquetas, **extra)
+        texto = ','.join(f'{clave}="{_texto_etiqueta(v)}"' for clave, v in todas.items())
+        return f"{nombre}{{{texto}}} {valor}"
+
+    lineas = [
+        "# HELP qtrazer_duracion_segundos Duración de la última ejecución",
+        "# TYPE qtrazer_duracion_segundos gauge",
+        serie('qtrazer_duracion_segundos', resumen['duracion_segundos']),
+        "# HELP qtrazer_ultima_ejecucion_timestamp_segundos Momento en que terminó la última ejecución",
+        "# TYPE qtrazer_ultima_ejecucion_timestamp_segundos gauge",
+        serie('qtrazer_ultima_ejecucion_timestamp_segundos', round(time.time()))
+    ]
+    for campo, ayuda in (('segundos', 'Tiempo acumulado'), ('llamadas', 'Veces ejecutada'),
+                         ('registros', 'Registros procesados'), ('bytes', 'Bytes procesados')):
+        nombre = f"qtrazer_etapa_{campo}"
+        lineas.append(f"# HELP {nombre} {ayuda} por etapa en la última ejecución")
+        lineas.append(f"# TYPE {nombre} gauge")
+        for etapa, valores in resumen['etapas'].items():
+            lineas.append(serie(nombre, valores[campo], etapa=etapa))
+    return '\n'.join(lineas) + '\n'
+
+
+def escribir_prometheus(resumen, directorio):
+    """Escribe qtrazer_<operacion>[_<etiquetas>].prom de forma atómica para el textfile collector"""
+    partes = [resumen['operacion']] + [str(valor) for clave, valor in resumen.items()
+                                       if clave not in ('fecha', 'operacion', 'duracion_segundos', 'etapas')]
+    nombre = re.sub(r'[^A-Za-z0-9_]+', '_', '_'.join(['qtrazer'] + partes)) + '.prom'
+    ruta = os.path.join(directorio, nombre)
+    temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(texto_prometheus(resumen))
+    os.replace(temporal, ruta)
@@ -0,0 +1,105 @@
+"""Perfilado opcional de las operaciones de los controladores.
+
+Con CONFIG_PERFILADO['habilitado'] (o QTRAZER_PERFILADO=1) cada operación
+decorada con @perfilar se ejecuta bajo cProfile y tracemalloc, y deja en la
+carpeta de perfilado (junto a qtrazer_config.json):
+    <operacion>_<fecha>.prof         - abrir con pstats o snakeviz
+    <operacion>_<fecha>_memoria.txt  - asignaciones que más crecieron y resumen de pstats
+
+cProfile solo admite un perfil activo a la vez: si otra operación se está
+perfilando, la nueva se ejecuta sin perfilar.
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from src.config.settings import CONFIG_PERFILADO, obtener_directorio_config
+
+logger = logging.getLogger(__name__)
+
+_lock_perfil = threading.Lock()
+
+
+def carpeta_perfilado():
+    return os.path.join(obtener_directorio_config(), CONFIG_PERFILADO['carpeta'])
+
+
+def perfilar(nombre):
+    """Decorador: perfila la función cuando el perfilado está habilitado"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not CONFIG_PERFILADO['habilitado']:
+                return funcion(*args, **kwargs)
+            if not _lock_perfil.acquire(blocking=False):
+                logger.warning("Hay otro perfilado en curso; %s se ejecuta sin perfilar", nombre)
+                return funcion(*args, **kwargs)
+            try:
+                return _ejecutar_perfilado(nombre, funcion, args, kwargs)
+            finally:
+                _lock_perfil.release()
+        return envoltura
+    return decorador
+
+
+def _ejecutar_perfilado(nombre, funcion, args, kwargs):
+    iniciar_memoria = not tracemalloc.is_tracing()
+    if iniciar_memoria:
+        tracemalloc.start(CONFIG_PERFILADO['marcos_memoria'])
+    inicial = tracemalloc.take_snapshot()
+    perfil = cProfile.Profile()
+    inicio = time.perf_counter()
+    perfil.enable()
+    try:
+        return funcion(*args, **kwargs)
+    finally:
+        perfil.disable()
+        duracion = time.perf_counter() - inicio
+        final = tracemalloc.take_snapshot()
+        pico = tracemalloc.get_traced_memory()[1]
+        if iniciar_memoria:
+            tracemalloc.stop()
+        try:
+            guardar_perfil(nombre, perfil, inicial, final, pico, duracion)
+        except Exception as e:
+            logger.error("Error al guardar el perfil de %s: %s", nombre, e)
+
+
+def guardar_perfil(nombre, perfil, inicial, final, pico, duracion):
+    """Escribe el .prof y el reporte de asignaciones; retorna la ruta base de los archivos"""
+    carpeta = carpeta_perfilado()
+    os.makedirs(carpeta, exist_ok=True)
+    base = os.path.join(carpeta, f"{nombre}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+    perfil.dump_stats(f"{base}.prof")
+
+    filtros = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<unknown>')
+    ]
+    diferencias = final.filter_traces(filtros).compare_to(inicial.filter_traces(filtros), 'lineno')
+    top = CONFIG_PERFILADO['top_asignaciones']
+
+    resumen = io.StringIO()
+    pstats.Stats(perfil, stream=resumen).sort_stats('cumulative').print_stats(top)
+
+    with open(f"{base}_memoria.txt", 'w', encoding='utf-8') as f:
+        f.write(f"Operación: {nombre}\n")
+        f.write(f"Duración: {duracion:.2f} s\n")
+        f.write(f"Pico de memoria rastreada: {pico / (1024 * 1024):.1f} MB\n\n")
+        f.write(f"Asignaciones que más crecieron (top {top}):\n")
+        for diferencia in diferencias[:top]:
+            f.write(f"{diferencia}\n")
+        f.write(f"\nFunciones por tiempo acumulado (top {top}):\n")
+        f.write(resumen.getvalue())
+
+    logger.info("Perfil de %s guardado en %s.prof (%.2f s)", nombre, base, duracion)
+    return base
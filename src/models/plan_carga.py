@@ -0,0 +1,213 @@
+"""Plan de carga por tabla: mapeo, conversión de tipos y sentencia de inserción."""
+
+import hashlib
+import json
+import logging
+
+import pandas as pd
+
+from src.config.settings import CONFIG_CATEGORIAS, CONFIG_TABLAS, COLUMNAS_FECHA
+from src.models.categorias import obtener_diccionario
+
+logger = logging.getLogger(__name__)
+
+COLUMNA_HASH = 'hash_contenido'  # huella MD5 del contenido de cada registro
+
+DIAS = {
+    'LUNES': 1, 'MARTES': 2, 'MIERCOLES': 3, 'JUEVES': 4,
+    'VIERNES': 5, 'SABADO': 6, 'DOMINGO': 7
+}
+
+# Tipos de PostgreSQL agrupados por la conversión que requieren
+TIPOS_ENTEROS = {'smallint', 'integer', 'bigint'}
+TIPOS_DECIMALES = {'numeric', 'real', 'double precision'}
+TIPOS_TEXTO = {'character varying', 'character', 'text'}
+FORMATOS_FECHA = {
+    'date': '%Y-%m-%d',
+    'timestamp without time zone': '%Y-%m-%d %H:%M:%S',
+    'timestamp with time zone': '%Y-%m-%d %H:%M:%S'
+}
+VALORES_VACIOS = ['', 'null', 'NULL', 'None', 'nan', 'NaN']
+
+
+def _dia_a_numero(serie):
+    """Convierte el nombre del día a su número (0 si no es un día válido)"""
+    return serie.map(lambda dia: DIAS.get(dia.upper(), 0) if isinstance(dia, str) else 0)
+
+
+def _entero_con_cero(serie):
+    """Convierte a entero reemplazando vacíos e inválidos por 0"""
+    return pd.to_numeric(serie, errors='coerce').fillna(0).astype('int64')
+
+
+# Conversiones propias de una columna, aplicadas antes de la conversión por tipo
+CONVERSORES_ESPECIALES = {
+    'dia_ocurrencia_acc': _dia_a_numero,
+    'edad': _entero_con_cero
+}
+
+
+def _formatear_texto(valor):
+    """Convierte un valor a texto sin el '.0' de los enteros leídos como decimales"""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+class PlanCarga:
+    """Describe cómo cargar una página de la API en una tabla.
+
+    Se compila una vez por tabla a partir de CONFIG_TABLAS y de los tipos reales
+    de las columnas en PostgreSQL (information_schema), y se reutiliza en cada
+    página: mapea, convierte y valida el DataFrame completo por columna y
+    entrega la sentencia de inserción ya construida. Las filas con nulos en
+    columnas obligatorias o texto más largo que su columna se rechazan.
+    """
+
+    def __init__(self, config_tabla, nombre_tabla, columnas_bd, modo='insertar'):
+        self.config_tabla = config_tabla
+        self.nombre_tabla = nombre_tabla
+        self.modo = modo
+        self.columnas = []
+        self.tipos = {}
+        for columna in CONFIG_TABLAS[config_tabla]['columnas']:
+            if columna not in columnas_bd:
+                logger.debug("La columna %s no existe en %s; se omite del plan de carga", columna, nombre_tabla)
+                continue
+            self.columnas.append(columna)
+            self.tipos[columna] = columnas_bd[columna]
+        if not self.columnas:
+            raise Exception(f"No hay columnas válidas para insertar en la tabla {config_tabla}")
+
+        # Modo normalizado: las columnas categóricas que la tabla guarda como código se convierten
+        # como texto (así también la huella) y se codifican antes de insertar
+        self.categorias = {
+            columna: obtener_diccionario(diccionario)
+            for columna, diccionario in CONFIG_CATEGORIAS.get(config_tabla, {}).items()
+            if columna in self.tipos and self.tipos[columna]['tipo'] in TIPOS_ENTEROS
+        }
+
+        self.con_hash = COLUMNA_HASH in columnas_bd
+        self.columnas_insercion = self.columnas + [COLUMNA_HASH] if self.con_hash else list(self.columnas)
+        self.obligatorias = [c for c in self.columnas if not self.tipos[c]['nulable']]
+        self.consulta = self._compilar_consulta()
+
+    @classmethod
+    def compilar(cls, cursor, config_tabla, nombre_tabla, modo='insertar'):
+        """Lee los tipos de la tabla en la base de datos y compila el plan"""
+        cursor.execute("""
+            SELECT column_name, data_type, character_maximum_length, is_nullable
+            FROM information_schema.columns
+            WHERE table_name = %s AND table_schema = current_schema()
+        """, (nombre_tabla,))
+        columnas_bd = {
+            nombre: {'tipo': tipo, 'longitud': longitud, 'nulable': nulable == 'YES'}
+            for nombre, tipo, longitud, nulable in cursor.fetchall()
+        }
+        if not columnas_bd:
+            raise Exception(f"La tabla {nombre_tabla} no existe en la base de datos")
+        return cls(config_tabla, nombre_tabla, columnas_bd, modo)
+
+    def _compilar_consulta(self):
+        """Construye la sentencia INSERT para execute_values"""
+        if self.modo == 'upsert':
+            asignaciones = ', '.join(f"{col} = EXCLUDED.{col}" for col in self.columnas_insercion if col != 'objectid')
+            conflicto = f"ON CONFLICT (objectid) DO UPDATE SET {asignaciones}"
+            if self.con_hash:
+                # Los registros sin cambios no se reescriben (sin WAL ni mantenimiento de índices)
+                conflicto += f" WHERE {self.nombre_tabla}.{COLUMNA_HASH} IS DISTINCT FROM EXCLUDED.{COLUMNA_HASH}"
+            else:
+                logger.debug("La tabla %s no tiene la columna %s; el upsert reescribe todos los registros", self.nombre_tabla, COLUMNA_HASH)
+        else:
+            conflicto = "ON CONFLICT DO NOTHING"
+        return f"INSERT INTO {self.nombre_tabla} ({', '.join(self.columnas_insercion)}) VALUES %s {conflicto}"
+
+    def _convertir(self, columna, serie):
+        """Convierte una columna de la API al tipo de la columna en la base de datos"""
+        tipo = 'text' if columna in self.categorias else self.tipos[columna]['tipo']
+
+        if columna in CONVERSORES_ESPECIALES:
+            serie = CONVERSORES_ESPECIALES[columna](serie)
+
+        if columna.upper() in COLUMNAS_FECHA:
+            # La API entrega las fechas como milisegundos desde 1970
+            milisegundos = pd.to_numeric(serie, errors='coerce')
+            validos = (milisegundos > 0) & (milisegundos < 10000000000000)
+            fechas = pd.to_datetime(milisegundos.where(validos), unit='ms')
+            formato = FORMATOS_FECHA.get(tipo, '%Y-%m-%d')
+            return fechas.dt.strftime(formato).astype(object).where(validos, None)
+
+        if tipo in TIPOS_ENTEROS:
+            return _entero_con_cero(serie)
+
+        if tipo in TIPOS_DECIMALES:
+            numeros = pd.to_numeric(serie, errors='coerce')
+            return numeros.astype(object).where(numeros.notna(), None)
+
+        serie = serie.astype(object).where(serie.notna(), None)
+        if tipo not in TIPOS_TEXTO:
+            # Horas y otros tipos: PostgreSQL interpreta el texto de la API
+            vacios = serie.isin(VALORES_VACIOS) | (serie.map(lambda v: isinstance(v, str) and not v.strip()))
+            return serie.where(~vacios, None)
+
+        texto = serie.map(_formatear_texto, na_action='ignore')
+        # Vacíos como NULL, igual que la limpieza por fila anterior al plan (fillna('') y luego '' -> None)
+        vacios = texto.str.strip().isin(VALORES_VACIOS)
+        return texto.where(~vacios & texto.notna(), None)
+
+    def _motivos_longitud(self, convertido):
+        """Motivo de rechazo de las filas con texto más largo que su columna (None si cabe).
+        No se trunca: el valor guardado sería distinto al de la API.
+        """
+        motivos = pd.Series(None, index=convertido.index, dtype=object)
+        for columna in self.columnas:
+            longitud = self.tipos[columna]['longitud']
+            if not longitud or columna in self.categorias:
+                continue
+            largos = convertido[columna].map(lambda v: len(v) if isinstance(v, str) else 0)
+            excedidos = (largos > longitud) & motivos.isna()
+            if excedidos.any():
+                motivos[excedidos] = largos[excedidos].map(
+                    lambda largo: f"Valor de {largo} caracteres en '{columna}' (máximo {longitud})")
+        return motivos
+
+    def preparar(self, df):
+        """Convierte un DataFrame con los campos de la API en filas listas para insertar.
+        Retorna (filas, rechazos) donde rechazos es [(fila, motivo)].
+        """
+        convertido = pd.DataFrame(index=df.index)
+        for columna in self.columnas:
+            campo = columna.upper()
+            serie = df[campo] if campo in df.columns else pd.Series(None, index=df.index, dtype=object)
+            convertido[columna] = self._convertir(columna, serie)
+
+        motivos = self._motivos_longitud(convertido)
+        for columna in self.obligatorias:
+            nulos = convertido[columna].isna() & motivos.isna()
+            motivos[nulos] = f"Valor nulo en columna obligatoria '{columna}'"
+
+        filas = convertido.astype(object).where(convertido.notna(), None).values.tolist()
+        if self.con_hash:
+            for fila in filas:
+                fila.append(calcular_hash_contenido(fila))
+
+        if motivos.isna().all():
+            return filas, []
+        marcas = motivos.where(motivos.notna(), None).tolist()
+        rechazos = [(fila, motivo) for fila, motivo in zip(filas, marcas) if motivo is not None]
+        return [fila for fila, motivo in zip(filas, marcas) if motivo is None], rechazos
+
+    def codificar(self, cursor, filas):
+        """Reemplaza en las filas preparadas los valores categóricos por sus códigos"""
+        for columna, diccionario in self.categorias.items():
+            indice = self.columnas_insercion.index(columna)
+            codigos = diccionario.codificar(cursor, {fila[indice] for fila in filas if fila[indice] is not None})
+            for fila in filas:
+                if fila[indice] is not None:
+                    fila[indice] = codigos[fila[indice]]
+
+
+def calcular_hash_contenido(valores):
+    """Calcula la huella MD5 de los valores ya convertidos de un registro"""
+    contenido = json.dumps(valores, default=str, ensure_ascii=False)
+    return hashlib.md5(contenido.encode('utf-8')).hexdigest()
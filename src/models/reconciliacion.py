@@ -0,0 +1,260 @@
+"""Reconciliación de registros editados y eliminados entre la API y la base de datos."""
+
+import hashlib
+import json
+import time
+
+import numpy as np
+import psycopg2
+
+from src.config.settings import API_URLS, CONFIG_TABLAS, CONFIG_RECONCILIACION, get_database_params
+from src.models.eventos_progreso import emitir_progreso, evento_progreso
+
+# Estadísticas de ArcGIS usadas para la huella de cada tipo de campo
+ESTADISTICAS_POR_TIPO = {
+    'esriFieldTypeOID': ['count', 'sum'],
+    'esriFieldTypeInteger': ['count', 'sum', 'min', 'max'],
+    'esriFieldTypeSmallInteger': ['count', 'sum', 'min', 'max'],
+    'esriFieldTypeDouble': ['count', 'sum', 'min', 'max'],
+    'esriFieldTypeSingle': ['count', 'sum', 'min', 'max'],
+    'esriFieldTypeDate': ['count', 'min', 'max'],
+    'esriFieldTypeString': ['count', 'min', 'max']
+}
+
+# Posición de la revisión por turnos, guardada junto a las huellas de los rangos
+CLAVE_REVISION = '_revision'
+
+
+class Reconciliador:
+    """Detecta registros nuevos, editados y eliminados por rangos de OBJECTID.
+
+    Los conjuntos de OBJECTID se comparan completos (returnIdsOnly contra la
+    llave primaria local). El contenido se compara por rangos fijos de
+    OBJECTID con una huella calculada en el servidor mediante outStatistics;
+    solo los rangos cuya huella difiere de la registrada al escribirlos se
+    descargan de nuevo y se actualizan con upsert.
+
+    Si la capa publica su campo de fecha de edición, su máximo entra en la
+    huella y cualquier edición la cambia. Si no, los textos solo aportan
+    count/min/max y la huella no ve la mayoría de sus ediciones, por lo que
+    además se revisan por turnos unos rangos completos en cada ejecución.
+    La primera reconciliación descarga todos los rangos.
+    """
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+        self.detector = modelo.detector_cambios
+        self.tamano_rango = CONFIG_RECONCILIACION['tamano_rango']
+
+    def obtener_ids_api(self, api_url, controlador=None):
+        """Obtiene todos los OBJECTID publicados por la capa"""
+        params = {'where': '1=1', 'returnIdsOnly': 'true', 'f': 'json'}
+        data = self.modelo.solicitar_pagina(api_url, params, controlador)
+        if data is None:
+            return None
+        return np.unique(np.array(data.get('objectIds') or [], dtype=np.int64))
+
+    def obtener_ids_bd(self, tabla):
+        """Obtiene todos los objectid de la tabla local usando un cursor de servidor"""
+        config = get_database_params()
+        if config is None:
+            raise Exception("No hay configuración de base de datos. Por favor, configure la base de datos primero.")
+
+        conn = psycopg2.connect(**config)
+        try:
+            cursor = conn.cursor(name='qtrazer_reconciliacion_ids')
+            cursor.itersize = 50000
+            cursor.execute(f"SELECT objectid FROM {CONFIG_TABLAS[tabla]['nombre_tabla']} ORDER BY objectid")
+            bloques = []
+            while True:
+                filas = cursor.fetchmany(cursor.itersize)
+                if not filas:
+                    break
+                bloques.append(np.fromiter((fila[0] for fila in filas), dtype=np.int64, count=len(filas)))
+            cursor.close()
+            return np.concatenate(bloques) if bloques else np.array([], dtype=np.int64)
+        finally:
+            conn.close()
+
+    def eliminar_registros(self, tabla, objectids):
+        """Elimina de la tabla local los registros que ya no existen en la API"""
+        config = get_database_params()
+        conn = psycopg2.connect(**config)
+        eliminados = 0
+        try:
+            cursor = conn.cursor()
+            lote = CONFIG_RECONCILIACION['lote_eliminacion']
+            for i in range(0, len(objectids), lote):
+                ids_lote = [int(objectid) for objectid in objectids[i:i + lote]]
+                cursor.execute(
+                    f"DELETE FROM {CONFIG_TABLAS[tabla]['nombre_tabla']} WHERE objectid = ANY(%s)",
+                    (ids_lote,)
+                )
+                eliminados += cursor.rowcount
+            conn.commit()
+            return eliminados
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _definir_estadisticas(self, tabla):
+        """Define las estadísticas que componen la huella de contenido de un rango.
+        Retorna (estadisticas, la capa registra la fecha de edición).
+        """
+        campos_capa, campo_edicion = self.detector.obtener_campos(tabla)
+        estadisticas = []
+        if campo_edicion:
+            for tipo_estadistica in ('count', 'max'):
+                estadisticas.append({
+                    'statisticType': tipo_estadistica,
+                    'onStatisticField': campo_edicion,
+                    'outStatisticFieldName': f"{tipo_estadistica}_edicion"
+                })
+        for columna in CONFIG_TABLAS[tabla]['columnas']:
+            campo = columna.upper()
+            for tipo_estadistica in ESTADISTICAS_POR_TIPO.get(campos_capa.get(campo), []):
+                estadisticas.append({
+                    'statisticType': tipo_estadistica,
+                    'onStatisticField': campo,
+                    'outStatisticFieldName': f"{tipo_estadistica}_{columna}"
+                })
+        return estadisticas, campo_edicion is not None
+
+    def huella_rango(self, api_url, estadisticas, inicio, fin, controlador=None):
+        """Calcula en el servidor la huella de contenido de un rango de OBJECTID"""
+        params = {
+            'where': f"OBJECTID >= {inicio} AND OBJECTID <= {fin}",
+            'outStatistics': json.dumps(estadisticas),
+            'returnGeometry': 'false',
+            'f': 'json'
+        }
+        data = self.modelo.solicitar_pagina(api_url, params, controlador)
+        if data is None:
+            return None
+        features = data.get('features') or [{}]
+        atributos = {k.lower(): v for k, v in features[0].get('attributes', {}).items()}
+        contenido = json.dumps(atributos, sort_keys=True, default=str)
+        return hashlib.md5(contenido.encode('utf-8')).hexdigest()
+
+    def descargar_rango(self, api_url, tabla, inicio, fin, callback_progreso=None, controlador=None):
+        """Descarga un rango de OBJECTID completo y lo actualiza con upsert"""
+        where_condition = f"OBJECTID >= {inicio} AND OBJECTID <= {fin}"
+        offset = 0
+        actualizados = 0
+        while True:
+            tamano_pagina, _ = self.modelo.control_tasa.planificar_ronda(self.tamano_rango)
+            params = {
+                'where': where_condition,
+                'outFields': '*',
+                'f': 'json',
+                'returnGeometry': 'false',
+                'orderByFields': 'OBJECTID',
+                'resultOffset': offset,
+                'resultRecordCount': tamano_pagina
+            }
+            data = self.modelo.solicitar_pagina(api_url, params, controlador, columnar=True)
+            if data is None:
+                return None
+            num_registros = data['num_registros']
+            if num_registros:
+                resultado = self.modelo._insertar_pagina(data['columnas'], tabla, callback_progreso, controlador, modo='upsert')
+                if resultado is False:
+                    raise Exception(f"Error al actualizar el rango {inicio}-{fin} de la tabla {tabla}")
+                actualizados += resultado
+            offset += num_registros
+            if not num_registros or not data.get('exceededTransferLimit'):
+                return actualizados
+
+    def reconciliar(self, tabla, callback_progreso=None, controlador=None):
+        """Sincroniza inserciones, ediciones y eliminaciones de la tabla.
+        Retorna un resumen con los contadores de la reconciliación.
+        """
+        api_url = API_URLS[tabla]
+
+        if callback_progreso:
+            callback_progreso("[INFO] Comparando los OBJECTID de la API y de la base de datos...", 0)
+        ids_api = self.obtener_ids_api(api_url, controlador)
+        if ids_api is None:
+            return None
+        ids_bd = self.obtener_ids_bd(tabla)
+
+        faltantes = np.setdiff1d(ids_api, ids_bd, assume_unique=True)
+        sobrantes = np.setdiff1d(ids_bd, ids_api, assume_unique=True)
+
+        eliminados = 0
+        if len(sobrantes) > 0:
+            eliminados = self.eliminar_registros(tabla, sobrantes)
+            if callback_progreso:
+                callback_progreso(f"[INFO] Registros eliminados en la API y borrados localmente: {eliminados}", 0)
+
+        # Rangos fijos por valor de OBJECTID para que sus límites no cambien entre ejecuciones
+        rangos = np.unique(ids_api // self.tamano_rango)
+        rangos_con_faltantes = set(np.unique(faltantes // self.tamano_rango).tolist())
+        estadisticas, con_edicion = self._definir_estadisticas(tabla)
+        huellas = self.detector.obtener_huellas(tabla)
+        sin_linea_base = not any(clave != CLAVE_REVISION for clave in huellas)
+
+        # Sin fecha de edición: rangos completos que se revisan en esta ejecución, continuando la anterior
+        lista_rangos = rangos.tolist()
+        rangos_revision = set()
+        siguiente_revision = huellas.get(CLAVE_REVISION, 0)
+        if not con_edicion and not sin_linea_base and lista_rangos:
+            cantidad = min(CONFIG_RECONCILIACION['rangos_revision_por_ejecucion'], len(lista_rangos))
+            primero = int(huellas.get(CLAVE_REVISION, 0)) % len(lista_rangos)
+            rangos_revision = {lista_rangos[(primero + k) % len(lista_rangos)] for k in range(cantidad)}
+            siguiente_revision = (primero + cantidad) % len(lista_rangos)
+
+        if callback_progreso:
+            callback_progreso(f"[INFO] Verificando {len(rangos)} rangos de {self.tamano_rango} OBJECTID "
+                              f"({len(faltantes)} registros nuevos, {len(sobrantes)} eliminados)", 0)
+            if sin_linea_base:
+                callback_progreso("[INFO] Primera reconciliación: se descargan todos los rangos y se registran sus huellas", 0)
+            elif not con_edicion:
+                callback_progreso(f"[INFO] La capa no publica la fecha de edición: se revisan completos {len(rangos_revision)} rangos por turno", 0)
+
+        rangos_actualizados = 0
+        registros_actualizados = 0
+        inicio_verificacion = time.time()
+        for i, rango in enumerate(lista_rangos, 1):
+            if controlador and not controlador.esta_actualizando():
+                self.detector.guardar_huellas(tabla, huellas)
+                return None
+
+            inicio = rango * self.tamano_rango
+            fin = inicio + self.tamano_rango - 1
+            clave = str(rango)
+            huella = self.huella_rango(api_url, estadisticas, inicio, fin, controlador)
+            if huella is None:
+                self.detector.guardar_huellas(tabla, huellas)
+                return None
+
+            # Un rango sin huella (primera ejecución, o una anterior interrumpida) se descarga para registrarla
+            cambio = clave not in huellas or huellas[clave] != huella
+            if cambio or rango in rangos_con_faltantes or rango in rangos_revision:
+                resultado = self.descargar_rango(api_url, tabla, inicio, fin, callback_progreso, controlador)
+                if resultado is None:
+                    self.detector.guardar_huellas(tabla, huellas)
+                    return None
+                rangos_actualizados += 1
+                registros_actualizados += resultado
+            huellas[clave] = huella
+
+            emitir_progreso(callback_progreso, evento_progreso(
+                tabla, 'reconciliacion', i, len(rangos), inicio_verificacion,
+                rangos_actualizados=rangos_actualizados))
+
+        # Descartar huellas de rangos que ya no tienen registros en la API
+        rangos_vigentes = {str(rango) for rango in lista_rangos}
+        huellas = {clave: valor for clave, valor in huellas.items() if clave in rangos_vigentes}
+        huellas[CLAVE_REVISION] = siguiente_revision
+        self.detector.guardar_huellas(tabla, huellas)
+
+        return {
+            'rangos_verificados': len(rangos),
+            'rangos_actualizados': rangos_actualizados,
+            'registros_actualizados': registros_actualizados,
+            'registros_nuevos': len(faltantes),
+            'registros_eliminados': eliminados
+        }
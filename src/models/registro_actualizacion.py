@@ -0,0 +1,58 @@
+"""Log completo de las actualizaciones en archivos rotativos, con lectura por páginas."""
+
+import logging
+import os
+import threading
+from logging.handlers import RotatingFileHandler
+
+from src.config.settings import CONFIG_REGISTRO, obtener_directorio_config
+
+_logger = logging.getLogger('qtrazer.registro_actualizacion')
+_logger.propagate = False
+_lock = threading.Lock()
+
+
+def ruta_registro():
+    return os.path.join(obtener_directorio_config(), CONFIG_REGISTRO['archivo'])
+
+
+def obtener_registro():
+    """Retorna el logger del log de actualización, con su archivo rotativo configurado una sola vez."""
+    with _lock:
+        if not _logger.handlers:
+            ruta = ruta_registro()
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            manejador = RotatingFileHandler(
+                ruta,
+                maxBytes=CONFIG_REGISTRO['tamano_max_mb'] * 1024 * 1024,
+                backupCount=CONFIG_REGISTRO['archivos_respaldo'],
+                encoding='utf-8',
+                delay=True
+            )
+            manejador.setFormatter(logging.Formatter('%(asctime)s %(message)s', '%Y-%m-%d %H:%M:%S'))
+            _logger.addHandler(manejador)
+            _logger.setLevel(logging.INFO)
+        return _logger
+
+
+def archivos_registro():
+    """Archivos del log existentes, del más reciente al más antiguo"""
+    ruta = ruta_registro()
+    candidatos = [ruta] + [f"{ruta}.{i}" for i in range(1, CONFIG_REGISTRO['archivos_respaldo'] + 1)]
+    return [archivo for archivo in candidatos if os.path.exists(archivo)]
+
+
+def leer_pagina(archivo, desplazamiento=0, max_lineas=None):
+    """Lee hasta max_lineas desde el byte desplazamiento.
+    Retorna (lineas, desplazamiento_siguiente); lineas vacía al llegar al final.
+    """
+    max_lineas = max_lineas or CONFIG_REGISTRO['lineas_por_pagina']
+    lineas = []
+    with open(archivo, 'rb') as f:
+        f.seek(desplazamiento)
+        while len(lineas) < max_lineas:
+            linea = f.readline()
+            if not linea:
+                break
+            lineas.append(linea.decode('utf-8', errors='replace').rstrip('\r\n'))
+        return lineas, f.tell()
@@ -0,0 +1,108 @@
+"""Filtrado, ordenamiento y exportación de los resultados de una consulta de siniestros.
+
+Funciones sin interfaz que comparten la vista de consulta, el servicio de
+consultas y los benchmarks.
+"""
+
+import os
+
+# Encabezados de la tabla de resultados, en el orden de las filas de obtener_siniestros_por_fecha
+COLUMNAS_VISTA = [
+    "ID", "Formulario", "Fecha", "Hora", "Localidad",
+    "Clases Vehículos", "Placas", "Condiciones Actores",
+    "Fallecidos", "Heridos", "Ilesos", "Estados",
+    "Géneros", "Edades", "Causante", "Causa",
+    "Terreno Vía", "Estado Vía"
+]
+COLUMNAS_NUMERICAS = ["ID", "Fallecidos", "Heridos", "Ilesos"]
+
+# Filtros equivalentes a los de VistaConsulta.aplicar_filtros
+FILTROS = ('localidad', 'vehiculo', 'estado', 'causante', 'objectid', 'formulario', 'hora_inicio', 'hora_fin')
+
+FILAS_POR_HOJA = 100000  # Excel soporta ~1,048,576 filas por hoja
+
+
+def _hora_a_minutos(valor):
+    try:
+        partes = str(valor).split(':')
+        return int(partes[0]) * 60 + int(partes[1])
+    except (ValueError, IndexError):
+        return 0
+
+
+def filtrar_siniestros(resultados, filtros):
+    """Aplica a las filas los filtros de la vista de consulta"""
+    if filtros.get('hora_inicio') and filtros.get('hora_fin'):
+        inicio, fin = _hora_a_minutos(filtros['hora_inicio']), _hora_a_minutos(filtros['hora_fin'])
+        resultados = [r for r in resultados if r[3] and inicio <= _hora_a_minutos(r[3]) <= fin]
+    if filtros.get('localidad'):
+        resultados = [r for r in resultados if str(r[4]).strip() == filtros['localidad'].strip()]
+    if filtros.get('vehiculo'):
+        resultados = [r for r in resultados if filtros['vehiculo'] in str(r[5]).split(', ')]
+    if filtros.get('estado'):
+        resultados = [r for r in resultados if filtros['estado'] in str(r[11]).split(', ')]
+    if filtros.get('causante'):
+        resultados = [r for r in resultados if str(r[15]).strip() == filtros['causante'].strip()]
+    if filtros.get('objectid'):
+        resultados = [r for r in resultados if str(r[0]).strip() == filtros['objectid'].strip()]
+    if filtros.get('formulario'):
+        resultados = [r for r in resultados if str(r[1]).strip() == filtros['formulario'].strip()]
+    return resultados
+
+
+def ordenar_siniestros(datos, columna, descendente):
+    """Ordena las filas por la columna de la vista; lanza ValueError si la columna no existe"""
+    indice = COLUMNAS_VISTA.index(columna)
+    if columna in COLUMNAS_NUMERICAS:
+        clave = lambda x: int(x[indice]) if x[indice] and str(x[indice]).isdigit() else 0
+    elif columna in ["Fecha", "Hora"]:
+        clave = lambda x: x[indice] if x[indice] else ""
+    else:
+        clave = lambda x: str(x[indice]).lower() if x[indice] else ""
+    return sorted(datos, key=clave, reverse=descendente)
+
+
+def escribir_excel(df, destino, progreso=None, filas_por_hoja=FILAS_POR_HOJA):
+    """Escribe el DataFrame en un libro de Excel (una hoja por cada filas_por_hoja filas).
+    Se escribe en un temporal de la misma carpeta y se mueve al destino al terminar;
+    progreso(porcentaje) se llama entre hojas.
+    """
+    import pandas as pd
+
+    carpeta_destino = os.path.dirname(destino) or os.getcwd()
+    ruta_tmp = os.path.join(carpeta_destino, f".__tmp_{os.path.basename(destino)}")
+    total_filas = len(df)
+    try:
+        with pd.ExcelWriter(ruta_tmp, engine="openpyxl") as writer:
+            if total_filas <= filas_por_hoja:
+                if progreso:
+                    progreso(50)
+                df.to_excel(writer, sheet_name="Datos", index=False)
+                if progreso:
+                    progreso(90)
+            else:
+                num_hojas = (total_filas + filas_por_hoja - 1) // filas_por_hoja
+                progreso_por_hoja = 80 / num_hojas
+                for i in range(num_hojas):
+                    if progreso:
+                        progreso(10 + i * progreso_por_hoja)
+                    df.iloc[i * filas_por_hoja:min((i + 1) * filas_por_hoja, total_filas)].to_excel(
+                        writer, sheet_name=f"Datos_{i + 1}", index=False)
+
+        # Mover atómicamente al destino final
+        if progreso:
+            progreso(95)
+        if os.path.exists(destino):
+            try:
+                os.remove(destino)
+            except Exception:
+                pass
+        os.replace(ruta_tmp, destino)
+    finally:
+        # Limpiar temporal si quedó
+        if os.path.exists(ruta_tmp):
+            try:
+                os.remove(ruta_tmp)
+            except Exception:
+                pass
+    return destino
@@ -0,0 +1,254 @@
+"""Servicio HTTP/JSON de consultas de siniestros con caché de resultados compartida."""
+
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime, time as hora
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from psycopg2.pool import ThreadedConnectionPool
+
+from src.config.settings import CONFIG_SERVICIO_CONSULTAS
+from src.models.database import GestorBaseDatos
+from src.models.resultados_consulta import FILTROS, filtrar_siniestros
+
+logger = logging.getLogger(__name__)
+
+# Columnas de cada fila de obtener_siniestros_por_fecha, en orden
+COLUMNAS_SINIESTROS = [
+    'objectid', 'formulario', 'fecha_ocurrencia_acc', 'hora_ocurrencia_acc', 'localidad',
+    'clases', 'placas', 'condiciones_a', 'fallecidos', 'heridos', 'ilesos',
+    'estados', 'generos', 'edades', 'causante', 'causa', 'terreno_via', 'estado_via'
+]
+
+
+class CacheResultados:
+    """Caché LRU con vencimiento compartida por todas las solicitudes.
+
+    Si varias solicitudes piden a la vez un resultado que no está en caché, solo
+    la primera lo calcula y las demás esperan y reutilizan su resultado.
+    """
+
+    def __init__(self, ttl=None, max_entradas=None, max_registros=None):
+        self.ttl = ttl if ttl is not None else CONFIG_SERVICIO_CONSULTAS['cache_ttl']
+        self.max_entradas = max_entradas or CONFIG_SERVICIO_CONSULTAS['cache_max_entradas']
+        self.max_registros = max_registros or CONFIG_SERVICIO_CONSULTAS['cache_max_registros']
+        self._entradas = OrderedDict()  # clave -> (vence, resultados)
+        self._en_curso = {}
+        self._registros = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _quitar(self, clave):
+        _, resultados = self._entradas.pop(clave)
+        self._registros -= len(resultados)
+
+    def obtener(self, clave, calcular):
+        """Retorna el resultado en caché o lo calcula una sola vez con calcular()"""
+        while True:
+            with self._lock:
+                entrada = self._entradas.get(clave)
+                if entrada and entrada[0] > time.monotonic():
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return entrada[1]
+                if entrada:
+                    self._quitar(clave)
+                evento = self._en_curso.get(clave)
+                if evento is None:
+                    evento = self._en_curso[clave] = threading.Event()
+                    self.fallos += 1
+                    break
+            # Otra solicitud ya lo está calculando; si falla, esta lo intenta de nuevo
+            evento.wait()
+
+        try:
+            resultados = calcular()
+            with self._lock:
+                if len(resultados) <= self.max_registros:
+                    self._entradas[clave] = (time.monotonic() + self.ttl, resultados)
+                    self._registros += len(resultados)
+                    while len(self._entradas) > self.max_entradas or self._registros > self.max_registros:
+                        self._quitar(next(iter(self._entradas)))
+            return resultados
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+            evento.set()
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._registros = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'entradas': len(self._entradas),
+                'registros': self._registros,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos
+            }
+
+
+def _valor_json(valor):
+    if isinstance(valor, (date, datetime, hora)):
+        return valor.isoformat()
+    return str(valor)
+
+
+class ManejadorConsultas(BaseHTTPRequestHandler):
+    """Atiende GET /siniestros y GET /estado."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'QtrazerConsultas/1.0'
+
+    def log_message(self, formato, *args):
+        logger.debug("[servicio consultas] %s " + formato, self.address_string(), *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parametros = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+        try:
+            if url.path == '/siniestros':
+                self._responder_siniestros(parametros)
+            elif url.path == '/estado':
+                self._responder_json(200, {
+                    'cache': self.server.cache.estadisticas(),
+                    'consultas_en_curso': self.server.consultas_en_curso
+                })
+            else:
+                self._responder_json(404, {'error': f"Ruta no encontrada: {url.path}"})
+        except ValueError as e:
+            self._responder_json(400, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # el cliente cerró la conexión
+        except Exception as e:
+            logger.error("Error en el servicio de consultas: %s", e)
+            self._responder_json(503, {'error': str(e)})
+
+    def _responder_json(self, estado, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _leer_parametros(self, parametros):
+        try:
+            fecha_inicio = date.fromisoformat(parametros['fecha_inicio'])
+            fecha_fin = date.fromisoformat(parametros['fecha_fin'])
+        except KeyError as e:
+            raise ValueError(f"Falta el parámetro {e.args[0]}")
+        except ValueError:
+            raise ValueError("Las fechas deben tener el formato AAAA-MM-DD")
+        if fecha_inicio > fecha_fin:
+            raise ValueError("fecha_inicio es posterior a fecha_fin")
+
+        try:
+            pagina = int(parametros.get('pagina', 0))
+            tamano_pagina = int(parametros.get('tamano_pagina', CONFIG_SERVICIO_CONSULTAS['tamano_pagina']))
+        except ValueError:
+            raise ValueError("pagina y tamano_pagina deben ser enteros")
+        if pagina < 0 or tamano_pagina < 1:
+            raise ValueError("pagina debe ser >= 0 y tamano_pagina >= 1")
+        tamano_pagina = min(tamano_pagina, CONFIG_SERVICIO_CONSULTAS['tamano_pagina_max'])
+
+        filtros = {clave: parametros[clave] for clave in FILTROS if parametros.get(clave)}
+        return fecha_inicio, fecha_fin, filtros, pagina, tamano_pagina
+
+    def _responder_siniestros(self, parametros):
+        fecha_inicio, fecha_fin, filtros, pagina, tamano_pagina = self._leer_parametros(parametros)
+        resultados = self.server.obtener_siniestros(fecha_inicio, fecha_fin, filtros)
+        total = len(resultados)
+        filas = resultados[pagina * tamano_pagina:(pagina + 1) * tamano_pagina]
+
+        # Indica al cliente qué columnas debe convertir de texto a fecha u hora
+        muestra = {}
+        for fila in filas[:100]:
+            for indice, valor in enumerate(fila):
+                if valor is not None and indice not in muestra:
+                    muestra[indice] = valor
+        encabezado = {
+            'total': total,
+            'pagina': pagina,
+            'tamano_pagina': tamano_pagina,
+            'columnas': COLUMNAS_SINIESTROS,
+            'columnas_fecha': [i for i, v in muestra.items() if isinstance(v, date) and not isinstance(v, datetime)],
+            'columnas_hora': [i for i, v in muestra.items() if isinstance(v, hora)]
+        }
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        comprimir = 'gzip' in self.headers.get('Accept-Encoding', '')
+        if comprimir:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+
+        compresor = zlib.compressobj(6, zlib.DEFLATED, 31) if comprimir else None
+
+        def enviar(texto):
+            datos = texto.encode('utf-8')
+            if compresor:
+                datos = compresor.compress(datos)
+            if datos:
+                self.wfile.write(f"{len(datos):X}\r\n".encode('ascii') + datos + b"\r\n")
+
+        # Las filas se serializan por bloques: la memoria de la respuesta no crece con la página
+        enviar(json.dumps(encabezado, ensure_ascii=False)[:-1] + ', "registros": [')
+        bloque = CONFIG_SERVICIO_CONSULTAS['registros_por_bloque']
+        for inicio in range(0, len(filas), bloque):
+            texto = json.dumps(filas[inicio:inicio + bloque], ensure_ascii=False, default=_valor_json)[1:-1]
+            enviar(texto if inicio == 0 else ', ' + texto)
+        enviar(']}')
+        if compresor:
+            final = compresor.flush()
+            self.wfile.write(f"{len(final):X}\r\n".encode('ascii') + final + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class ServidorConsultas(ThreadingHTTPServer):
+    """Servidor HTTP multihilo con pool de conexiones a PostgreSQL y caché compartida."""
+
+    daemon_threads = True
+
+    def __init__(self, config_bd, host=None, puerto=None, cache=None):
+        host = host or CONFIG_SERVICIO_CONSULTAS['host']
+        puerto = puerto if puerto is not None else CONFIG_SERVICIO_CONSULTAS['puerto']
+        self.conexiones_max = CONFIG_SERVICIO_CONSULTAS['conexiones_max']
+        self.pool = ThreadedConnectionPool(CONFIG_SERVICIO_CONSULTAS['conexiones_min'], self.conexiones_max, **config_bd)
+        # El pool lanza error si se agota; las consultas excedentes esperan turno
+        self.consultas_disponibles = threading.BoundedSemaphore(self.conexiones_max)
+        self.consultas_en_curso = 0
+        self._lock_contador = threading.Lock()
+        self.cache = cache or CacheResultados()
+        super().__init__((host, puerto), ManejadorConsultas)
+
+    def obtener_siniestros(self, fecha_inicio, fecha_fin, filtros=None):
+        """Siniestros del rango, filtrados, desde la caché o la base de datos"""
+        def consultar():
+            with self.consultas_disponibles:
+                with self._lock_contador:
+                    self.consultas_en_curso += 1
+                try:
+                    return GestorBaseDatos(self.pool).obtener_siniestros_por_fecha(fecha_inicio, fecha_fin)
+                finally:
+                    with self._lock_contador:
+                        self.consultas_en_curso -= 1
+
+        resultados = self.cache.obtener((fecha_inicio, fecha_fin), consultar)
+        if not filtros:
+            return resultados
+        clave = (fecha_inicio, fecha_fin, tuple(sorted(filtros.items())))
+        return self.cache.obtener(clave, lambda: filtrar_siniestros(resultados, filtros))
+
+    def server_close(self):
+        super().server_close()
+        self.pool.closeall()
@@ -0,0 +1,136 @@
+"""Servicio de sincronización incremental continua de las capas de ArcGIS."""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from src.config.settings import CONFIG_SINCRONIZACION, obtener_directorio_config
+
+logger = logging.getLogger(__name__)
+
+
+def _fecha_iso(marca):
+    return datetime.fromtimestamp(marca).isoformat(timespec='seconds') if marca else None
+
+
+class ServicioSincronizacion:
+    """Consulta cada capa en su propio intervalo y trae solo los registros nuevos.
+
+    Cada ejecución usa ModeloActualizacion.actualizar_datos (pre-verificación por
+    metadatos y descarga incremental por OBJECTID); nunca reconcilia ni fuerza.
+    Las métricas de cada ejecución y el atraso de cada tabla se escriben en el
+    archivo de estado del servicio.
+    """
+
+    def __init__(self, modelo, tablas=None, callback_progreso=None, ruta_estado=None):
+        self.modelo = modelo
+        self.callback_progreso = callback_progreso
+        self.intervalos = {
+            tabla: intervalo for tabla, intervalo in CONFIG_SINCRONIZACION['intervalos'].items()
+            if tablas is None or tabla in tablas
+        }
+        self.ruta_estado = ruta_estado or os.path.join(obtener_directorio_config(), CONFIG_SINCRONIZACION['archivo_estado'])
+        self.tabla_actual = None
+        self._detener = threading.Event()
+        self._estado = {
+            'pid': os.getpid(),
+            'inicio_servicio': _fecha_iso(time.time()),
+            'tablas': {tabla: {'ejecuciones': 0, 'fallos': 0} for tabla in self.intervalos}
+        }
+
+    def esta_actualizando(self):
+        """Permite al modelo detectar la detención del servicio (mismo contrato que el controlador)."""
+        return not self._detener.is_set()
+
+    def detener(self):
+        """Solicita la detención; la ejecución en curso se cancela en el siguiente punto de control."""
+        self._detener.set()
+
+    def _guardar_estado(self):
+        """Escribe el archivo de estado de forma atómica"""
+        self._estado['actualizado'] = _fecha_iso(time.time())
+        try:
+            ruta_tmp = self.ruta_estado + '.tmp'
+            with open(ruta_tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._estado, f, indent=4, ensure_ascii=False)
+            os.replace(ruta_tmp, self.ruta_estado)
+        except Exception as e:
+            logger.error("Error al guardar el estado del servicio de sincronización: %s", e)
+
+    def sincronizar_tabla(self, tabla):
+        """Ejecuta una sincronización incremental de la tabla y registra sus métricas"""
+        self.tabla_actual = tabla
+        self.modelo.ultimo_resumen = None
+        inicio = time.time()
+        try:
+            resultado = bool(self.modelo.actualizar_datos(tabla, self.callback_progreso, self))
+        except Exception as e:
+            logger.error("Error en la sincronización de %s: %s", tabla, e)
+            resultado = False
+        duracion = time.time() - inicio
+
+        resumen = self.modelo.ultimo_resumen or {}
+        estado = self._estado['tablas'][tabla]
+        estado['ejecuciones'] += 1
+        if not resultado:
+            estado['fallos'] += 1
+
+        insertados = resumen.get('insertados', 0)
+        estado['ultima_ejecucion'] = {
+            'inicio': _fecha_iso(inicio),
+            'duracion_segundos': round(duracion, 2),
+            'resultado': 'exito' if resultado else 'fallo',
+            'registros_obtenidos': resumen.get('obtenidos', 0),
+            'registros_insertados': insertados,
+            'paginas': resumen.get('paginas', 0),
+            'registros_por_segundo': round(insertados / duracion, 1) if duracion > 0 else 0.0
+        }
+
+        # Atraso: registros de la capa que aún no están en la tabla y tiempo desde la última vez al día
+        max_objectid_api = resumen.get('max_objectid_api')
+        if resultado and max_objectid_api is not None:
+            try:
+                pendientes = max(0, max_objectid_api - self.modelo.get_max_objectid(tabla))
+            except Exception as e:
+                # Un error pasajero de la base de datos no debe detener el servicio; el atraso queda como estaba
+                logger.error("Error al calcular el atraso de %s: %s", tabla, e)
+            else:
+                estado['objectids_pendientes'] = pendientes
+                if pendientes == 0:
+                    estado['ultima_vez_al_dia'] = _fecha_iso(time.time())
+        if estado.get('ultima_vez_al_dia'):
+            al_dia = datetime.fromisoformat(estado['ultima_vez_al_dia']).timestamp()
+            estado['atraso_segundos'] = 0 if estado.get('objectids_pendientes') == 0 else round(time.time() - al_dia)
+
+        self.tabla_actual = None
+        return resultado
+
+    def ejecutar(self):
+        """Ejecuta el ciclo de sincronización hasta que se llame a detener()"""
+        proximas = {tabla: time.time() for tabla in self.intervalos}
+        self._guardar_estado()
+
+        while not self._detener.is_set():
+            tabla = min(proximas, key=proximas.get)
+            espera = proximas[tabla] - time.time()
+            if espera > 0:
+                if self._detener.wait(espera):
+                    break
+                continue
+
+            resultado = self.sincronizar_tabla(tabla)
+            if self._detener.is_set():
+                break
+
+            intervalo = self.intervalos[tabla]
+            if not resultado:
+                intervalo = min(intervalo, CONFIG_SINCRONIZACION['reintento_fallo'])
+            proximas[tabla] = time.time() + intervalo
+            self._estado['tablas'][tabla]['proxima_ejecucion'] = _fecha_iso(proximas[tabla])
+            self._guardar_estado()
+
+        self._estado['detenido'] = _fecha_iso(time.time())
+        self._guardar_estado()
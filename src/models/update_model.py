@@ -1,484 +1,180 @@
 """Modelo para la actualización de datos de siniestros viales."""
 
+import logging
 import psycopg2
+from psycopg2.extras import execute_values
 import requests
 import pandas as pd
 from datetime import datetime
+import json
+from concurrent.futures import ThreadPoolExecutor
 import time
 import sys
 import os
-import sys
 
 # Agregar el directorio raíz al PYTHONPATH
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from src.config.settings import get_database_params, CONFIG_TABLAS, CAMPOS_API, COLUMNAS_FECHA, API_URLS, CAMPOS_API_ACTOR_VIAL
+from src.config.settings import get_database_params, obtener_directorio_config, CONFIG_TABLAS, CAMPOS_API, API_URLS, CAMPOS_API_ACTOR_VIAL, CONFIG_ACTUALIZACION
+from src.models.cliente_http import obtener_cliente_http
+from src.models.decodificador_json import decodificar_pagina
+from src.models.eventos_progreso import emitir_progreso, evento_progreso
+from src.models.metricas import Medicion
+from src.models.detector_cambios import DetectorCambios
+from src.models.reconciliacion import Reconciliador
+from src.models.bloqueo_sincronizacion import BloqueoSincronizacion
+from src.models.carga_inicial import CargaInicialMasiva
+from src.models.plan_carga import PlanCarga
+from src.models.control_tasa import ControladorTasa, FALLO_TIMEOUT, FALLO_LIMITE, FALLO_SERVIDOR, FALLO_CONEXION
+
+logger = logging.getLogger(__name__)
 
 class ModeloActualizacion:
     def __init__(self):
-        self.MAX_RETRIES = 3
-        self.RETRY_DELAY = 5  # segundos
-        self.PAGE_SIZE = 1000  # número de registros por página (optimizado para APIs rápidas)
-        self.REQUEST_DELAY = 0.5  # segundos entre solicitudes (reducido para APIs rápidas)
+        self.MAX_RETRIES = CONFIG_ACTUALIZACION['max_reintentos']
+        # Tasa, tamaño de página y concurrencia se ajustan según la respuesta del servidor
+        self.control_tasa = ControladorTasa()
+        self.http = obtener_cliente_http()
+        self.detector_cambios = DetectorCambios()
+        self.reconciliador = Reconciliador(self)
+        self.carga_inicial = CargaInicialMasiva()
+        # Toda escritura de la sincronización pasa por este bloqueo de la base de datos
+        self.bloqueo = BloqueoSincronizacion()
         self.API_TIMEOUT = 60  # timeout aumentado para APIs lentas
         self.MAX_INITIAL_RECORDS = 50000  # límite para carga inicial masiva
-        self.DIAS = {
-            'LUNES': 1, 'MARTES': 2, 'MIERCOLES': 3, 'JUEVES': 4,
-            'VIERNES': 5, 'SABADO': 6, 'DOMINGO': 7
-        }
+        self.ARCHIVO_RECHAZOS = 'qtrazer_rechazos.jsonl'  # registros que la base de datos no aceptó
+        self._planes_carga = {}
+        # Contadores de la última llamada a actualizar_datos (para métricas de la sincronización)
+        self.ultimo_resumen = None
+        # Tiempos por etapa de la ejecución en curso; actualizar_datos y reconciliar_datos crean una por tabla
+        self.medicion = Medicion('actualizacion')
 
-    def convertir_dia_a_numero(self, dia):
-        """Convierte el nombre del día a su número correspondiente"""
-        if isinstance(dia, str):
-            return self.DIAS.get(dia.upper(), 0)
-        return 0
-    
-
-    def obtener_campos_fecha_por_tabla(self, tabla):
-        """Obtiene los campos de fecha específicos para cada tabla"""
-        campos_fecha_por_tabla = {
-            'Accidente': ['fecha_ocurrencia_acc', 'fecha_hora_acc'],
-            'ActorVial': ['fecha_posterior_muerte', 'fecha_nacimiento'],
-            'Causa': [],  # No tiene campos de fecha
-            'AccidenteVehiculo': [],  # No tiene campos de fecha
-            'Accidente_via': []  # No tiene campos de fecha
-        }
-        return campos_fecha_por_tabla.get(tabla, [])
+    def obtener_plan_carga(self, cursor, config_tabla, nombre_tabla, modo='insertar'):
+        """Retorna el plan de carga de la tabla, compilándolo solo la primera vez"""
+        config = get_database_params() or {}
+        clave = (config.get('host'), config.get('port'), config.get('dbname'), config_tabla, nombre_tabla, modo)
+        plan = self._planes_carga.get(clave)
+        if plan is None:
+            plan = PlanCarga.compilar(cursor, config_tabla, nombre_tabla, modo)
+            self._planes_carga[clave] = plan
+            logger.debug("Plan de carga compilado para %s: %s", nombre_tabla, plan.columnas_insercion)
+        return plan
 
-    def limpiar_valores_fecha(self, df, campos_fecha):
-        """Limpia valores vacíos e inválidos en campos de fecha para todas las tablas.
-        También convierte timestamps de milisegundos a formatos de fecha apropiados.
+    def _insertar_lote(self, cursor, consulta, filas):
+        """Inserta un lote dentro de un savepoint; si falla, lo divide en mitades hasta aislar
+        los registros inválidos. Retorna (insertados, [(fila, motivo)] rechazados).
         """
-        print(f"DEBUG: Limpiando campos de fecha: {campos_fecha}")
+        cursor.execute("SAVEPOINT qtrazer_lote")
+        try:
+            execute_values(cursor, consulta, filas, page_size=len(filas))
+            # RELEASE deja rowcount en -1: se lee antes
+            insertados = max(cursor.rowcount, 0)
+            cursor.execute("RELEASE SAVEPOINT qtrazer_lote")
+            return insertados, []
+        except psycopg2.DataError as e:
+            error = e
+        except psycopg2.IntegrityError as e:
+            error = e
+        cursor.execute("ROLLBACK TO SAVEPOINT qtrazer_lote")
+        cursor.execute("RELEASE SAVEPOINT qtrazer_lote")
         
-        for columna in campos_fecha:
-            if columna in df.columns:
-                print(f"DEBUG: Procesando columna {columna}")
-                print(f"DEBUG: Valores únicos antes de limpieza: {df[columna].unique()[:10]}")
-                
-                try:
-                    # Limpiar la columna: reemplazar cadenas vacías y valores inválidos con None
-                    df[columna] = df[columna].replace('', None)
-                    df[columna] = df[columna].replace('null', None)
-                    df[columna] = df[columna].replace('NULL', None)
-                    df[columna] = df[columna].replace('None', None)
-                    df[columna] = df[columna].replace('nan', None)
-                    df[columna] = df[columna].replace('NaN', None)
-                    
-                    # Convertir valores que son solo espacios en blanco a None
-                    df[columna] = df[columna].apply(lambda x: None if isinstance(x, str) and x.strip() == '' else x)
-                    
-                    print(f"DEBUG: Valores únicos después de limpieza: {df[columna].unique()[:10]}")
-                    
-                    # Verificar si hay timestamps de milisegundos para convertir
-                    mask_not_null = df[columna].notna()
-                    if mask_not_null.any():
-                        valores_not_null = df.loc[mask_not_null, columna]
-                        
-                        # Verificar si los valores son timestamps numéricos
-                        valores_numericos = pd.to_numeric(valores_not_null, errors='coerce')
-                        mask_numeric = valores_numericos.notna()
-                        mask_positive = valores_numericos > 0
-                        mask_timestamp = mask_numeric & mask_positive
-                        
-                        # Verificar si los valores parecen ser timestamps (mayores a 1000000000000 para milisegundos)
-                        if mask_timestamp.any():
-                            timestamps = valores_numericos[mask_timestamp]
-                            # Verificar si son timestamps de milisegundos (13 dígitos)
-                            mask_milliseconds = (timestamps >= 1000000000000) & (timestamps < 10000000000000)
-                            
-                            if mask_milliseconds.any():
-                                print(f"DEBUG: Detectados timestamps de milisegundos en {columna}")
-                                # Convertir timestamps de milisegundos a datetime
-                                timestamps_validos = timestamps[mask_milliseconds]
-                                fechas_convertidas = pd.to_datetime(timestamps_validos, unit='ms')
-                                
-                                # Asignar las fechas convertidas
-                                indices_validos = df.loc[mask_not_null & mask_timestamp & mask_milliseconds, columna].index
-                                df.loc[indices_validos, columna] = fechas_convertidas
-                                
-                                # Formatear según el tipo de columna
-                                if columna in ['fecha_ocurrencia_acc', 'fecha_posterior_muerte', 'fecha_nacimiento']:
-                                    # Formato DATE: YYYY-MM-DD
-                                    df.loc[indices_validos, columna] = fechas_convertidas.dt.strftime('%Y-%m-%d')
-                                    print(f"DEBUG: Formateado como DATE: {df.loc[indices_validos, columna].iloc[0] if len(indices_validos) > 0 else 'N/A'}")
-                                elif columna in ['fecha_hora_acc']:
-                                    # Formato TIMESTAMP: YYYY-MM-DD HH:MM:SS
-                                    df.loc[indices_validos, columna] = fechas_convertidas.dt.strftime('%Y-%m-%d %H:%M:%S')
-                                    print(f"DEBUG: Formateado como TIMESTAMP: {df.loc[indices_validos, columna].iloc[0] if len(indices_validos) > 0 else 'N/A'}")
-                                
-                                # Convertir valores que no son timestamps válidos a None
-                                df.loc[mask_not_null & mask_timestamp & ~mask_milliseconds, columna] = None
-                    
-                    # Reemplazar NaT con None
-                    df[columna] = df[columna].where(df[columna].notna(), None)
-                    
-                    print(f"DEBUG: Valores finales de {columna}: {df[columna].unique()[:10]}")
-                    
-                except Exception as e:
-                    print(f"\nAdvertencia: No se pudo limpiar la columna {columna}: {str(e)}")
-                    # En caso de error, convertir a None para evitar errores de inserción
-                    df[columna] = None
+        if len(filas) == 1:
+            motivo = (error.pgerror or str(error)).strip().splitlines()[0]
+            return 0, [(filas[0], motivo)]
         
-        return df
+        mitad = len(filas) // 2
+        insertados_a, rechazos_a = self._insertar_lote(cursor, consulta, filas[:mitad])
+        insertados_b, rechazos_b = self._insertar_lote(cursor, consulta, filas[mitad:])
+        return insertados_a + insertados_b, rechazos_a + rechazos_b
+
+    def registrar_rechazos(self, nombre_tabla, columnas, rechazos):
+        """Agrega los registros rechazados y su motivo al archivo de rechazos (JSON por línea)"""
+        ruta = os.path.join(obtener_directorio_config(), self.ARCHIVO_RECHAZOS)
+        fecha = datetime.now().isoformat(timespec='seconds')
+        try:
+            with open(ruta, 'a', encoding='utf-8') as f:
+                for fila, motivo in rechazos:
+                    registro = {
+                        'fecha': fecha,
+                        'tabla': nombre_tabla,
+                        'motivo': motivo,
+                        'valores': dict(zip(columnas, fila))
+                    }
+                    f.write(json.dumps(registro, default=str, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logger.error("Error al guardar los registros rechazados: %s", e)
 
-    def formatear_fechas(self, df):
-        """Formatea las columnas de fecha al formato correcto para PostgreSQL.
-        Convierte timestamps de milisegundos de la API a formatos de fecha/datetime de PostgreSQL.
+    def insertar_registros(self, df, config_tabla, callback_progreso=None, controlador=None, modo='insertar', tabla_destino=None):
+        """Inserta los registros en la base de datos.
+        Con modo='upsert' los registros existentes se actualizan solo si su huella de contenido cambió.
+        tabla_destino permite insertar en la tabla de staging de la carga inicial masiva.
         """
-        print(f"DEBUG: Iniciando formateo de fechas. Columnas: {list(df.columns)}")
-        
-        for columna in COLUMNAS_FECHA:
-            if columna in df.columns:
-                print(f"DEBUG: Procesando columna {columna}")
-                print(f"DEBUG: Valores únicos antes de limpieza: {df[columna].unique()[:10]}")
-                
-                try:
-                    # Limpiar la columna: reemplazar cadenas vacías y valores inválidos con None
-                    df[columna] = df[columna].replace('', None)
-                    df[columna] = df[columna].replace('null', None)
-                    df[columna] = df[columna].replace('NULL', None)
-                    df[columna] = df[columna].replace('None', None)
-                    df[columna] = df[columna].replace('nan', None)
-                    df[columna] = df[columna].replace('NaN', None)
-                    
-                    # Convertir valores que son solo espacios en blanco a None
-                    df[columna] = df[columna].apply(lambda x: None if isinstance(x, str) and x.strip() == '' else x)
-                    
-                    print(f"DEBUG: Valores únicos después de limpieza: {df[columna].unique()[:10]}")
-                    
-                    # Verificar si la columna tiene valores válidos después de la limpieza
-                    if df[columna].isna().all():
-                        print(f"DEBUG: Todos los valores de {columna} son None/NaN")
-                        df[columna] = None
-                        continue
-                    
-                    # Convertir valores no nulos de milisegundos a datetime
-                    mask_not_null = df[columna].notna()
-                    if mask_not_null.any():
-                        valores_not_null = df.loc[mask_not_null, columna]
-                        print(f"DEBUG: Valores no nulos de {columna}: {valores_not_null.unique()[:5]}")
-                        
-                        # Convertir a numérico para verificar si son timestamps válidos
-                        valores_numericos = pd.to_numeric(valores_not_null, errors='coerce')
-                        mask_numeric = valores_numericos.notna()
-                        mask_positive = valores_numericos > 0
-                        mask_valid = mask_numeric & mask_positive
-                        
-                        print(f"DEBUG: Máscara válida para {columna}: {mask_valid.sum()} valores válidos de {len(mask_valid)}")
-                        
-                        if mask_valid.any():
-                            # Convertir de milisegundos a datetime solo para valores válidos
-                            timestamps_validos = valores_numericos[mask_valid]
-                            fechas_convertidas = pd.to_datetime(timestamps_validos, unit='ms')
-                            
-                            # Asignar las fechas convertidas de vuelta al DataFrame
-                            indices_validos = df.loc[mask_not_null & mask_valid, columna].index
-                            df.loc[indices_validos, columna] = fechas_convertidas
-                            
-                            # Formatear según el tipo de columna
-                            if columna in ['FECHA_OCURRENCIA_ACC', 'FECHA_POSTERIOR_MUERTE', 'FECHA_NACIMIENTO']:
-                                # Formato DATE: YYYY-MM-DD
-                                df.loc[indices_validos, columna] = fechas_convertidas.dt.strftime('%Y-%m-%d')
-                                print(f"DEBUG: Formateado como DATE: {df.loc[indices_validos, columna].iloc[0] if len(indices_validos) > 0 else 'N/A'}")
-                            elif columna in ['FECHA_HORA_ACC']:
-                                # Formato TIMESTAMP: YYYY-MM-DD HH:MM:SS
-                                df.loc[indices_validos, columna] = fechas_convertidas.dt.strftime('%Y-%m-%d %H:%M:%S')
-                                print(f"DEBUG: Formateado como TIMESTAMP: {df.loc[indices_validos, columna].iloc[0] if len(indices_validos) > 0 else 'N/A'}")
-                        
-                        # Convertir valores inválidos a None
-                        df.loc[mask_not_null & ~mask_valid, columna] = None
-                        print(f"DEBUG: Valores inválidos convertidos a None: {(~mask_valid).sum()}")
-                    
-                    # Reemplazar NaT con None (que se convertirá a NULL en PostgreSQL)
-                    df[columna] = df[columna].where(df[columna].notna(), None)
-                    
-                    print(f"DEBUG: Valores finales de {columna}: {df[columna].unique()[:10]}")
-                    
-                except Exception as e:
-                    print(f"\nAdvertencia: No se pudo formatear la columna {columna}: {str(e)}")
-                    # En caso de error, convertir a None para evitar errores de inserción
-                    df[columna] = None
-        return df
-
-    def insertar_registros(self, df, config_tabla, callback_progreso=None, controlador=None):
-        """Inserta los registros en la base de datos"""
         try:
             config = get_database_params()
             if config is None:
                 raise Exception("No hay configuración de base de datos. Por favor, configure la base de datos primero.")
             
             # Validar conexión antes de insertar
-            conn = psycopg2.connect(**config)
-            cursor = conn.cursor()
+            with self.medicion.etapa('bd_conexion'):
+                conn = psycopg2.connect(**config)
+                cursor = conn.cursor()
+                
+                # Verificar que la conexión funciona
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
             
-            # Verificar que la conexión funciona
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
+            if tabla_destino:
+                # La tabla de staging es UNLOGGED y se descarta ante cualquier fallo
+                cursor.execute("SET synchronous_commit TO OFF")
+            
+            # El plan mapea, convierte y valida la página completa y trae la sentencia ya construida
+            nombre_tabla = tabla_destino or CONFIG_TABLAS[config_tabla]['nombre_tabla']
+            plan = self.obtener_plan_carga(cursor, config_tabla, nombre_tabla, modo)
+            with self.medicion.etapa('preparacion') as etapa:
+                filas, rechazos_plan = plan.preparar(df)
+                etapa['registros'] = len(filas)
+            if rechazos_plan:
+                self.registrar_rechazos(nombre_tabla, plan.columnas_insercion, rechazos_plan)
+                if callback_progreso:
+                    callback_progreso(f"[ADVERTENCIA] {len(rechazos_plan)} registros rechazados en {nombre_tabla} (ver {self.ARCHIVO_RECHAZOS}): {rechazos_plan[0][1]}", 0)
             
-            # Mapear los nombres de columnas de la API a los nombres de la base de datos
-            mapeo_columnas = {}
-            if config_tabla == 'Accidente':
-                mapeo_columnas = {
-                    'OBJECTID': 'objectid',
-                    'FORMULARIO': 'formulario',
-                    'CODIGO_ACCIDENTE': 'codigo_accidente',
-                    'FECHA_OCURRENCIA_ACC': 'fecha_ocurrencia_acc',
-                    'HORA_OCURRENCIA_ACC': 'hora_ocurrencia_acc',
-                    'ANO_OCURRENCIA_ACC': 'ano_ocurrencia_acc',
-                    'MES_OCURRENCIA_ACC': 'mes_ocurrencia_acc',
-                    'DIA_OCURRENCIA_ACC': 'dia_ocurrencia_acc',
-                    'DIRECCION': 'direccion',
-                    'GRAVEDAD': 'gravedad',
-                    'CLASE_ACC': 'clase_acc',
-                    'LOCALIDAD': 'localidad',
-                    'MUNICIPIO': 'municipio',
-                    'FECHA_HORA_ACC': 'fecha_hora_acc',
-                    'LATITUD': 'latitud',
-                    'LONGITUD': 'longitud',
-                    'CIV': 'civ',
-                    'PK_CALZADA': 'pk_calzada'
-                }
-            elif config_tabla == 'Accidente_via':
-                mapeo_columnas = {
-                    'OBJECTID': 'objectid',
-                    'FORMULARIO': 'formulario',
-                    'CODIGO_ACCIDENTE': 'codigo_accidente',
-                    'CODIGO_VIA': 'codigo_via',
-                    'GEOMETRICA_A': 'geometrica_a',
-                    'GEOMETRICA_B': 'geometrica_b',
-                    'GEOMETRICA_C': 'geometrica_c',
-                    'UTILIZACION': 'utilizacion',
-                    'CALZADAS': 'calzadas',
-                    'CARRILES': 'carriles',
-                    'MATERIAL': 'material',
-                    'ESTADO': 'estado',
-                    'CONDICIONES': 'condiciones',
-                    'ILUMINACION_A': 'iluminacion_a',
-                    'ILUMINACION_B': 'iluminacion_b',
-                    'AGENTE_TRANSITO': 'agente_transito',
-                    'SEMAFORO': 'semaforo',
-                    'VISUAL': 'visual',
-                    'CODIGO': 'codigo'
-                }
-            elif config_tabla == 'Causa':
-                mapeo_columnas = {
-                    'CODIGO_AC_VH': 'codigo_ac_vh',
-                    'OBJECTID': 'objectid',
-                    'FORMULARIO': 'formulario',
-                    'CODIGO_ACCIDENTE': 'codigo_accidente',
-                    'CODIGO_VEHICULO': 'codigo_vehiculo',
-                    'CODIGO_CAUSA': 'codigo_causa',
-                    'NOMBRE': 'nombre',
-                    'TIPO': 'tipo',
-                    'DESCRIPCION2': 'descripcion2',
-                    'TIPO_CAUSA': 'tipo_causa',
-                    'CODIGO': 'codigo'
-                }
-            elif config_tabla == 'AccidenteVehiculo':
-                mapeo_columnas = {
-                    'OBJECTID': 'objectid',
-                    'FORMULARIO': 'formulario',
-                    'PLACA': 'placa',
-                    'CODIGO_VEHICULO': 'codigo_vehiculo',
-                    'CLASE': 'clase',
-                    'SERVICIO': 'servicio',
-                    'MODALIDAD': 'modalidad',
-                    'ENFUGA': 'enfuga',
-                    'CODIGO': 'codigo'
-                }
-            elif config_tabla == 'ActorVial':
-                mapeo_columnas = {
-                    'CONDICION_A': 'condicion_a',
-                    'OBJECTID': 'objectid',
-                    'FORMULARIO': 'formulario',
-                    'CODIGO_ACCIDENTADO': 'codigo_accidentado',
-                    'CODIGO_VICTIMA': 'codigo_victima',
-                    'CODIGO_VEHICULO': 'codigo_vehiculo',
-                    'CONDICION': 'condicion',
-                    'ESTADO': 'estado',
-                    'MUERTE_POSTERIOR': 'muerte_posterior',
-                    'FECHA_POSTERIOR_MUERTE': 'fecha_posterior_muerte',
-                    'GENERO': 'genero',
-                    'FECHA_NACIMIENTO': 'fecha_nacimiento',
-                    'EDAD': 'edad',
-                    'CODIGO': 'codigo'
-                }
-            
-            # Renombrar las columnas del DataFrame - solo mapear campos que existen
-            print(f"DEBUG: Columnas disponibles en DataFrame: {list(df.columns)}")
-            print(f"DEBUG: Mapeo de columnas disponible: {mapeo_columnas}")
-            
-            # Crear un mapeo filtrado solo con las columnas que existen en el DataFrame
-            mapeo_filtrado = {k: v for k, v in mapeo_columnas.items() if k in df.columns}
-            print(f"DEBUG: Mapeo filtrado aplicado: {mapeo_filtrado}")
-            
-            # Renombrar solo las columnas que existen
-            df = df.rename(columns=mapeo_filtrado)
-            
-            # Eliminar columnas que no están en el mapeo (campos extra de la API)
-            columnas_mapeadas = set(mapeo_filtrado.values())
-            columnas_a_eliminar = [col for col in df.columns if col not in columnas_mapeadas]
-            if columnas_a_eliminar:
-                print(f"DEBUG: Eliminando columnas no mapeadas: {columnas_a_eliminar}")
-                df = df.drop(columns=columnas_a_eliminar)
-            
-            # Debug: Verificar valores de fecha_nacimiento después del mapeo
-            if 'fecha_nacimiento' in df.columns:
-                print(f"DEBUG: Valores de fecha_nacimiento después del mapeo:")
-                print(f"DEBUG: Tipo: {df['fecha_nacimiento'].dtype}")
-                print(f"DEBUG: Muestra: {df['fecha_nacimiento'].head(5).tolist()}")
-                print(f"DEBUG: Valores únicos: {df['fecha_nacimiento'].unique()[:10]}")
-                print(f"DEBUG: ¿Hay cadenas vacías?: {'Sí' if (df['fecha_nacimiento'] == '').any() else 'No'}")
-                print(f"DEBUG: ¿Hay valores None?: {'Sí' if df['fecha_nacimiento'].isna().any() else 'No'}")
-            
-            # Asegurar que todos los campos numéricos se manejen correctamente
-            df['objectid'] = df['objectid'].fillna(0).astype(int)
-            
-            # Manejar campos específicos según la tabla
-            if config_tabla == 'Accidente':
-                # Campos numéricos
-                df['ano_ocurrencia_acc'] = df['ano_ocurrencia_acc'].fillna(0).astype(int)
-                df['dia_ocurrencia_acc'] = df['dia_ocurrencia_acc'].apply(self.convertir_dia_a_numero)
-                df['civ'] = df['civ'].fillna(0).astype(int)
-                df['pk_calzada'] = df['pk_calzada'].fillna(0).astype(int)
-                
-                # Campos de texto (incluyendo códigos alfanuméricos)
-                df['codigo_accidente'] = df['codigo_accidente'].fillna('').astype(str)
-                
-                # Campos de texto
-                df['mes_ocurrencia_acc'] = df['mes_ocurrencia_acc'].fillna('')
-                df['direccion'] = df['direccion'].fillna('')
-                df['gravedad'] = df['gravedad'].fillna('')
-                df['clase_acc'] = df['clase_acc'].fillna('')
-                df['localidad'] = df['localidad'].fillna('')
-                df['municipio'] = df['municipio'].fillna('')
-                df['latitud'] = df['latitud'].fillna('')
-                df['longitud'] = df['longitud'].fillna('')
-            elif config_tabla == 'AccidenteVehiculo':
-                # Campos de texto (incluyendo códigos alfanuméricos)
-                df['codigo_vehiculo'] = df['codigo_vehiculo'].fillna('').astype(str)
-                df['enfuga'] = df['enfuga'].fillna('').astype(str)
-            elif config_tabla == 'ActorVial':
-                # Campos de texto (incluyendo códigos alfanuméricos)
-                df['codigo_vehiculo'] = df['codigo_vehiculo'].fillna('').astype(str)
-                df['codigo_accidentado'] = df['codigo_accidentado'].fillna('').astype(str)
-                df['codigo_victima'] = df['codigo_victima'].fillna('').astype(str)
-                # Solo edad se mantiene como numérico
-                df['edad'] = df['edad'].fillna(0).astype(int)
-            elif config_tabla == 'Causa':
-                # Campos de texto (incluyendo códigos alfanuméricos)
-                df['codigo_vehiculo'] = df['codigo_vehiculo'].fillna('').astype(str)
-                df['codigo_causa'] = df['codigo_causa'].fillna('').astype(str)
-            elif config_tabla == 'Accidente_via':
-                # Campos de texto (incluyendo códigos alfanuméricos)
-                df['codigo_via'] = df['codigo_via'].fillna('').astype(str)
-
-            
-            # Obtener campos de fecha para la tabla actual
-            campos_fecha = self.obtener_campos_fecha_por_tabla(config_tabla)
-            
-            # Limpiar campos de fecha específicos
-            if campos_fecha:
-                df = self.limpiar_valores_fecha(df, campos_fecha)
-            
-            # Limpiar valores vacíos e inválidos en todas las columnas
-            for col in df.columns:
-                if df[col].dtype == 'object':
-                    # Para campos de fecha, ya fueron limpiados arriba
-                    if col not in campos_fecha:
-                        # Para otros campos de texto, reemplazar con cadenas vacías
-                        df[col] = df[col].fillna('')
-            
-            # Preparar la consulta de inserción - solo usar columnas que existen en el DataFrame
-            columnas_config = CONFIG_TABLAS[config_tabla]['columnas']
-            columnas_df = list(df.columns)
-            
-            # Filtrar solo las columnas que existen tanto en la configuración como en el DataFrame
-            columnas_validas = [col for col in columnas_config if col in columnas_df]
-            
-            print(f"DEBUG: Columnas en configuración: {columnas_config}")
-            print(f"DEBUG: Columnas en DataFrame: {columnas_df}")
-            print(f"DEBUG: Columnas válidas para inserción: {columnas_validas}")
-            
-            if not columnas_validas:
-                raise Exception(f"No hay columnas válidas para insertar en la tabla {config_tabla}")
-            
-            placeholders = ', '.join(['%s'] * len(columnas_validas))
-            columnas_str = ', '.join(columnas_validas)
-            
-            consulta = f"""
-                INSERT INTO {CONFIG_TABLAS[config_tabla]['nombre_tabla']} ({columnas_str})
-                VALUES ({placeholders})
-                ON CONFLICT DO NOTHING
-            """
+            if plan.categorias:
+                with self.medicion.etapa('codificacion') as etapa:
+                    plan.codificar(cursor, filas)
+                    etapa['registros'] = len(filas)
             
             # Insertar registros
-            total_registros = len(df)
+            total_registros = len(filas)
             registros_insertados = 0
+            registros_rechazados = 0
             lote_size = 1000  # Tamaño del lote para insertar
             
             if callback_progreso:
                 callback_progreso(f"[INFO] Iniciando inserción de {total_registros} registros en la base de datos...", 0)
-                # Inicializar mensaje de progreso único
-                callback_progreso(f"[PROGRESO] Registros insertados: 0/{total_registros} (0.0%)", 0)
             
-            for i in range(0, total_registros, lote_size):
+            for inicio_lote in range(0, total_registros, lote_size):
                 # Verificar cancelación antes de procesar cada lote
                 if controlador and not controlador.esta_actualizando():
-                    print("DEBUG: Inserción cancelada por el usuario")
+                    logger.debug("Inserción cancelada por el usuario")
                     if callback_progreso:
                         callback_progreso("Inserción cancelada por el usuario", 0)
                     return registros_insertados
                 
-                lote = df.iloc[i:i + lote_size]
-                registros_en_lote = len(lote)
-                
-                for _, fila in lote.iterrows():
-                    # Verificar cancelación antes de procesar cada registro
-                    if controlador and not controlador.esta_actualizando():
-                        print("DEBUG: Inserción cancelada por el usuario")
-                        if callback_progreso:
-                            callback_progreso("Inserción cancelada por el usuario", 0)
-                        return registros_insertados
-                    
-                    valores = [fila[col] for col in columnas_validas]
-                    
-                    # Limpiar valores vacíos e inválidos: reemplazar con None
-                    for i, valor in enumerate(valores):
-                        if valor == '' or valor == 'null' or valor == 'NULL' or valor == 'None':
-                            valores[i] = None
-                        elif isinstance(valor, str) and valor.strip() == '':
-                            valores[i] = None
-                        elif isinstance(valor, str) and len(valor) > 20:
-                            # DEBUG: Identificar campos que exceden 20 caracteres
-                            nombre_campo = columnas_validas[i]
-                            print(f"DEBUG: Campo '{nombre_campo}' excede 20 caracteres: '{valor}' (longitud: {len(valor)})")
-                            # Truncar a 20 caracteres para evitar error de base de datos
-                            valores[i] = valor[:20]
-                            print(f"DEBUG: Campo '{nombre_campo}' truncado a: '{valores[i]}'")
-                    
-                    try:
-                        cursor.execute(consulta, valores)
-                        if cursor.rowcount > 0:
-                            registros_insertados += 1
-                            # Actualizar progreso cada 50 registros para mejor responsividad
-                            if registros_insertados % 50 == 0:
-                                porcentaje = (registros_insertados / total_registros) * 100
-                                if callback_progreso:
-                                    # Usar mensaje de progreso que se actualiza en la misma línea
-                                    callback_progreso(f"[PROGRESO] Registros insertados: {registros_insertados}/{total_registros} ({porcentaje:.1f}%)", porcentaje)
-                    except Exception as e:
-                        # DEBUG: Mostrar información detallada del error de inserción
-                        print(f"DEBUG: Error al insertar registro:")
-                        print(f"DEBUG: Columnas: {columnas_validas}")
-                        print(f"DEBUG: Valores: {valores}")
-                        for j, (col, val) in enumerate(zip(columnas_validas, valores)):
-                            if isinstance(val, str) and len(val) > 20:
-                                print(f"DEBUG: PROBLEMA - Campo '{col}' tiene {len(val)} caracteres: '{val}'")
-                        raise e
+                lote = filas[inicio_lote:inicio_lote + lote_size]
+                with self.medicion.etapa('bd_insercion') as etapa:
+                    insertados, rechazos = self._insertar_lote(cursor, plan.consulta, lote)
+                    conn.commit()
+                    etapa['registros'] = insertados
+                registros_insertados += insertados
                 
-                conn.commit()
+                if rechazos:
+                    registros_rechazados += len(rechazos)
+                    self.registrar_rechazos(nombre_tabla, plan.columnas_insercion, rechazos)
+                    if callback_progreso:
+                        callback_progreso(f"[ADVERTENCIA] {len(rechazos)} registros rechazados en {nombre_tabla} (ver {self.ARCHIVO_RECHAZOS}): {rechazos[0][1]}", 0)
+            
+            if registros_rechazados:
+                logger.debug("%s registros rechazados en %s", registros_rechazados, nombre_tabla)
             
             # Mostrar el total final - ELIMINADO para evitar saturación
             
@@ -486,18 +182,18 @@ class ModeloActualizacion:
             
         except psycopg2.OperationalError as e:
             error_msg = "No fue posible establecer conexión con la base de datos"
-            print(f"Error de conexión: {str(e)}")
+            logger.error("Error de conexión: %s", e)
             if callback_progreso:
                 callback_progreso(f"[ERROR] {error_msg}", 0)
             return False
         except psycopg2.Error as e:
             error_msg = "No fue posible establecer conexión con la base de datos"
-            print(f"Error de base de datos: {str(e)}")
+            logger.error("Error de base de datos: %s", e)
             if callback_progreso:
                 callback_progreso(f"[ERROR] {error_msg}", 0)
             return False
         except Exception as e:
-            print(f"Error al insertar registros: {str(e)}")
+            logger.error("Error al insertar registros: %s", e)
             if callback_progreso:
                 callback_progreso(f"Error al insertar registros: {str(e)}", 0)
             return False
@@ -517,12 +213,12 @@ class ModeloActualizacion:
         }
         
         try:
-            response = requests.get(api_url, params=params, timeout=30)
+            response = self.http.get(api_url, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             return data.get('count', 0)
         except Exception as e:
-            print(f"Error al obtener el total de registros: {str(e)}")
+            logger.error("Error al obtener el total de registros: %s", e)
             return 0
 
     def get_latest_objectid(self, tabla):
@@ -532,7 +228,7 @@ class ModeloActualizacion:
             if config is None:
                 raise Exception("No hay configuración de base de datos. Por favor, configure la base de datos primero.")
             
-            print(f"DEBUG: Conectando a base de datos: {config['dbname']} en {config['host']}")
+            logger.debug("Conectando a base de datos: %s en %s", config['dbname'], config['host'])
             
             # Validar conexión con timeout
             conn = psycopg2.connect(**config)
@@ -543,7 +239,7 @@ class ModeloActualizacion:
             cursor.fetchone()
             
             nombre_tabla = CONFIG_TABLAS[tabla]['nombre_tabla']
-            print(f"DEBUG: Buscando ObjectID más reciente en tabla: {nombre_tabla}")
+            logger.debug("Buscando ObjectID más reciente en tabla: %s", nombre_tabla)
             
             # Verificar si la tabla existe y tiene datos
             cursor.execute(f"""
@@ -555,7 +251,7 @@ class ModeloActualizacion:
             tabla_existe = cursor.fetchone()[0] > 0
             
             if not tabla_existe:
-                print(f"DEBUG: La tabla {nombre_tabla} no existe, usando ObjectID = 0 para obtener todos los datos")
+                logger.debug("La tabla %s no existe, usando ObjectID = 0 para obtener todos los datos", nombre_tabla)
                 latest_objectid = 0
             else:
                 # Verificar si la tabla tiene datos
@@ -563,7 +259,7 @@ class ModeloActualizacion:
                 total_registros = cursor.fetchone()[0]
                 
                 if total_registros == 0:
-                    print(f"DEBUG: La tabla {nombre_tabla} está vacía, usando ObjectID = 0 para obtener todos los datos")
+                    logger.debug("La tabla %s está vacía, usando ObjectID = 0 para obtener todos los datos", nombre_tabla)
                     latest_objectid = 0
                 else:
                     # Obtener el ObjectID más reciente
@@ -571,287 +267,321 @@ class ModeloActualizacion:
                     result = cursor.fetchone()
                     
                     if result is None or result[0] is None:
-                        print(f"DEBUG: No se encontró ObjectID válido en {nombre_tabla}, usando ObjectID = 0")
+                        logger.debug("No se encontró ObjectID válido en %s, usando ObjectID = 0", nombre_tabla)
                         latest_objectid = 0
                     else:
                         latest_objectid = result[0]
-                        print(f"DEBUG: ObjectID más reciente encontrado en {nombre_tabla}: {latest_objectid}")
+                        logger.debug("ObjectID más reciente encontrado en %s: %s", nombre_tabla, latest_objectid)
             
             cursor.close()
             conn.close()
             return latest_objectid
             
         except psycopg2.OperationalError as e:
-            print(f"Error de conexión a la base de datos: {str(e)}")
+            logger.error("Error de conexión a la base de datos: %s", e)
             raise Exception("No fue posible establecer conexión con la base de datos")
         except psycopg2.Error as e:
-            print(f"Error de base de datos: {str(e)}")
+            logger.error("Error de base de datos: %s", e)
             raise Exception("No fue posible establecer conexión con la base de datos")
         except Exception as e:
-            print(f"Error al obtener el ObjectID más reciente: {str(e)}")
+            logger.error("Error al obtener el ObjectID más reciente: %s", e)
             # En caso de error, usar ObjectID = 0 para obtener todos los datos
-            print("DEBUG: Usando ObjectID = 0 debido a error en consulta")
+            logger.debug("Usando ObjectID = 0 debido a error en consulta")
             return 0
 
-    def get_new_records(self, api_url, last_objectid, campos_api, callback_progreso=None, tabla=None, controlador=None):
-        """Obtiene los registros completos mayores al último ObjectID con paginación e inserción en tiempo real"""
-        all_records = []
+    def get_max_objectid(self, tabla):
+        """Obtiene MAX(objectid) de la tabla usando solo el índice de la llave primaria"""
+        config = get_database_params()
+        if config is None:
+            raise Exception("No hay configuración de base de datos. Por favor, configure la base de datos primero.")
+
+        conn = psycopg2.connect(**config)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COALESCE(MAX(objectid), 0) FROM {CONFIG_TABLAS[tabla]['nombre_tabla']}")
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def _obtener_retry_after(self, response):
+        """Obtiene la espera indicada por el encabezado Retry-After, en segundos"""
+        valor = response.headers.get('Retry-After')
+        try:
+            return float(valor) if valor else None
+        except ValueError:
+            return None
+
+    def solicitar_pagina(self, api_url, params, controlador=None, columnar=False):
+        """Solicita una página a la API aplicando el control adaptativo de tasa.
+        Retorna el JSON de la respuesta, o None si la actualización fue cancelada.
+        Con columnar=True las features se decodifican en flujo a 'columnas' y 'num_registros'.
+        """
+        tipo_fallo = None
+        for attempt in range(self.MAX_RETRIES):
+            if controlador and not controlador.esta_actualizando():
+                return None
+
+            self.control_tasa.esperar_turno()
+            retry_after = None
+            inicio = time.time()
+            response = None
+            try:
+                # Con stream la solicitud termina al recibir los encabezados y el cuerpo se lee al decodificar
+                with self.medicion.etapa('api_solicitud'):
+                    response = self.http.get(api_url, params=params, timeout=self.API_TIMEOUT, stream=columnar)
+
+                if response.status_code == 429:
+                    tipo_fallo = FALLO_LIMITE
+                    retry_after = self._obtener_retry_after(response)
+                elif response.status_code >= 500:
+                    tipo_fallo = FALLO_SERVIDOR
+                else:
+                    response.raise_for_status()
+                    with self.medicion.etapa('api_decodificacion') as etapa:
+                        if columnar:
+                            data = decodificar_pagina(response)
+                            bytes_json, registros = data['bytes_json'], data['num_registros']
+                        else:
+                            data = response.json()
+                            bytes_json, registros = len(response.content), len(data.get('features') or [])
+                        etapa['registros'], etapa['bytes'] = registros, bytes_json
+                    latencia = time.time() - inicio
+
+                    if 'error' not in data:
+                        self.control_tasa.registrar_exito(latencia)
+                        self.control_tasa.registrar_tamano_registro(bytes_json, registros)
+                        return data
+
+                    # ArcGIS reporta muchos errores con HTTP 200 y un objeto 'error'
+                    error = data['error'] if isinstance(data['error'], dict) else {}
+                    codigo = error.get('code')
+                    if codigo == 429:
+                        tipo_fallo = FALLO_LIMITE
+                    elif codigo in (500, 502, 503, 504):
+                        tipo_fallo = FALLO_SERVIDOR
+                    else:
+                        raise Exception(f"Error en respuesta de API: {data['error']}")
+            except requests.exceptions.Timeout as e:
+                logger.warning("TIMEOUT en intento %s/%s: %s", attempt + 1, self.MAX_RETRIES, e)
+                tipo_fallo = FALLO_TIMEOUT
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                logger.warning("ERROR DE CONEXIÓN en intento %s/%s: %s", attempt + 1, self.MAX_RETRIES, e)
+                tipo_fallo = FALLO_CONEXION
+            finally:
+                if columnar and response is not None:
+                    self.http.finalizar_lectura(response)
+
+            self.control_tasa.registrar_fallo(tipo_fallo)
+            if attempt < self.MAX_RETRIES - 1:
+                espera = self.control_tasa.espera_reintento(attempt, retry_after)
+                logger.warning("Fallo '%s' en intento %s/%s. Reintentando en %.1f segundos...", tipo_fallo, attempt + 1, self.MAX_RETRIES, espera)
+                time.sleep(espera)
+
+        raise Exception(f"Se agotaron los reintentos ({tipo_fallo})")
+
+    def get_new_records(self, api_url, last_objectid, campos_api, callback_progreso=None, tabla=None, controlador=None, tabla_destino=None):
+        """Obtiene los registros completos mayores al último ObjectID con paginación e inserción en tiempo real.
+        Solo se conservan en memoria las páginas de la ronda en curso; retorna los contadores
+        {'obtenidos', 'insertados', 'paginas'}.
+        """
+        resumen = {'obtenidos': 0, 'insertados': 0, 'paginas': 0}
         offset = 0
         total_fetched = 0
-        total_inserted = 0
         registros_insertados_acumulativo = 0  # Contador acumulativo para progreso
         start_time = time.time()  # Tiempo de inicio para cálculo de tiempo estimado
-        
+
         # Determinar la condición WHERE según el ObjectID
         if last_objectid == 0:
             # Si ObjectID es 0, significa que la tabla está vacía
             # Para tablas vacías, obtener TODOS los registros desde el ObjectID 1
             where_condition = "OBJECTID >= 1"  # Obtener primeros registros desde ObjectID 1
-            print("DEBUG: Tabla vacía detectada, obteniendo TODOS los registros desde ObjectID 1")
-            print("DEBUG: ADVERTENCIA: Si hay muchos registros, esto puede tomar mucho tiempo")
+            logger.debug("Tabla vacía detectada, obteniendo TODOS los registros desde ObjectID 1")
+            logger.warning("Si hay muchos registros, esto puede tomar mucho tiempo")
         else:
             # Si hay ObjectID, obtener solo los registros nuevos
             where_condition = f"OBJECTID > {last_objectid}"
-            print(f"DEBUG: Obteniendo registros con ObjectID > {last_objectid}")
-        
+            logger.debug("Obteniendo registros con ObjectID > %s", last_objectid)
+
         # Primero obtenemos el total de registros nuevos
         params = {
             'where': where_condition,
             'returnCountOnly': 'true',
             'f': 'json'
         }
-        
+
         try:
-            print(f"DEBUG: Solicitando conteo total de registros desde API: {api_url}")
-            print(f"DEBUG: Parámetros de consulta: {params}")
-            
-            response = requests.get(api_url, params=params, timeout=self.API_TIMEOUT)
-            response.raise_for_status()
-            data = response.json()
+            logger.debug("Solicitando conteo total de registros desde API: %s", api_url)
+            logger.debug("Parámetros de consulta: %s", params)
+
+            data = self.solicitar_pagina(api_url, params, controlador)
+            if data is None:
+                return resumen
             total_records = data.get('count', 0)
-            
-            print(f"DEBUG: Total de registros encontrados en API: {total_records}")
-            
+
+            logger.debug("Total de registros encontrados en API: %s", total_records)
+
             # Si no hay registros para procesar, mostrar mensaje y retornar
             if total_records == 0:
-                print("DEBUG: No hay registros para procesar")
+                logger.debug("No hay registros para procesar")
                 if callback_progreso:
                     callback_progreso("[INFO] No hay nuevos registros para procesar", 0)
-                    callback_progreso("[PROGRESO] Registros insertados: 0/0 (100.0%)", 100)
+                    emitir_progreso(callback_progreso, evento_progreso(tabla, 'descarga', 0, 0))
                     callback_progreso("[INFO] Procesamiento en tiempo real completado. Total de registros procesados: 0", 0)
                     callback_progreso("[ÉXITO] Actualización completada", 100)
-                return []
-            
+                return resumen
+
             # Para tablas vacías, obtener TODOS los registros sin límites
             if last_objectid == 0:
-                print(f"DEBUG: Tabla vacía - obteniendo TODOS los {total_records:,} registros disponibles")
+                logger.debug("Tabla vacía - obteniendo TODOS los %d registros disponibles", total_records)
                 if callback_progreso:
                     callback_progreso(f"[INFO] Tabla vacía detectada - se obtendrán TODOS los {total_records:,} registros", 0)
-            
-            # Inicializar tiempo de inicio
-            self.start_time = time.time()
-            
-            # Obtenemos los registros por lotes e insertamos en tiempo real
+
+            if callback_progreso:
+                callback_progreso(self.control_tasa.describir(), 0)
+            estado_reportado = self.control_tasa.estado()
+
+            # Obtenemos los registros por rondas de páginas concurrentes e insertamos en tiempo real
             lotes_sin_registros = 0  # Contador de lotes consecutivos sin registros
             MAX_LOTES_SIN_REGISTROS = 3  # Máximo de lotes sin registros antes de terminar
-            lote_size = 1000  # Tamaño del lote para procesamiento en tiempo real
-            
-            while total_fetched < total_records:
-                # Verificar cancelación antes de procesar cada lote
-                if controlador and not controlador.esta_actualizando():
-                    print("DEBUG: Actualización cancelada durante obtención de registros")
-                    if callback_progreso:
-                        callback_progreso("Obtención de registros cancelada por el usuario", 0)
-                    return all_records
-                
-                params = {
-                    'where': where_condition,
-                    'outFields': ','.join(campos_api),
-                    'f': 'json',
-                    'returnGeometry': 'false',
-                    'resultOffset': offset,
-                    'resultRecordCount': self.PAGE_SIZE
-                }
-                
-                lote_obtenido = False
-                for attempt in range(self.MAX_RETRIES):
+
+            with ThreadPoolExecutor(max_workers=self.control_tasa.config['concurrencia_max']) as executor:
+                while total_fetched < total_records:
+                    # Verificar cancelación antes de procesar cada ronda
+                    if controlador and not controlador.esta_actualizando():
+                        logger.debug("Actualización cancelada durante obtención de registros")
+                        if callback_progreso:
+                            callback_progreso("Obtención de registros cancelada por el usuario", 0)
+                        return resumen
+
+                    # La ronda pide tantas páginas como permitan la concurrencia actual y el techo de memoria
+                    tamano_pagina, paginas_ronda = self.control_tasa.planificar_ronda(total_records - total_fetched)
+
+                    futuros = []
+                    for i in range(paginas_ronda):
+                        params = {
+                            'where': where_condition,
+                            'outFields': ','.join(campos_api),
+                            'f': 'json',
+                            'returnGeometry': 'false',
+                            'resultOffset': offset + i * tamano_pagina,
+                            'resultRecordCount': tamano_pagina
+                        }
+                        logger.debug("Solicitando lote (offset: %s, límite: %s)", params['resultOffset'], tamano_pagina)
+                        futuros.append(executor.submit(self.solicitar_pagina, api_url, params, controlador, True))
+
                     try:
-                        print(f"DEBUG: Solicitando lote {offset//self.PAGE_SIZE + 1} (offset: {offset}, límite: {self.PAGE_SIZE})")
-                        print(f"DEBUG: Parámetros del lote: {params}")
-                        
-                        response = requests.get(api_url, params=params, timeout=self.API_TIMEOUT)
-                        response.raise_for_status()
-                        data = response.json()
-                        
-                        # DEBUG: Verificar si hay errores en la respuesta
-                        if 'error' in data:
-                            print(f"DEBUG: ERROR en respuesta de API: {data['error']}")
-                            return all_records
-                        
-                        # DEBUG: Mostrar la respuesta completa de la API
-                        print(f"DEBUG: Respuesta de la API: {str(data)[:500]}...")
-                        
-                        features = data.get('features', [])
-                        print(f"DEBUG: Features encontradas: {len(features)}")
-                        
-                        # DEBUG: Mostrar una feature de ejemplo si existe
-                        if features:
-                            print(f"DEBUG: Ejemplo de feature: {features[0]}")
-                        
-                        records = [feature['attributes'] for feature in features]
-                        print(f"DEBUG: Registros procesados: {len(records)}")
-                        
+                        respuestas = [futuro.result() for futuro in futuros]
+                    except Exception as e:
+                        logger.warning("%s. Continuando con los datos obtenidos hasta ahora.", e)
+                        break
+
+                    del futuros
+                    while respuestas:
+                        # Liberar cada página de la ronda en cuanto se inserta
+                        data = respuestas.pop(0)
+                        if data is None:
+                            logger.debug("Actualización cancelada durante obtención de registros")
+                            return resumen
+
+                        columnas = data['columnas']
+                        num_registros = data['num_registros']
+                        logger.debug("Features encontradas: %s (%s caracteres JSON)", num_registros, data['bytes_json'])
+
+                        # Mostrar el primer registro; armarlo solo si el nivel DEBUG está activo
+                        if num_registros and logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Ejemplo de registro: %s", {campo: valores[0] for campo, valores in columnas.items()})
+
                         # Si hay registros, procesarlos e insertarlos inmediatamente
-                        if len(records) > 0 and tabla:
-                            print(f"DEBUG: Procesando e insertando lote de {len(records)} registros en tiempo real...")
-                            
-                            # Crear DataFrame con los registros del lote
-                            df_lote = pd.DataFrame(records)
-                            
-                            # Procesar el lote (formatear fechas, limpiar datos, etc.)
-                            if tabla in ['Accidente', 'ActorVial']:
-                                df_lote = self.formatear_fechas(df_lote)
-                            
-                            campos_fecha = self.obtener_campos_fecha_por_tabla(tabla)
-                            if campos_fecha:
-                                df_lote = self.limpiar_valores_fecha(df_lote, campos_fecha)
-                            
-                            # Ordenar por OBJECTID
-                            df_lote = df_lote.sort_values('OBJECTID')
-                            
-                            # Insertar el lote inmediatamente
-                            registros_insertados_lote = self.insertar_registros(df_lote, tabla, callback_progreso, controlador)
-                            
+                        if num_registros > 0 and tabla:
+                            registros_insertados_lote = self._insertar_pagina(columnas, tabla, callback_progreso, controlador, tabla_destino=tabla_destino)
+
                             if registros_insertados_lote > 0:
-                                total_inserted += len(records)
                                 registros_insertados_acumulativo += registros_insertados_lote
-                                print(f"DEBUG: Lote insertado exitosamente. Registros insertados en lote: {registros_insertados_lote}")
-                                
-                                # Actualizar progreso acumulativo con tiempo estimado
-                                if callback_progreso:
-                                    porcentaje = (total_fetched / total_records) * 100 if total_records > 0 else 100
-                                    
-                                    # Calcular tiempo estimado
-                                    tiempo_transcurrido = time.time() - start_time
-                                    if tiempo_transcurrido > 0 and total_fetched > 0:
-                                        registros_por_segundo = total_fetched / tiempo_transcurrido
-                                        registros_restantes = total_records - total_fetched
-                                        tiempo_restante = registros_restantes / registros_por_segundo if registros_por_segundo > 0 else 0
-                                        
-                                        horas = int(tiempo_restante // 3600)
-                                        minutos = int((tiempo_restante % 3600) // 60)
-                                        segundos = int(tiempo_restante % 60)
-                                        
-                                        tiempo_estimado = f"{horas:02d}:{minutos:02d}:{segundos:02d}"
-                                    else:
-                                        tiempo_estimado = "Calculando..."
-                                    
-                                    callback_progreso(f"[PROGRESO] Registros insertados: {registros_insertados_acumulativo}/{total_records} ({porcentaje:.1f}%) - Tiempo estimado: {tiempo_estimado}", porcentaje)
+                                logger.debug("Lote insertado exitosamente. Registros insertados en lote: %s", registros_insertados_lote)
                             else:
-                                print(f"DEBUG: Error al insertar lote. Continuando con siguiente lote...")
-                        
-                        all_records.extend(records)
-                        total_fetched += len(records)
-                        offset += len(records)
-                        
-                        print(f"DEBUG: Lote obtenido exitosamente: {len(records)} registros")
-                        print(f"DEBUG: Total acumulado: {total_fetched}/{total_records}")
-                        
-                        # Si no se obtuvieron registros, incrementar contador
-                        if len(records) == 0:
+                                logger.warning("Error al insertar lote. Continuando con siguiente lote...")
+
+                        total_fetched += num_registros
+                        offset += num_registros
+                        resumen['obtenidos'] = total_fetched
+                        resumen['insertados'] = registros_insertados_acumulativo
+                        resumen['paginas'] += 1
+
+                        logger.debug("Lote obtenido exitosamente: %s registros", num_registros)
+                        logger.debug("Total acumulado: %s/%s", total_fetched, total_records)
+
+                        if num_registros > 0:
+                            emitir_progreso(callback_progreso, evento_progreso(
+                                tabla, 'descarga', total_fetched, total_records, start_time,
+                                insertados=registros_insertados_acumulativo))
+
+                        # Si no se obtuvieron registros, incrementar contador y repetir desde el mismo offset
+                        if num_registros == 0:
                             lotes_sin_registros += 1
-                            print(f"DEBUG: Lote sin registros #{lotes_sin_registros}")
-                            
+                            logger.debug("Lote sin registros #%s", lotes_sin_registros)
+
                             # Si hemos tenido demasiados lotes sin registros, terminar
                             if lotes_sin_registros >= MAX_LOTES_SIN_REGISTROS:
-                                print(f"DEBUG: Se han obtenido {MAX_LOTES_SIN_REGISTROS} lotes consecutivos sin registros. Terminando obtención.")
-                                return all_records
-                            
-                            # Si no hemos alcanzado el límite, continuar con el siguiente lote
-                            lote_obtenido = True
+                                logger.debug("Se han obtenido %s lotes consecutivos sin registros. Terminando obtención.", MAX_LOTES_SIN_REGISTROS)
+                                return resumen
                             break
-                        else:
-                            # Si obtuvimos registros, resetear el contador
-                            lotes_sin_registros = 0
-                            lote_obtenido = True
-                        
-                        # Calcular tiempo estimado restante
-                        if total_fetched > 0:
-                            tiempo_transcurrido = time.time() - getattr(self, 'start_time', time.time())
-                            if not hasattr(self, 'start_time'):
-                                self.start_time = time.time()
-                                tiempo_transcurrido = 0
-                            
-                            if tiempo_transcurrido > 0:
-                                registros_por_segundo = total_fetched / tiempo_transcurrido
-                                registros_restantes = total_records - total_fetched
-                                tiempo_restante = registros_restantes / registros_por_segundo if registros_por_segundo > 0 else 0
-                                
-                                horas = int(tiempo_restante // 3600)
-                                minutos = int((tiempo_restante % 3600) // 60)
-                                segundos = int(tiempo_restante % 60)
-                                
-                                tiempo_estimado = f"{horas:02d}:{minutos:02d}:{segundos:02d}"
-                            else:
-                                tiempo_estimado = "Calculando..."
-                        else:
-                            tiempo_estimado = "Calculando..."
-                        
-                        # El progreso acumulativo ya se actualiza arriba después de insertar cada lote
-                        
-                        # Pausa entre solicitudes para no sobrecargar la API
-                        print(f"DEBUG: Esperando {self.REQUEST_DELAY} segundos antes de la siguiente solicitud...")
-                        time.sleep(self.REQUEST_DELAY)
-                        break
-                        
-                    except requests.exceptions.Timeout as e:
-                        print(f"\nTIMEOUT en intento {attempt + 1}/{self.MAX_RETRIES}: {str(e)}")
-                        print(f"La API está respondiendo muy lentamente. Timeout configurado: {self.API_TIMEOUT} segundos")
-                        if attempt < self.MAX_RETRIES - 1:
-                            print(f"Reintentando en {self.RETRY_DELAY} segundos...")
-                            time.sleep(self.RETRY_DELAY)
-                        else:
-                            print("\nSe agotaron los reintentos por timeout. Continuando con los datos obtenidos hasta ahora.")
-                            return all_records
-                    except requests.exceptions.ConnectionError as e:
-                        print(f"\nERROR DE CONEXIÓN en intento {attempt + 1}/{self.MAX_RETRIES}: {str(e)}")
-                        print("Verifique su conexión a internet y la disponibilidad de la API")
-                        if attempt < self.MAX_RETRIES - 1:
-                            print(f"Reintentando en {self.RETRY_DELAY} segundos...")
-                            time.sleep(self.RETRY_DELAY)
-                        else:
-                            print("\nSe agotaron los reintentos por error de conexión. Continuando con los datos obtenidos hasta ahora.")
-                            return all_records
-                    except requests.exceptions.RequestException as e:
-                        print(f"\nError en intento {attempt + 1}/{self.MAX_RETRIES}: {str(e)}")
-                        if attempt < self.MAX_RETRIES - 1:
-                            print(f"Reintentando en {self.RETRY_DELAY} segundos...")
-                            time.sleep(self.RETRY_DELAY)
-                        else:
-                            print("\nSe agotaron los reintentos. Continuando con los datos obtenidos hasta ahora.")
-                            return all_records
-                    except Exception as e:
-                        print(f"\nError inesperado: {str(e)}")
-                        return all_records
-                
-                # Si no se pudo obtener el lote después de todos los reintentos, salir del bucle
-                if not lote_obtenido:
-                    print("DEBUG: No se pudo obtener el lote después de todos los reintentos. Terminando obtención.")
-                    break
-            
-            print(f"DEBUG: Finalizada la obtención de registros. Total obtenido: {total_fetched}, Total insertado: {total_inserted}")
-            return all_records
-            
+
+                        lotes_sin_registros = 0
+
+                        # Página recortada por el servidor (maxRecordCount): las páginas siguientes
+                        # de la ronda dejarían un hueco, así que se descartan y se pide desde aquí
+                        if num_registros < tamano_pagina and data.get('exceededTransferLimit'):
+                            logger.debug("El servidor limita las páginas a %s registros", num_registros)
+                            self.control_tasa.limitar_tamano_pagina(num_registros)
+                            break
+
+                    # Reportar el estado del control de tasa cuando cambia de forma apreciable
+                    estado_actual = self.control_tasa.estado()
+                    if callback_progreso and self._estado_tasa_cambio(estado_reportado, estado_actual):
+                        callback_progreso(self.control_tasa.describir(), (total_fetched / total_records) * 100)
+                        estado_reportado = estado_actual
+
+            logger.debug("Finalizada la obtención de registros. Total obtenido: %s, Total insertado: %s", total_fetched, registros_insertados_acumulativo)
+            return resumen
+
         except Exception as e:
-            print(f"Error al obtener los nuevos registros: {str(e)}")
-            return []
+            logger.error("Error al obtener los nuevos registros: %s", e)
+            return resumen
 
-    def actualizar_datos(self, tabla, callback_progreso=None, controlador=None):
-        """Actualiza los datos de la tabla especificada"""
+    def _insertar_pagina(self, columnas, tabla, callback_progreso=None, controlador=None, modo='insertar', tabla_destino=None):
+        """Procesa una página de registros de la API ({campo: [valores]}) y la inserta en la base de datos"""
+        with self.medicion.etapa('dataframe') as etapa:
+            # Crear DataFrame directamente desde las columnas decodificadas
+            df_lote = pd.DataFrame(columnas)
+            logger.debug("Procesando e insertando lote de %s registros en tiempo real...", len(df_lote))
+
+            # Ordenar por OBJECTID
+            df_lote = df_lote.sort_values('OBJECTID')
+            etapa['registros'] = len(df_lote)
+
+        # Insertar el lote inmediatamente
+        return self.insertar_registros(df_lote, tabla, callback_progreso, controlador, modo, tabla_destino)
+
+    def _estado_tasa_cambio(self, anterior, actual):
+        """Indica si el estado del control de tasa cambió lo suficiente para reportarlo"""
+        if anterior['tamano_pagina'] != actual['tamano_pagina'] or anterior['concurrencia'] != actual['concurrencia']:
+            return True
+        return abs(actual['tasa'] - anterior['tasa']) >= 0.25 * anterior['tasa']
+
+    def actualizar_datos(self, tabla, callback_progreso=None, controlador=None, forzar=False):
+        """Actualiza los datos de la tabla especificada.
+        Si forzar es False, se omite la tabla cuando la capa no cambió desde la última sincronización.
+        Lanza SincronizacionEnCurso si otro proceso sincroniza la misma base de datos.
+        """
+        with self.bloqueo:
+            return self._actualizar_datos(tabla, callback_progreso, controlador, forzar)
+
+    def _actualizar_datos(self, tabla, callback_progreso=None, controlador=None, forzar=False):
+        self.medicion = Medicion('actualizacion', tabla=tabla)
         try:
             # Verificar si la actualización ha sido cancelada
             if controlador and not controlador.esta_actualizando():
-                print(f"DEBUG: Actualización de {tabla} cancelada")
+                logger.debug("Actualización de %s cancelada", tabla)
                 return False
             
             # Validar conexión a la base de datos ANTES de proceder
@@ -864,12 +594,13 @@ class ModeloActualizacion:
                     raise Exception("No hay configuración de base de datos. Por favor, configure la base de datos primero.")
                 
                 # Probar conexión con timeout
-                conn = psycopg2.connect(**config)
-                cursor = conn.cursor()
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
-                cursor.close()
-                conn.close()
+                with self.medicion.etapa('bd_conexion'):
+                    conn = psycopg2.connect(**config)
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                    cursor.close()
+                    conn.close()
                 
                 if callback_progreso:
                     callback_progreso("Conexión a la base de datos validada correctamente", 0)
@@ -890,9 +621,26 @@ class ModeloActualizacion:
                     callback_progreso(f"[ERROR] {error_msg}", 0)
                 raise Exception(error_msg)
                 
-            # Obtener el total de registros en la API
             api_url = API_URLS[tabla]
-            total_records = self.get_total_records(api_url)
+
+            # Pre-verificación con los metadatos de la capa: si nada cambió, omitir la tabla
+            with self.medicion.etapa('api_metadatos'):
+                metadatos = self.detector_cambios.obtener_metadatos(tabla)
+            self.ultimo_resumen = {
+                'obtenidos': 0, 'insertados': 0, 'paginas': 0,
+                'max_objectid_api': metadatos['max_objectid'] if metadatos else None
+            }
+            if metadatos:
+                if metadatos['max_record_count']:
+                    self.control_tasa.limitar_tamano_pagina(metadatos['max_record_count'])
+                if not forzar and self.detector_cambios.sin_cambios(tabla, metadatos, self.get_max_objectid(tabla)):
+                    if callback_progreso:
+                        callback_progreso(f"[INFO] La capa no presenta cambios desde la última sincronización (ObjectID máximo: {metadatos['max_objectid']}, registros: {metadatos['total']}). Tabla omitida", 0)
+                        callback_progreso("[ÉXITO] Actualización completada", 100)
+                    return True
+
+            # Obtener el total de registros en la API
+            total_records = metadatos['total'] if metadatos else self.get_total_records(api_url)
             
             if callback_progreso:
                 callback_progreso(f"[INFO] Total de registros en la API: {total_records}", 0)
@@ -924,24 +672,59 @@ class ModeloActualizacion:
             
             # Verificar cancelación antes de obtener registros
             if controlador and not controlador.esta_actualizando():
-                print(f"DEBUG: Actualización de {tabla} cancelada antes de obtener registros")
+                logger.debug("Actualización de %s cancelada antes de obtener registros", tabla)
                 return False
                 
             # Obtener los nuevos registros - usar * para obtener todos los campos disponibles
             # Esto evita errores 400 cuando se especifican campos que no existen en la API
             campos_api = ['*']
             
-            new_records = self.get_new_records(api_url, latest_objectid, campos_api, callback_progreso, tabla, controlador)
+            # Tabla vacía: cargar en una tabla de staging sin índices y construirlos una sola vez al final
+            tabla_staging = self.carga_inicial.preparar(tabla) if latest_objectid == 0 else None
+            if tabla_staging and callback_progreso:
+                callback_progreso(f"[INFO] Carga inicial masiva sobre la tabla temporal {tabla_staging}", 0)
+            
+            estadisticas_http = self.http.estadisticas()
+            try:
+                resumen = self.get_new_records(api_url, latest_objectid, campos_api, callback_progreso, tabla, controlador, tabla_staging)
+                self.ultimo_resumen.update(resumen)
+            except Exception:
+                if tabla_staging:
+                    self.carga_inicial.descartar(tabla)
+                raise
+            
+            if callback_progreso:
+                callback_progreso(self.http.describir(desde=estadisticas_http), 0)
+            
+            if tabla_staging:
+                # Se decide por el contenido de la tabla temporal, no por el contador de insertados
+                cancelada = controlador and not controlador.esta_actualizando()
+                if cancelada or not self.carga_inicial.tiene_registros(tabla):
+                    self.carga_inicial.descartar(tabla)
+                    if callback_progreso:
+                        callback_progreso("[INFO] Carga inicial no completada: se descarta la tabla temporal", 0)
+                    if cancelada:
+                        return False
+                    if resumen['obtenidos']:
+                        raise Exception(f"Se descargaron {resumen['obtenidos']} registros pero ninguno quedó en la tabla temporal {tabla_staging}")
+                else:
+                    with self.medicion.etapa('carga_inicial_indices'):
+                        self.carga_inicial.finalizar(tabla, callback_progreso)
+            
+            # Registrar el estado sincronizado solo si la tabla alcanzó el máximo OBJECTID de la capa
+            if metadatos and not (controlador and not controlador.esta_actualizando()):
+                if self.get_max_objectid(tabla) >= metadatos['max_objectid']:
+                    self.detector_cambios.registrar_sincronizacion(tabla, metadatos)
             
             # Los registros ya se procesaron e insertaron en tiempo real durante get_new_records
             # Solo verificamos si hubo registros procesados
-            if not new_records:
+            if not resumen['obtenidos']:
                 if callback_progreso:
                     callback_progreso("[INFO] No hay nuevos registros para procesar", 0)
                 return True
             
             if callback_progreso:
-                callback_progreso(f"[INFO] Procesamiento en tiempo real completado. Total de registros procesados: {len(new_records)}", 0)
+                callback_progreso(f"[INFO] Procesamiento en tiempo real completado. Total de registros procesados: {resumen['obtenidos']} (insertados: {resumen['insertados']})", 0)
             
             # Los registros ya fueron insertados en tiempo real, no necesitamos procesarlos nuevamente
             resultado = True
@@ -956,7 +739,43 @@ class ModeloActualizacion:
                 return False
             
         except Exception as e:
-            print(f"Error en el proceso de actualización: {str(e)}")
+            logger.error("Error en el proceso de actualización: %s", e)
             if callback_progreso:
                 callback_progreso(f"[ERROR] {str(e)}", 0)
-            return False 
\ No newline at end of file
+            return False 
+        finally:
+            self.medicion.finalizar()
+
+    def reconciliar_datos(self, tabla, callback_progreso=None, controlador=None):
+        """Sincroniza los registros editados y eliminados en la API, además de los nuevos.
+        Lanza SincronizacionEnCurso si otro proceso sincroniza la misma base de datos.
+        """
+        with self.bloqueo:
+            return self._reconciliar_datos(tabla, callback_progreso, controlador)
+
+    def _reconciliar_datos(self, tabla, callback_progreso=None, controlador=None):
+        self.medicion = Medicion('reconciliacion', tabla=tabla)
+        try:
+            if controlador and not controlador.esta_actualizando():
+                logger.debug("Reconciliación de %s cancelada", tabla)
+                return False
+
+            resumen = self.reconciliador.reconciliar(tabla, callback_progreso, controlador)
+            if resumen is None:
+                if callback_progreso:
+                    callback_progreso("Reconciliación cancelada por el usuario", 0)
+                return False
+
+            if callback_progreso:
+                callback_progreso(f"[INFO] Reconciliación completada. Rangos actualizados: {resumen['rangos_actualizados']}/{resumen['rangos_verificados']} - "
+                                  f"registros actualizados: {resumen['registros_actualizados']} - eliminados: {resumen['registros_eliminados']}", 0)
+                callback_progreso("[ÉXITO] Actualización completada", 100)
+            return True
+
+        except Exception as e:
+            logger.error("Error en el proceso de reconciliación: %s", e)
+            if callback_progreso:
+                callback_progreso(f"[ERROR] {str(e)}", 0)
+            return False
+        finally:
+            self.medicion.finalizar()
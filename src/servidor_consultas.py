@@ -0,0 +1,62 @@
+"""Servicio local de consultas de siniestros sobre HTTP/JSON.
+
+Uso:
+    python -m src.servidor_consultas [--host 127.0.0.1] [--puerto 8765]
+
+Rutas:
+    GET /siniestros?fecha_inicio=AAAA-MM-DD&fecha_fin=AAAA-MM-DD[&pagina=0&tamano_pagina=5000]
+        Filtros opcionales: localidad, vehiculo, estado, causante, objectid, formulario, hora_inicio, hora_fin
+    GET /estado
+
+Para que la aplicación consulte el servicio en lugar de la base de datos:
+    QTRAZER_SERVICIO_CONSULTAS=http://127.0.0.1:8765
+"""
+
+import argparse
+import os
+import sys
+
+# Agrega la carpeta raíz del proyecto al PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m src.servidor_consultas',
+        description='Expone las consultas de siniestros viales por HTTP con caché compartida.'
+    )
+    parser.add_argument('--host', help='Dirección de escucha (por defecto 127.0.0.1)')
+    parser.add_argument('--puerto', type=int, help='Puerto de escucha (por defecto 8765)')
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    from src.config.settings import get_database_params
+    from src.models.servicio_consultas import ServidorConsultas
+    import psycopg2
+
+    config = get_database_params()
+    if config is None:
+        print("No hay configuración de base de datos. Configúrela desde la aplicación o en el archivo .env", file=sys.stderr)
+        return 2
+    try:
+        servidor = ServidorConsultas(config, args.host, args.puerto)
+    except psycopg2.Error as e:
+        print(f"No fue posible establecer conexión con la base de datos: {str(e).strip()}", file=sys.stderr)
+        return 2
+
+    host, puerto = servidor.server_address[:2]
+    print(f"Servicio de consultas escuchando en http://{host}:{puerto}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
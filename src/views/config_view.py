@@ -1,10 +1,13 @@
 """Ventana de configuración de base de datos."""
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
 import sys
 
+logger = logging.getLogger(__name__)
+
 class ConfigView(tk.Toplevel):
     def __init__(self, parent):
         super().__init__(parent)
@@ -127,7 +130,7 @@ class ConfigView(tk.Toplevel):
                 self.db_password.insert(0, current_config.get('password', ''))
                 self.db_host.insert(0, current_config.get('host', ''))
                 self.db_port.insert(0, current_config.get('port', ''))
-                print("Configuración cargada desde configuración global")
+                logger.info("Configuración cargada desde configuración global")
                 return
             
             # Si no hay configuración global, intentar cargar desde archivo
@@ -139,11 +142,11 @@ class ConfigView(tk.Toplevel):
                 self.db_password.insert(0, saved_config.get('password', ''))
                 self.db_host.insert(0, saved_config.get('host', ''))
                 self.db_port.insert(0, saved_config.get('port', ''))
-                print("Configuración cargada desde archivo guardado")
+                logger.info("Configuración cargada desde archivo guardado")
             else:
-                print("No hay configuración guardada, campos vacíos")
+                logger.info("No hay configuración guardada, campos vacíos")
         except Exception as e:
-            print(f"Error al cargar configuración guardada: {str(e)}")
+            logger.error("Error al cargar configuración guardada: %s", e)
             # Los campos se dejan vacíos si hay error
     
     def load_config_from_file(self):
@@ -166,14 +169,14 @@ class ConfigView(tk.Toplevel):
             if os.path.exists(config_file):
                 with open(config_file, 'r', encoding='utf-8') as f:
                     config = json.load(f)
-                print(f"Configuración cargada desde: {config_file}")
+                logger.info("Configuración cargada desde: %s", config_file)
                 return config
             else:
-                print(f"Archivo de configuración no encontrado: {config_file}")
+                logger.info("Archivo de configuración no encontrado: %s", config_file)
                 return None
                 
         except Exception as e:
-            print(f"Error al cargar archivo de configuración: {str(e)}")
+            logger.error("Error al cargar archivo de configuración: %s", e)
             return None
     
     def save_config(self):
@@ -242,10 +245,10 @@ class ConfigView(tk.Toplevel):
             with open(config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=4, ensure_ascii=False)
             
-            print(f"Configuración guardada en: {config_file}")
+            logger.info("Configuración guardada en: %s", config_file)
             
         except Exception as e:
-            print(f"Error al guardar archivo de configuración: {str(e)}")
+            logger.error("Error al guardar archivo de configuración: %s", e)
             # No fallar si no se puede guardar el archivo, solo la memoria
     
     def cancel_config(self):
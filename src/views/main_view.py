@@ -1,5 +1,6 @@
 """Vista principal de la aplicación."""
 
+import logging
 import tkinter as tk
 from tkinter import ttk
 from src.config.settings import CONFIG_INTERFAZ
@@ -7,6 +8,8 @@ from PIL import Image, ImageTk
 import os
 import sys
 
+logger = logging.getLogger(__name__)
+
 def get_resource_path(relative_path):
     """Obtiene la ruta absoluta al recurso, funciona para desarrollo y para PyInstaller"""
     try:
@@ -51,7 +54,7 @@ class VistaPrincipal:
             logo_label = ttk.Label(main_frame, image=self.logo_img)
             logo_label.pack(pady=(0, 20))
         except Exception as e:
-            print(f"Error al cargar el logo: {str(e)}")
+            logger.error("Error al cargar el logo: %s", e)
             logo_label = ttk.Label(main_frame, text="[Logo no disponible]", font=("Helvetica", 14, "italic"))
             logo_label.pack(pady=(0, 20))
 
@@ -157,6 +160,16 @@ class VistaPrincipal:
         self.root.quit()
         self.root.destroy()
 
+    def advertir_esquema(self, problemas):
+        """Avisa que el esquema de la base de datos no tiene lo que la aplicación espera."""
+        from tkinter import messagebox
+        messagebox.showwarning(
+            "Esquema de base de datos desactualizado",
+            "La base de datos no tiene todo lo que Qtrazer necesita; aplique los scripts indicados:\n\n"
+            + "\n".join(f"• {problema}" for problema in problemas),
+            parent=self.root
+        )
+
     def mostrar_vista_actualizacion(self):
         """Muestra la vista de actualización."""
         from src.views.update_view import VistaActualizacion
@@ -1,16 +1,22 @@
 """Vista para consulta de siniestros."""
 
+import logging
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkcalendar import DateEntry
 from src.config.settings import CONFIG_INTERFAZ
+from src.models.arranque import obtener_vocabulario
+from src.models.metricas import Medicion
+from src.models.perfilado import perfilar
+from src.models.resultados_consulta import COLUMNAS_VISTA, escribir_excel, filtrar_siniestros, ordenar_siniestros
 import threading
 import time
-import pandas as pd
 from datetime import datetime
 import os
 from PIL import Image, ImageTk
 
+logger = logging.getLogger(__name__)
+
 class VistaConsulta:
     def __init__(self, root, ventana_principal, controlador):
         # Inicializar atributos básicos
@@ -40,6 +46,11 @@ class VistaConsulta:
         self.lista_estados = ["HERIDO", "ILESO", "MUERTO"]
         self.lista_causantes = ["CONDUCTOR", "PASAJERO", "PEATON", "VEHICULO", "VIA"]
         
+        # Valores cargados de la base de datos al arrancar (src.models.arranque), si ya están disponibles
+        self.lista_localidades = obtener_vocabulario('localidades') or []
+        self.lista_vehiculos = obtener_vocabulario('vehiculos') or self.lista_vehiculos
+        self.lista_estados = obtener_vocabulario('estados') or self.lista_estados
+        
         # Configurar la interfaz
         self.configurar_ventana()
         self.crear_interfaz()
@@ -195,6 +206,7 @@ class VistaConsulta:
         # Filtro de Localidad
         ttk.Label(filtros_frame, text="Localidad:").grid(row=0, column=0, padx=5, pady=5)
         self.combo_localidad = ttk.Combobox(filtros_frame, state="readonly", width=30)
+        self.combo_localidad['values'] = [''] + self.lista_localidades
         self.combo_localidad.grid(row=0, column=1, padx=5, pady=5)
 
         # Filtro de Vehículo
@@ -390,7 +402,7 @@ class VistaConsulta:
             # Actualizar la región de scroll
             canvas.configure(scrollregion=canvas.bbox("all"))
         except Exception as e:
-            print(f"Error al ajustar el tamaño del canvas: {str(e)}")
+            logger.error("Error al ajustar el tamaño del canvas: %s", e)
 
     def actualizar_valores_filtros(self):
         """Actualiza los valores disponibles en los combobox de filtros."""
@@ -424,7 +436,7 @@ class VistaConsulta:
             self.hora_filtro_fin.set('')
 
         except Exception as e:
-            print(f"Error al actualizar filtros: {str(e)}")
+            logger.error("Error al actualizar filtros: %s", e)
 
     def aplicar_filtros(self):
         """Aplica los filtros seleccionados a los resultados."""
@@ -458,6 +470,9 @@ class VistaConsulta:
                 messagebox.showinfo("Información", "Por favor seleccione al menos un filtro.")
                 return
 
+            medicion = Medicion('vista_filtro')
+            inicio_filtrado = time.perf_counter()
+
             # Filtrar resultados de manera progresiva
             resultados_filtrados = self.resultados_completos.copy()
 
@@ -476,69 +491,43 @@ class VistaConsulta:
                     self._actualizar_opciones_hora(resultados_filtrados)
                     
                 except Exception as e:
-                    print(f"Error al filtrar por fecha: {str(e)}")
+                    logger.error("Error al filtrar por fecha: %s", e)
 
-            # PASO 2: Aplicar filtro de rango de hora (si está activo)
-            if hora_inicio and hora_fin:
-                try:
-                    # Convertir horas a formato comparable
-                    def hora_a_minutos(hora_str):
-                        if not hora_str:
-                            return 0
-                        try:
-                            # Asumir formato HH:MM o HH:MM:SS
-                            partes = str(hora_str).split(':')
-                            return int(partes[0]) * 60 + int(partes[1])
-                        except:
-                            return 0
-                    
-                    hora_inicio_min = hora_a_minutos(hora_inicio)
-                    hora_fin_min = hora_a_minutos(hora_fin)
-                    
-                    resultados_filtrados = [r for r in resultados_filtrados 
-                                          if r[3] and hora_inicio_min <= hora_a_minutos(r[3]) <= hora_fin_min]
-                    
-                except Exception as e:
-                    print(f"Error al filtrar por hora: {str(e)}")
+            # PASO 2: Aplicar el rango de hora y los filtros de otros campos sobre los datos ya filtrados
+            resultados_filtrados = filtrar_siniestros(resultados_filtrados, {
+                'hora_inicio': hora_inicio, 'hora_fin': hora_fin, 'localidad': localidad,
+                'vehiculo': vehiculo, 'estado': estado, 'causante': causante,
+                'objectid': id_filtro, 'formulario': formulario
+            })
 
-            # PASO 3: Aplicar filtros de otros campos basados en los datos ya filtrados
-            if localidad:
-                resultados_filtrados = [r for r in resultados_filtrados if str(r[4]).strip() == localidad.strip()]
-
-            if vehiculo:
-                resultados_filtrados = [r for r in resultados_filtrados if vehiculo in str(r[5]).split(', ')]
-
-            if estado:
-                resultados_filtrados = [r for r in resultados_filtrados if estado in str(r[11]).split(', ')]
-
-            if causante:
-                resultados_filtrados = [r for r in resultados_filtrados if str(r[15]).strip() == causante.strip()]
-
-            if id_filtro:
-                resultados_filtrados = [r for r in resultados_filtrados if str(r[0]).strip() == id_filtro.strip()]
-
-            if formulario:
-                resultados_filtrados = [r for r in resultados_filtrados if str(r[1]).strip() == formulario.strip()]
+            medicion.registrar('filtrado', time.perf_counter() - inicio_filtrado, len(resultados_filtrados))
 
             # Actualizar opciones de todos los campos basadas en los datos filtrados
-            self._actualizar_opciones_filtros(resultados_filtrados)
+            with medicion.etapa('valores_filtros'):
+                self._actualizar_opciones_filtros(resultados_filtrados)
 
             # Limpiar tabla actual
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            with medicion.etapa('limpiar_tabla'):
+                for item in self.tree.get_children():
+                    self.tree.delete(item)
 
             # Aplicar ordenamiento si hay uno activo
             if self.columna_ordenamiento:
-                resultados_filtrados = self._aplicar_ordenamiento(resultados_filtrados, self.columna_ordenamiento, self.orden_descendente)
+                with medicion.etapa('ordenamiento') as etapa:
+                    resultados_filtrados = self._aplicar_ordenamiento(resultados_filtrados, self.columna_ordenamiento, self.orden_descendente)
+                    etapa['registros'] = len(resultados_filtrados)
             
             # Mostrar resultados filtrados
-            for resultado in resultados_filtrados:
-                # Convertir None a cadena vacía
-                valores = ['' if valor is None else str(valor) for valor in resultado]
-                self.tree.insert("", tk.END, values=valores)
+            with medicion.etapa('insertar_filas') as etapa:
+                for resultado in resultados_filtrados:
+                    # Convertir None a cadena vacía
+                    valores = ['' if valor is None else str(valor) for valor in resultado]
+                    self.tree.insert("", tk.END, values=valores)
+                etapa['registros'] = len(resultados_filtrados)
 
             self.filtros_activos = True
             self.etiqueta_estado.config(text=f"Mostrando {len(resultados_filtrados)} registros filtrados")
+            medicion.finalizar()
 
         except Exception as e:
             messagebox.showerror("Error", f"Error al aplicar filtros: {str(e)}")
@@ -660,22 +649,28 @@ class VistaConsulta:
             return
 
         if resultados:
+            medicion = Medicion('vista_render')
             # Guardar resultados completos
             self.resultados_completos = resultados
             
             # Limpiar tabla actual
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            with medicion.etapa('limpiar_tabla'):
+                for item in self.tree.get_children():
+                    self.tree.delete(item)
             
             # Mostrar resultados en la tabla
-            for resultado in resultados:
-                # Convertir None a cadena vacía
-                valores = ['' if valor is None else str(valor) for valor in resultado]
-                self.tree.insert("", tk.END, values=valores)
+            with medicion.etapa('insertar_filas') as etapa:
+                for resultado in resultados:
+                    # Convertir None a cadena vacía
+                    valores = ['' if valor is None else str(valor) for valor in resultado]
+                    self.tree.insert("", tk.END, values=valores)
+                etapa['registros'] = len(resultados)
             
             # Actualizar estado y valores de filtros
             self.etiqueta_estado.config(text=f"Se encontraron {len(resultados)} registros")
-            self.actualizar_valores_filtros()
+            with medicion.etapa('valores_filtros'):
+                self.actualizar_valores_filtros()
+            medicion.finalizar()
         else:
             messagebox.showinfo("Información", "No se encontraron resultados para el rango de fechas seleccionado.")
             self.etiqueta_estado.config(text="No se encontraron resultados")
@@ -730,36 +725,36 @@ class VistaConsulta:
             messagebox.showwarning("Advertencia", "Ya hay una exportación en progreso.")
             return
 
+        medicion = Medicion('vista_exportacion')
+
         # Obtener los datos actuales de la tabla
-        datos = []
-        for item in self.tree.get_children():
-            valores = self.tree.item(item)['values']
-            datos.append(valores)
+        with medicion.etapa('lectura_tabla') as etapa:
+            datos = []
+            for item in self.tree.get_children():
+                valores = self.tree.item(item)['values']
+                datos.append(valores)
+            etapa['registros'] = len(datos)
 
         if not datos:
             messagebox.showwarning("Advertencia", "No hay datos para exportar.")
             return
 
-        # Crear DataFrame
-        columnas = [
-            "ID", "Formulario", "Fecha", "Hora", "Localidad",
-            "Clases Vehículos", "Placas", "Condiciones Actores",
-            "Fallecidos", "Heridos", "Ilesos", "Estados",
-            "Géneros", "Edades", "Causante", "Causa", 
-            "Terreno Vía", "Estado Vía"
-        ]
-        df = pd.DataFrame(datos, columns=columnas)
+        # Crear DataFrame (pandas se importa solo al exportar)
+        with medicion.etapa('dataframe'):
+            import pandas as pd
+            df = pd.DataFrame(datos, columns=COLUMNAS_VISTA)
 
         # Generar nombre de archivo con fecha y hora
         fecha_hora = datetime.now().strftime("%Y%m%d_%H%M%S")
         nombre_archivo = f"siniestros_{fecha_hora}.xlsx"
 
-        # Abrir diálogo para guardar archivo
-        destino = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            initialfile=nombre_archivo,
-            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
-        )
+        # Abrir diálogo para guardar archivo (su espera queda en una etapa aparte)
+        with medicion.etapa('dialogo_destino'):
+            destino = filedialog.asksaveasfilename(
+                defaultextension=".xlsx",
+                initialfile=nombre_archivo,
+                filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
+            )
 
         if not destino:
             return
@@ -776,67 +771,25 @@ class VistaConsulta:
         # Iniciar exportación en hilo separado
         threading.Thread(
             target=self._exportar_a_excel_hilo,
-            args=(df, destino),
+            args=(df, destino, medicion),
             daemon=True
         ).start()
 
-    def _exportar_a_excel_hilo(self, df, destino):
+    @perfilar('exportacion')
+    def _exportar_a_excel_hilo(self, df, destino, medicion):
         """Exporta los datos a Excel en un hilo separado."""
         try:
-            # Escritura robusta: archivo temporal en misma carpeta
-            carpeta_destino = os.path.dirname(destino) or os.getcwd()
-            nombre_tmp = f".__tmp_{os.path.basename(destino)}"
-            ruta_tmp = os.path.join(carpeta_destino, nombre_tmp)
+            with medicion.etapa('escritura_excel') as etapa:
+                etapa['registros'] = len(df)
+                escribir_excel(df, destino, lambda p: self.root.after(0, lambda: self._actualizar_progreso(p)))
 
-            # Tamaño por hoja para grandes volúmenes
-            filas_por_hoja = 100000  # Excel soporta ~1,048,576 filas
-            total_filas = len(df)
-
-            try:
-                with pd.ExcelWriter(ruta_tmp, engine="openpyxl") as writer:
-                    if total_filas <= filas_por_hoja:
-                        # Actualizar progreso
-                        self.root.after(0, lambda: self._actualizar_progreso(50))
-                        df.to_excel(writer, sheet_name="Datos", index=False)
-                        self.root.after(0, lambda: self._actualizar_progreso(90))
-                    else:
-                        num_hojas = (total_filas + filas_por_hoja - 1) // filas_por_hoja
-                        progreso_por_hoja = 80 / num_hojas
-                        
-                        for i in range(num_hojas):
-                            inicio = i * filas_por_hoja
-                            fin = min((i + 1) * filas_por_hoja, total_filas)
-                            hoja = f"Datos_{i+1}"
-                            
-                            # Actualizar progreso
-                            progreso_actual = 10 + (i * progreso_por_hoja)
-                            self.root.after(0, lambda p=progreso_actual: self._actualizar_progreso(p))
-                            
-                            df.iloc[inicio:fin].to_excel(writer, sheet_name=hoja, index=False)
-
-                # Mover atómicamente al destino final
-                self.root.after(0, lambda: self._actualizar_progreso(95))
-                
-                if os.path.exists(destino):
-                    try:
-                        os.remove(destino)
-                    except Exception:
-                        pass
-                os.replace(ruta_tmp, destino)
-                
-                # Completar exportación
-                self.root.after(0, lambda: self._completar_exportacion(True, destino))
-                
-            finally:
-                # Limpiar temporal si quedó
-                if os.path.exists(ruta_tmp):
-                    try:
-                        os.remove(ruta_tmp)
-                    except Exception:
-                        pass
+            # Completar exportación
+            self.root.after(0, lambda: self._completar_exportacion(True, destino))
 
         except Exception as e:
             self.root.after(0, lambda: self._completar_exportacion(False, str(e)))
+        finally:
+            medicion.finalizar()
 
     def _actualizar_progreso(self, valor):
         """Actualiza la barra de progreso desde el hilo principal."""
@@ -873,64 +826,44 @@ class VistaConsulta:
         
         # Actualizar el indicador visual en el encabezado
         self._actualizar_indicador_ordenamiento(columna)
+        medicion = Medicion('vista_orden', columna=columna)
         
         # Obtener los datos actuales de la tabla
-        datos = []
-        for item in self.tree.get_children():
-            valores = self.tree.item(item)['values']
-            datos.append(valores)
+        with medicion.etapa('lectura_tabla') as etapa:
+            datos = []
+            for item in self.tree.get_children():
+                valores = self.tree.item(item)['values']
+                datos.append(valores)
+            etapa['registros'] = len(datos)
         
         if not datos:
             return
         
-        # Mapear nombres de columnas a índices
-        columnas = [
-            "ID", "Formulario", "Fecha", "Hora", "Localidad",
-            "Clases Vehículos", "Placas", "Condiciones Actores",
-            "Fallecidos", "Heridos", "Ilesos", "Estados",
-            "Géneros", "Edades", "Causante", "Causa", 
-            "Terreno Vía", "Estado Vía"
-        ]
-        
         try:
-            indice_columna = columnas.index(columna)
-            
-            # Ordenar los datos
-            if columna in ["ID", "Fallecidos", "Heridos", "Ilesos"]:
-                # Ordenamiento numérico
-                datos_ordenados = sorted(datos, 
-                    key=lambda x: int(x[indice_columna]) if x[indice_columna] and str(x[indice_columna]).isdigit() else 0,
-                    reverse=self.orden_descendente
-                )
-            elif columna in ["Fecha", "Hora"]:
-                # Ordenamiento por fecha/hora
-                datos_ordenados = sorted(datos,
-                    key=lambda x: x[indice_columna] if x[indice_columna] else "",
-                    reverse=self.orden_descendente
-                )
-            else:
-                # Ordenamiento alfabético
-                datos_ordenados = sorted(datos,
-                    key=lambda x: str(x[indice_columna]).lower() if x[indice_columna] else "",
-                    reverse=self.orden_descendente
-                )
+            inicio_ordenamiento = time.perf_counter()
+            datos_ordenados = ordenar_siniestros(datos, columna, self.orden_descendente)
+            medicion.registrar('ordenamiento', time.perf_counter() - inicio_ordenamiento, len(datos_ordenados))
             
             # Limpiar la tabla actual
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            with medicion.etapa('limpiar_tabla'):
+                for item in self.tree.get_children():
+                    self.tree.delete(item)
             
             # Insertar los datos ordenados
-            for resultado in datos_ordenados:
-                # Convertir None a cadena vacía
-                valores = ['' if valor is None else str(valor) for valor in resultado]
-                self.tree.insert("", tk.END, values=valores)
+            with medicion.etapa('insertar_filas') as etapa:
+                for resultado in datos_ordenados:
+                    # Convertir None a cadena vacía
+                    valores = ['' if valor is None else str(valor) for valor in resultado]
+                    self.tree.insert("", tk.END, values=valores)
+                etapa['registros'] = len(datos_ordenados)
             
             # Actualizar el estado
             orden_texto = "descendente" if self.orden_descendente else "ascendente"
             self.etiqueta_estado.config(text=f"Ordenado por {columna} ({orden_texto}) - {len(datos_ordenados)} registros")
+            medicion.finalizar()
             
         except (ValueError, IndexError) as e:
-            print(f"Error al ordenar por columna {columna}: {str(e)}")
+            logger.error("Error al ordenar por columna %s: %s", columna, e)
             messagebox.showerror("Error", f"No se pudo ordenar por la columna {columna}")
 
     def _actualizar_indicador_ordenamiento(self, columna_actual):
@@ -954,41 +887,10 @@ class VistaConsulta:
 
     def _aplicar_ordenamiento(self, datos, columna, descendente):
         """Aplica el ordenamiento a una lista de datos."""
-        columnas = [
-            "ID", "Formulario", "Fecha", "Hora", "Localidad",
-            "Clases Vehículos", "Placas", "Condiciones Actores",
-            "Fallecidos", "Heridos", "Ilesos", "Estados",
-            "Géneros", "Edades", "Causante", "Causa", 
-            "Terreno Vía", "Estado Vía"
-        ]
-        
         try:
-            indice_columna = columnas.index(columna)
-            
-            # Ordenar los datos
-            if columna in ["ID", "Fallecidos", "Heridos", "Ilesos"]:
-                # Ordenamiento numérico
-                datos_ordenados = sorted(datos, 
-                    key=lambda x: int(x[indice_columna]) if x[indice_columna] and str(x[indice_columna]).isdigit() else 0,
-                    reverse=descendente
-                )
-            elif columna in ["Fecha", "Hora"]:
-                # Ordenamiento por fecha/hora
-                datos_ordenados = sorted(datos,
-                    key=lambda x: x[indice_columna] if x[indice_columna] else "",
-                    reverse=descendente
-                )
-            else:
-                # Ordenamiento alfabético
-                datos_ordenados = sorted(datos,
-                    key=lambda x: str(x[indice_columna]).lower() if x[indice_columna] else "",
-                    reverse=descendente
-                )
-            
-            return datos_ordenados
-            
+            return ordenar_siniestros(datos, columna, descendente)
         except (ValueError, IndexError) as e:
-            print(f"Error al aplicar ordenamiento: {str(e)}")
+            logger.error("Error al aplicar ordenamiento: %s", e)
             return datos
 
     def _actualizar_opciones_hora(self, datos_filtrados):
@@ -998,7 +900,7 @@ class VistaConsulta:
             self.hora_filtro_inicio['values'] = [''] + horas
             self.hora_filtro_fin['values'] = [''] + horas
         except Exception as e:
-            print(f"Error al actualizar opciones de hora: {str(e)}")
+            logger.error("Error al actualizar opciones de hora: %s", e)
 
     def _actualizar_opciones_filtros(self, datos_filtrados):
         """Actualiza todas las opciones de filtros basadas en los datos filtrados."""
@@ -1017,4 +919,4 @@ class VistaConsulta:
             self.hora_filtro_fin['values'] = [''] + horas
             
         except Exception as e:
-            print(f"Error al actualizar opciones de filtros: {str(e)}")
\ No newline at end of file
+            logger.error("Error al actualizar opciones de filtros: %s", e)
\ No newline at end of file
@@ -3,7 +3,8 @@ from PIL import Image, ImageTk
 import os
 
 class SplashView:
-    def __init__(self, root, image_path, duration=5000):
+    def __init__(self, root, image_path, duration=None):
+        """Sin duration el splash permanece hasta que se llame a close()"""
         self.root = root
         self.duration = duration
         
@@ -30,7 +31,9 @@ class SplashView:
         root.geometry(f"{self.image.width}x{self.image.height}+{x}+{y}")
         
         # Programar el cierre después de la duración especificada
-        self.root.after(self.duration, self.close)
+        if self.duration:
+            self.root.after(self.duration, self.close)
     
     def close(self):
-        self.root.destroy() 
\ No newline at end of file
+        if self.root.winfo_exists():
+            self.root.destroy()
@@ -2,17 +2,24 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from src.controllers.update_controller import ControladorActualizacion
-from src.config.settings import CONFIG_INTERFAZ
-import threading
-import time
+from src.config.log import NIVELES, cambiar_nivel, nivel_actual
+from src.controllers.proceso_actualizacion import ProcesoActualizacion
+from src.models.eventos_progreso import texto_progreso
+from src.models.registro_actualizacion import obtener_registro, archivos_registro, leer_pagina
+from src.config.settings import CONFIG_INTERFAZ, CONFIG_REGISTRO
+
+INTERVALO_FOTOGRAMA_MS = 66  # ~15 actualizaciones por segundo de la interfaz durante la actualización
 
 class VistaActualizacion:
     def __init__(self, root, ventana_principal, controlador_principal):
         self.root = root
         self.ventana_principal = ventana_principal
         self.controlador_principal = controlador_principal
-        self.controlador = ControladorActualizacion()
+        # La actualización corre en un proceso hijo; la interfaz solo lee su progreso
+        self.proceso = ProcesoActualizacion()
+        self._ultimo_progreso = None  # último evento de avance recibido del bloque en curso
+        # Log completo en disco; la ventana solo conserva las últimas líneas
+        self.registro = obtener_registro()
         
         self.configurar_ventana()
         self.crear_interfaz()
@@ -78,6 +85,19 @@ class VistaActualizacion:
         )
         self.status_label.pack(side=tk.LEFT)
 
+        # Nivel de log, ajustable durante la actualización
+        self.nivel_log = tk.StringVar(value=nivel_actual())
+        nivel_combo = ttk.Combobox(
+            status_frame,
+            textvariable=self.nivel_log,
+            values=NIVELES,
+            state="readonly",
+            width=10
+        )
+        nivel_combo.pack(side=tk.RIGHT)
+        nivel_combo.bind("<<ComboboxSelected>>", lambda evento: self.cambiar_nivel_log())
+        ttk.Label(status_frame, text="Nivel de log:", style='Update.TLabel').pack(side=tk.RIGHT, padx=5)
+
         # Frame para la barra de progreso
         progress_frame = ttk.Frame(main_frame, style='Update.TFrame')
         progress_frame.pack(fill=tk.X, pady=10)
@@ -107,6 +127,16 @@ class VistaActualizacion:
         )
         self.percent_label.pack(side=tk.RIGHT, padx=5)
 
+        # Línea de progreso de la tabla en curso (se reemplaza en cada fotograma)
+        self.progress_line = ttk.Label(
+            main_frame,
+            text="",
+            font=("Helvetica", 10),
+            foreground="#0d9330",
+            style='Update.TLabel'
+        )
+        self.progress_line.pack(fill=tk.X)
+
         # Frame para el log con fondo claro
         log_frame = ttk.Frame(main_frame, style='Update.TFrame')
         log_frame.pack(fill=tk.BOTH, expand=True, pady=10)
@@ -128,6 +158,14 @@ class VistaActualizacion:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.log_text.config(yscrollcommand=scrollbar.set)
 
+        # Formato de cada tipo de mensaje
+        self.log_text.tag_configure("inicio", foreground="blue", font=("Helvetica", 10, "bold"))
+        self.log_text.tag_configure("info", foreground="#34495e", font=("Helvetica", 10))
+        self.log_text.tag_configure("progreso", foreground="#0d9330", font=("Helvetica", 10))
+        self.log_text.tag_configure("error", foreground="red", font=("Helvetica", 10, "bold"))
+        self.log_text.tag_configure("advertencia", foreground="#d35400", font=("Helvetica", 10))
+        self.log_text.tag_configure("exito", foreground="#0d9330", font=("Helvetica", 10, "bold"))
+
         # Frame para los botones
         button_frame = ttk.Frame(main_frame, style='Update.TFrame')
         button_frame.pack(fill=tk.X, pady=20)
@@ -164,6 +202,15 @@ class VistaActualizacion:
         )
         self.individual_button.pack(side=tk.LEFT, padx=10)
 
+        # Botón Reconciliar Cambios (registros editados y eliminados)
+        self.reconcile_button = ttk.Button(
+            button_frame,
+            text="Reconciliar Cambios",
+            command=lambda: self.iniciar_actualizacion(reconciliar=True),
+            style="Qtrazer.TButton"
+        )
+        self.reconcile_button.pack(side=tk.LEFT, padx=10)
+
         # Botón Cerrar
         self.close_button = ttk.Button(
             button_frame,
@@ -173,8 +220,20 @@ class VistaActualizacion:
         )
         self.close_button.pack(side=tk.RIGHT, padx=10)
 
+        # Botón Ver Log Completo (archivo en disco)
+        self.full_log_button = ttk.Button(
+            button_frame,
+            text="Ver Log Completo",
+            command=self.mostrar_log_completo,
+            style="Qtrazer.TButton"
+        )
+        self.full_log_button.pack(side=tk.RIGHT, padx=10)
+
     def agregar_log(self, mensaje):
         """Agrega un mensaje al área de log con formato."""
+        # El archivo recibe todos los mensajes, también los que la ventana no muestra
+        self.registro.info(mensaje)
+
         self.log_text.config(state=tk.NORMAL)
         
         # Aplicar formato según el tipo de mensaje
@@ -188,38 +247,18 @@ class VistaActualizacion:
             linea_inicio = mensaje if mensaje.startswith("[") else f"[INICIO] {mensaje}"
             self.log_text.insert(tk.END, f"\n{linea_inicio}\n", "inicio")
         elif "[PROGRESO]" in mensaje:
-            # Actualizar la línea de progreso SOLO dentro del bloque de la tabla en curso
-            contenido = self.log_text.get(1.0, tk.END)
-            lineas = contenido.split('\n')
-
-            # Buscar la última cabecera [INICIO]
-            idx_inicio = -1
-            for i in range(len(lineas) - 1, -1, -1):
-                if lineas[i].startswith("[INICIO]"):
-                    idx_inicio = i
-                    break
-
-            # Buscar el último [PROGRESO] desde idx_inicio hacia el final
-            ultima_linea_progreso = -1
-            if idx_inicio >= 0:
-                for i in range(len(lineas) - 1, idx_inicio, -1):
-                    if "[PROGRESO]" in lineas[i]:
-                        ultima_linea_progreso = i
-                        break
-
-            if ultima_linea_progreso >= 0:
-                # Reemplazar la última línea de progreso del bloque actual
-                inicio_linea = f"{ultima_linea_progreso + 1}.0"
-                fin_linea = f"{ultima_linea_progreso + 1}.end"
-                self.log_text.delete(inicio_linea, fin_linea)
-                self.log_text.insert(inicio_linea, mensaje, "progreso")
-            else:
-                # No existe progreso en el bloque actual: agregar una nueva línea
-                self.log_text.insert(tk.END, f"\n{mensaje}\n", "progreso")
+            # Avance final de un bloque; el avance en curso se muestra en progress_line
+            self.log_text.insert(tk.END, f"{mensaje}\n", "progreso")
         elif "Total de registros" in mensaje:
             # Evitar duplicar etiqueta [INFO]
             linea_info = mensaje if mensaje.startswith("[") else f"[INFO] {mensaje}"
             self.log_text.insert(tk.END, f"\n{linea_info}\n", "info")
+        elif "[TASA]" in mensaje or "[HTTP]" in mensaje:
+            # Estado del control adaptativo y contadores del cliente HTTP
+            self.log_text.insert(tk.END, f"{mensaje}\n", "info")
+        elif "[ADVERTENCIA]" in mensaje:
+            # Registros rechazados por la base de datos (el resto del lote sí se insertó)
+            self.log_text.insert(tk.END, f"{mensaje}\n", "advertencia")
         elif "ObjectID más reciente" in mensaje:
             # El mensaje ya viene formateado por el modelo/controlador
             self.log_text.insert(tk.END, f"{mensaje}\n", "info")
@@ -238,70 +277,109 @@ class VistaActualizacion:
                 self.log_text.insert(tk.END, f"\n[INFO] Iniciando inserción de registros\n", "info")
                 self.mostrado_insercion = True
         
-        # Configurar tags para el formato
-        self.log_text.tag_configure("inicio", foreground="blue", font=("Helvetica", 10, "bold"))
-        self.log_text.tag_configure("info", foreground="#34495e", font=("Helvetica", 10))
-        self.log_text.tag_configure("progreso", foreground="#0d9330", font=("Helvetica", 10))
-        self.log_text.tag_configure("error", foreground="red", font=("Helvetica", 10, "bold"))
-        self.log_text.tag_configure("exito", foreground="#0d9330", font=("Helvetica", 10, "bold"))
+        # Conservar solo las últimas líneas en la ventana (el resto está en el archivo)
+        lineas = int(self.log_text.index('end-1c').split('.')[0])
+        exceso = lineas - CONFIG_REGISTRO['lineas_visibles']
+        if exceso > 0:
+            self.log_text.delete('1.0', f'{exceso + 1}.0')
         
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
 
-    def iniciar_actualizacion(self):
-        """Inicia el proceso de actualización."""
-        if self.controlador.esta_actualizando():
+    def cambiar_nivel_log(self):
+        """Aplica el nivel de log elegido en la interfaz y en la actualización en curso."""
+        nivel = self.nivel_log.get()
+        cambiar_nivel(nivel)
+        self.proceso.cambiar_nivel_log(nivel)
+
+    def iniciar_actualizacion(self, reconciliar=False):
+        """Inicia el proceso de actualización (o de reconciliación) de todas las tablas."""
+        if self.proceso.esta_actualizando():
             messagebox.showwarning(
                 "Actualización en Progreso",
                 "Ya hay una actualización en curso. Por favor espere."
             )
             return
 
-        # Deshabilitar el botón de actualización
+        self._preparar_actualizacion()
+        self._lanzar_proceso(None, reconciliar)
+
+    def _preparar_actualizacion(self):
+        """Deshabilita los botones y limpia el log antes de una actualización."""
         self.start_button.config(state=tk.DISABLED)
+        self.individual_button.config(state=tk.DISABLED)
+        self.reconcile_button.config(state=tk.DISABLED)
         self.close_button.config(state=tk.DISABLED)
         
-        # Limpiar el log
+        # Limpiar el log de la ventana; el archivo conserva las actualizaciones anteriores
         self.log_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
         self.log_text.config(state=tk.DISABLED)
+        self.registro.info("=" * 20 + " Nueva actualización " + "=" * 20)
         
         # Resetear los flags de inserción
         if hasattr(self, 'mostrado_insercion'):
             delattr(self, 'mostrado_insercion')
-        
-        def actualizar_progreso(mensaje, porcentaje):
-            self.status_label.config(text=mensaje)
-            self.progress_bar['value'] = porcentaje
-            self.percent_label['text'] = f"{porcentaje:.1f}%"
-            self.agregar_log(mensaje)
-            self.root.update_idletasks()
-            
-            # Verificar si se completó todo el proceso
-            if "Actualización completada exitosamente" in mensaje:
+
+    def _lanzar_proceso(self, tablas, reconciliar=False):
+        """Inicia el proceso hijo y programa la lectura de sus eventos."""
+        self._ultimo_progreso = None
+        try:
+            self.proceso.iniciar(tablas, reconciliar)
+        except Exception as e:
+            self.actualizar_progreso(f"Error: {str(e)}")
+            self.finalizar_actualizacion()
+            return
+        self.root.after(INTERVALO_FOTOGRAMA_MS, self._leer_progreso)
+
+    def actualizar_progreso(self, mensaje):
+        """Muestra un mensaje en el estado y en el log (siempre en el hilo de Tk)."""
+        self.status_label.config(text=mensaje)
+        self.agregar_log(mensaje)
+
+    def _mostrar_avance(self, evento):
+        """Actualiza la barra y la línea de progreso con un evento de avance."""
+        self.progress_bar['value'] = evento['porcentaje']
+        self.percent_label['text'] = f"{evento['porcentaje']:.1f}%"
+        self.progress_line.config(text=f"{evento['tabla']} - {texto_progreso(evento)[len('[PROGRESO] '):]}")
+
+    def _cerrar_bloque_progreso(self):
+        """Deja en el log el último avance del bloque que termina."""
+        if self._ultimo_progreso:
+            self.agregar_log(texto_progreso(self._ultimo_progreso))
+            self._ultimo_progreso = None
+        self.progress_line.config(text="")
+
+    def _leer_progreso(self):
+        """Aplica los eventos recibidos desde el fotograma anterior.
+        Los avances se agrupan: solo el último se dibuja.
+        """
+        avance = None
+        for evento in self.proceso.leer_eventos():
+            if evento['tipo'] == 'progreso':
+                avance = self._ultimo_progreso = evento
+            elif evento['tipo'] == 'mensaje':
+                if evento['texto'].startswith('[INICIO]'):
+                    self._cerrar_bloque_progreso()
+                    avance = None
+                self.actualizar_progreso(evento['texto'])
+            elif evento['tipo'] == 'fin':
+                if not evento['resultados'] and not evento['cancelada']:
+                    self.actualizar_progreso("Error en la actualización")
                 self.finalizar_actualizacion()
-        
-        def ejecutar_actualizacion():
-            try:
-                resultado = self.controlador.iniciar_actualizacion(actualizar_progreso)
-                if resultado:
-                    self.progress_bar['value'] = 100
-                    self.percent_label['text'] = "100%"
-                else:
-                    actualizar_progreso("Error en la actualización", 0)
-            except Exception as e:
-                actualizar_progreso(f"Error: {str(e)}", 0)
-            finally:
-                self.root.after(0, self.finalizar_actualizacion)
-        
-        # Iniciar actualización en un hilo separado
-        threading.Thread(target=ejecutar_actualizacion, daemon=True).start()
+                return
+        if avance:
+            self._mostrar_avance(avance)
+        self.root.after(INTERVALO_FOTOGRAMA_MS, self._leer_progreso)
 
     def finalizar_actualizacion(self):
         """Finaliza el proceso de actualización."""
+        self._cerrar_bloque_progreso()
+
         # Restaurar el estado de los botones
         self.start_button.config(state=tk.NORMAL)
         self.individual_button.config(state=tk.NORMAL)
+        self.reconcile_button.config(state=tk.NORMAL)
         self.close_button.config(state=tk.NORMAL)
         
         # Limpiar la barra de progreso
@@ -313,7 +391,7 @@ class VistaActualizacion:
 
     def mostrar_selector_tabla(self):
         """Muestra un diálogo para seleccionar una tabla específica para actualizar."""
-        if self.controlador.esta_actualizando():
+        if self.proceso.esta_actualizando():
             messagebox.showwarning(
                 "Actualización en Progreso",
                 "Ya hay una actualización en curso. Por favor espere."
@@ -407,51 +485,20 @@ class VistaActualizacion:
         """Inicia la actualización de la tabla seleccionada individualmente."""
         tabla = self.tabla_seleccionada.get()
         selector_window.destroy()
-        
-        # Deshabilitar botones durante la actualización
-        self.start_button.config(state=tk.DISABLED)
-        self.individual_button.config(state=tk.DISABLED)
-        self.close_button.config(state=tk.DISABLED)
-        
-        # Limpiar el log
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state=tk.DISABLED)
-        
-        # Resetear los flags de inserción
-        if hasattr(self, 'mostrado_insercion'):
-            delattr(self, 'mostrado_insercion')
-        
-        def actualizar_progreso(mensaje, porcentaje):
-            self.status_label.config(text=mensaje)
-            self.progress_bar['value'] = porcentaje
-            self.percent_label['text'] = f"{porcentaje:.1f}%"
-            self.agregar_log(mensaje)
-            self.root.update_idletasks()
-            
-            # Verificar si se completó todo el proceso
-            if "Actualización completada exitosamente" in mensaje:
-                self.finalizar_actualizacion()
-        
-        def ejecutar_actualizacion_individual():
-            try:
-                resultado = self.controlador.iniciar_actualizacion_individual(tabla, actualizar_progreso)
-                if resultado:
-                    self.progress_bar['value'] = 100
-                    self.percent_label['text'] = "100%"
-                else:
-                    actualizar_progreso("Error en la actualización", 0)
-            except Exception as e:
-                actualizar_progreso(f"Error: {str(e)}", 0)
-            finally:
-                self.root.after(0, self.finalizar_actualizacion)
-        
-        # Iniciar actualización en un hilo separado
-        threading.Thread(target=ejecutar_actualizacion_individual, daemon=True).start()
+
+        self._preparar_actualizacion()
+        self._lanzar_proceso([tabla])
+
+    def mostrar_log_completo(self):
+        """Abre el visor del log completo guardado en disco."""
+        if not archivos_registro():
+            messagebox.showinfo("Log de Actualización", "Aún no hay un log de actualizaciones guardado.")
+            return
+        VisorRegistro(tk.Toplevel(self.root))
 
     def cerrar_ventana(self):
         """Cierra la ventana de actualización."""
-        if self.controlador.esta_actualizando():
+        if self.proceso.esta_actualizando():
             # Preguntar al usuario si quiere cancelar la actualización
             respuesta = messagebox.askyesno(
                 "Actualización en Progreso",
@@ -459,7 +506,7 @@ class VistaActualizacion:
             )
             if respuesta:
                 # Cancelar la actualización pero mantener la ventana abierta
-                self.controlador.cancelar_actualizacion()
+                self.proceso.cancelar()
                 self.agregar_log("Actualización cancelada por el usuario")
                 self.agregar_log("La ventana permanecerá abierta para mostrar el historial de la actualización")
                 self.finalizar_actualizacion()
@@ -467,4 +514,134 @@ class VistaActualizacion:
                 # self.root.destroy()  # Comentado para mantener la ventana abierta
             # Si el usuario dice "No", no hacer nada (mantener la ventana abierta)
         else:
-            self.root.destroy() 
\ No newline at end of file
+            self.root.destroy() 
+
+
+class VisorRegistro:
+    """Muestra el log completo por páginas: solo lee del archivo las líneas que se van a ver.
+    La ventana conserva CONFIG_REGISTRO['paginas_visibles'] páginas; al cargar una en un extremo
+    descarta la del extremo opuesto, que se vuelve a leer si el usuario regresa a ella.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Log de Actualización - " + CONFIG_INTERFAZ['titulo'])
+        self.root.geometry("900x600")
+        self.root.configure(bg="#E8E8E8")
+        self.archivos = archivos_registro()
+        self.inicios = [0]  # byte de inicio de cada página leída del archivo
+        self.primera = 0  # primera página visible
+        self.lineas_paginas = []  # líneas de cada página visible, desde self.primera
+        self.fin_archivo = False
+        self._carga_pendiente = False
+
+        barra = ttk.Frame(self.root, style='Update.TFrame')
+        barra.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(barra, text="Archivo:", style='Update.TLabel').pack(side=tk.LEFT)
+        self.combo_archivo = ttk.Combobox(barra, state="readonly", width=60, values=self.archivos)
+        self.combo_archivo.pack(side=tk.LEFT, padx=5)
+        self.combo_archivo.bind("<<ComboboxSelected>>", lambda evento: self.abrir_archivo())
+        self.boton_mas = ttk.Button(barra, text="Cargar más", command=self.cargar_pagina)
+        self.boton_mas.pack(side=tk.LEFT, padx=5)
+        self.etiqueta_estado = ttk.Label(barra, text="", style='Update.TLabel')
+        self.etiqueta_estado.pack(side=tk.LEFT, padx=5)
+
+        marco = ttk.Frame(self.root, style='Update.TFrame')
+        marco.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.texto = tk.Text(marco, wrap=tk.NONE, font=("Consolas", 9), state=tk.DISABLED)
+        scroll_y = ttk.Scrollbar(marco, command=self.texto.yview)
+        scroll_x = ttk.Scrollbar(marco, orient=tk.HORIZONTAL, command=self.texto.xview)
+        self.texto.config(yscrollcommand=lambda inicio, fin: self._al_desplazar(scroll_y, inicio, fin),
+                          xscrollcommand=scroll_x.set)
+        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.texto.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.combo_archivo.current(0)
+        self.abrir_archivo()
+
+    def abrir_archivo(self):
+        self.inicios = [0]
+        self.primera = 0
+        self.lineas_paginas = []
+        self.fin_archivo = False
+        self.texto.config(state=tk.NORMAL)
+        self.texto.delete(1.0, tk.END)
+        self.texto.config(state=tk.DISABLED)
+        self.cargar_pagina()
+
+    def _leer(self, pagina):
+        """Lee la página indicada; registra dónde empieza la siguiente"""
+        try:
+            lineas, siguiente = leer_pagina(self.combo_archivo.get(), self.inicios[pagina])
+        except OSError as e:
+            messagebox.showerror("Error", f"No fue posible leer el log: {str(e)}", parent=self.root)
+            return None
+        if pagina + 1 == len(self.inicios) and lineas:
+            self.inicios.append(siguiente)
+        return lineas
+
+    def cargar_pagina(self):
+        """Agrega la siguiente página del archivo y descarta la primera si se excede la ventana."""
+        self._carga_pendiente = False
+        if self.fin_archivo:
+            return
+        pagina = self.primera + len(self.lineas_paginas)
+        lineas = self._leer(pagina)
+        if lineas is None:
+            return
+        self.fin_archivo = len(lineas) < CONFIG_REGISTRO['lineas_por_pagina']
+        if lineas:
+            visible = int(self.texto.index('@0,0').split('.')[0])
+            self.texto.config(state=tk.NORMAL)
+            self.texto.insert(tk.END, '\n'.join(lineas) + '\n')
+            self.lineas_paginas.append(len(lineas))
+            if len(self.lineas_paginas) > CONFIG_REGISTRO['paginas_visibles']:
+                descartadas = self.lineas_paginas.pop(0)
+                self.texto.delete('1.0', f'{descartadas + 1}.0')
+                self.primera += 1
+                # Mantener a la vista las mismas líneas
+                self.texto.yview(f'{max(visible - descartadas, 1)}.0')
+            self.texto.config(state=tk.DISABLED)
+        self._actualizar_estado()
+
+    def cargar_pagina_anterior(self):
+        """Vuelve a leer la página previa a la ventana y descarta la última."""
+        self._carga_pendiente = False
+        if self.primera == 0:
+            return
+        lineas = self._leer(self.primera - 1)
+        if not lineas:
+            return
+        visible = int(self.texto.index('@0,0').split('.')[0])
+        self.texto.config(state=tk.NORMAL)
+        self.texto.insert('1.0', '\n'.join(lineas) + '\n')
+        self.primera -= 1
+        self.lineas_paginas.insert(0, len(lineas))
+        if len(self.lineas_paginas) > CONFIG_REGISTRO['paginas_visibles']:
+            descartadas = self.lineas_paginas.pop()
+            self.texto.delete(f'end-{descartadas + 1}l linestart', 'end-1c')
+            self.fin_archivo = False
+        self.texto.yview(f'{visible + len(lineas)}.0')
+        self.texto.config(state=tk.DISABLED)
+        self._actualizar_estado()
+
+    def _actualizar_estado(self):
+        # Todas las páginas salvo la última del archivo están completas
+        desde = self.primera * CONFIG_REGISTRO['lineas_por_pagina'] + 1
+        hasta = desde + sum(self.lineas_paginas) - 1
+        texto = f"Líneas {desde}-{hasta}" if hasta >= desde else "0 líneas"
+        self.etiqueta_estado.config(text=texto + (" (fin del archivo)" if self.fin_archivo else ""))
+        self.boton_mas.config(state=tk.DISABLED if self.fin_archivo else tk.NORMAL)
+
+    def _al_desplazar(self, scrollbar, inicio, fin):
+        """Carga la página siguiente o la anterior al acercarse a un extremo de lo cargado."""
+        scrollbar.set(inicio, fin)
+        if self._carga_pendiente:
+            return
+        if float(fin) > 0.95 and not self.fin_archivo:
+            self._carga_pendiente = True
+            self.root.after_idle(self.cargar_pagina)
+        elif float(inicio) < 0.05 and self.primera > 0:
+            self._carga_pendiente = True
+            self.root.after_idle(self.cargar_pagina_anterior)
@@ -0,0 +1,35 @@
+-- Script para agregar la huella de contenido por registro usada por el upsert
+-- Ejecutar este script en PostgreSQL sobre bases creadas antes de la columna hash_contenido
+
+-- ============================================================================
+-- COLUMNA DE HUELLA DE CONTENIDO (MD5 DE LOS VALORES INSERTADOS)
+-- ============================================================================
+
+ALTER TABLE accidente ADD COLUMN IF NOT EXISTS hash_contenido CHAR(32);
+ALTER TABLE vm_acc_actor_vial ADD COLUMN IF NOT EXISTS hash_contenido CHAR(32);
+ALTER TABLE vm_acc_causa ADD COLUMN IF NOT EXISTS hash_contenido CHAR(32);
+ALTER TABLE vm_acc_vehiculo ADD COLUMN IF NOT EXISTS hash_contenido CHAR(32);
+ALTER TABLE vm_acc_vial ADD COLUMN IF NOT EXISTS hash_contenido CHAR(32);
+
+-- Los registros existentes quedan con hash_contenido NULL y se reescriben una
+-- sola vez en el siguiente upsert; desde entonces solo se escriben si cambian.
+
+-- ============================================================================
+-- PERMISOS PARA EL UPSERT Y LA RECONCILIACIÓN
+-- ============================================================================
+
+GRANT UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO "Por definir";
+
+-- ============================================================================
+-- VERIFICACIÓN DE CAMBIOS
+-- ============================================================================
+
+SELECT 
+    table_name,
+    column_name,
+    data_type,
+    character_maximum_length
+FROM information_schema.columns 
+WHERE table_name IN ('accidente', 'vm_acc_actor_vial', 'vm_acc_causa', 'vm_acc_vehiculo', 'vm_acc_vial')
+    AND column_name = 'hash_contenido'
+ORDER BY table_name;